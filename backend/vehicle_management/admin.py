@@ -1,27 +1,181 @@
+from datetime import date, timedelta
+
 from django.contrib import admin
-from .models import Vehicle, VehiclePart, VehiclePartCompatibility, ServiceRecord, ServicePartUsage
+from django.db.models import BooleanField, Case, DateField, DurationField, ExpressionWrapper, F, Q, Value, When
+from django.utils import timezone
+
+from .compat_graph import graph
+from .models import (
+    BackgroundJob, Employee, FuelTransaction, JobAssignment, Vehicle, VehiclePart, VehiclePartCompatibility,
+    ServiceRecord, ServicePartUsage,
+)
+
+# Vehicle.next_service_date computed by the database, so changelists can sort and filter on it
+NEXT_SERVICE_DATE = ExpressionWrapper(
+    F('last_service_date') + ExpressionWrapper(
+        F('service_interval_months') * timedelta(days=30), output_field=DurationField()
+    ),
+    output_field=DateField(),
+)
+# Vehicle.service_due_status labels by rank; overdue sorts first
+SERVICE_DUE_LABELS = {0: "✗ No", 1: "⚠️ Soon", 2: "✓ Yes"}
+
+
+def with_service_due(queryset, today=None):
+    """Annotate next_service and service_due_rank, matching Vehicle.service_due_status"""
+    today = today or date.today()
+    return queryset.annotate(next_service=NEXT_SERVICE_DATE).annotate(
+        service_due_rank=Case(
+            When(next_service__isnull=True, then=Value(0)),
+            When(next_service__lt=today, then=Value(0)),
+            When(next_service__lte=today + timedelta(days=30), then=Value(1)),
+            default=Value(2),
+        )
+    )
+
+
+def _status_action(status, label):
+    def mark(modeladmin, request, queryset):
+        pks = list(queryset.values_list('pk', flat=True))
+        # update() skips auto_now, so updated_at is set here for delta sync
+        updated = Vehicle.objects.filter(pk__in=pks).update(status=status, updated_at=timezone.now())
+        # It sends no signals either: move the vehicles in or out of the graph's active set.
+        # Search documents do not include the status, so the index is still current.
+        for pk in pks:
+            graph.set_vehicle_status(pk, status)
+        modeladmin.message_user(request, f"{updated} vehicle(s) marked {label}.")
+    mark.__name__ = f'mark_{status}'
+    return admin.action(description=f"Mark selected vehicles as {label}")(mark)
+
 
 class VehicleAdmin(admin.ModelAdmin):
-    list_display = ('name', 'employee_name', 'registration', 'insurance_company', 
-                   'registration_expiry', 'insurance_expiry', 'service_due_status', 'status')
+    list_display = ('name', 'employee_name', 'registration', 'insurance_company',
+                   'registration_expiry', 'insurance_expiry', 'next_service', 'service_due_status', 'status')
     list_filter = ('status', 'insurance_company')
     search_fields = ('name', 'registration', 'employee_name')
-    
+    autocomplete_fields = ('assigned_employee', 'assigned_to')
+    show_full_result_count = False
+    actions = [_status_action(status, label) for status, label in Vehicle.STATUS_CHOICES]
+
+    def get_queryset(self, request):
+        return with_service_due(super().get_queryset(request))
+
+    @admin.display(description='Next service', ordering='next_service')
+    def next_service(self, obj):
+        return obj.next_service
+
+    @admin.display(description='Service due', ordering='service_due_rank')
+    def service_due_status(self, obj):
+        return SERVICE_DUE_LABELS[obj.service_due_rank]
+
     def get_urls(self):
         from django.urls import path
         from . import views
-        
+
         urls = super().get_urls()
         custom_urls = [
             path('overview/', views.vehicle_list, name='vehicle_overview'),
         ]
         return custom_urls + urls
 
+class AssignedVehicleInline(admin.TabularInline):
+    model = Vehicle
+    fk_name = 'assigned_employee'
+    fields = ('name', 'registration', 'make', 'model', 'status')
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+    show_change_link = True
+
+
+class EmployeeAdmin(admin.ModelAdmin):
+    list_display = ('employee_id', 'first_name', 'last_name', 'position', 'department',
+                   'license_class', 'license_expiry', 'fifo')
+    list_filter = ('department', 'fifo', 'license_class')
+    search_fields = ('employee_id', 'first_name', 'last_name', 'license_number')
+    list_select_related = ('user',)
+    autocomplete_fields = ('user',)
+    inlines = [AssignedVehicleInline]
+
+class JobAssignmentAdmin(admin.ModelAdmin):
+    list_display = ('job', 'employee', 'vehicle', 'start_date', 'end_date')
+    list_filter = ('start_date',)
+    search_fields = ('job', 'employee__first_name', 'employee__last_name', 'vehicle__name')
+    list_select_related = ('employee', 'vehicle')
+    raw_id_fields = ('employee', 'vehicle')
+    date_hierarchy = 'start_date'
+
+class BackgroundJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'status', 'progress', 'attempts', 'worker', 'created_at', 'finished_at')
+    list_filter = ('status', 'kind')
+    readonly_fields = ('progress', 'message', 'result', 'error', 'attempts', 'worker',
+                       'heartbeat_at', 'created_at', 'started_at', 'finished_at')
+
+class VehiclePartAdmin(admin.ModelAdmin):
+    list_display = ('part_number', 'description', 'supplier', 'current_stock', 'minimum_stock', 'cost', 'needs_reorder')
+    list_filter = ('supplier',)
+    search_fields = ('part_number', 'description', 'supplier')
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(reorder=ExpressionWrapper(
+            Q(current_stock__lte=F('minimum_stock')), output_field=BooleanField()
+        ))
+
+    @admin.display(description='Reorder', boolean=True, ordering='reorder')
+    def needs_reorder(self, obj):
+        return obj.reorder
+
+class VehiclePartCompatibilityAdmin(admin.ModelAdmin):
+    list_display = ('part', 'vehicle')
+    search_fields = ('part__part_number', 'vehicle__name', 'vehicle__registration')
+    list_select_related = ('part', 'vehicle')
+    autocomplete_fields = ('part', 'vehicle')
+    show_full_result_count = False
+
+class ServicePartUsageInline(admin.TabularInline):
+    model = ServicePartUsage
+    fields = ('part', 'quantity')
+    autocomplete_fields = ('part',)
+    extra = 0
+
+    def get_queryset(self, request):
+        # Tabular inlines print each row's __str__, which reaches the service's vehicle
+        return super().get_queryset(request).select_related('part', 'service__vehicle')
+
+class ServiceRecordAdmin(admin.ModelAdmin):
+    list_display = ('vehicle', 'service_date', 'service_type', 'mileage_at_service', 'cost', 'performed_by')
+    list_filter = ('service_type',)
+    search_fields = ('vehicle__name', 'vehicle__registration', 'service_type', 'performed_by')
+    list_select_related = ('vehicle',)
+    autocomplete_fields = ('vehicle',)
+    show_full_result_count = False
+    inlines = [ServicePartUsageInline]
+
+class ServicePartUsageAdmin(admin.ModelAdmin):
+    list_display = ('part', 'quantity', 'service')
+    search_fields = ('part__part_number', 'service__vehicle__name')
+    list_select_related = ('part', 'service__vehicle')
+    autocomplete_fields = ('part',)
+    # Services number in the hundreds of thousands; pick them by id
+    raw_id_fields = ('service',)
+    show_full_result_count = False
+
+class FuelTransactionAdmin(admin.ModelAdmin):
+    list_display = ('transacted_at', 'card_number', 'vehicle', 'litres', 'amount', 'odometer', 'site')
+    list_filter = ('product',)
+    search_fields = ('card_number', 'vehicle__name', 'vehicle__registration', 'site')
+    list_select_related = ('vehicle',)
+    raw_id_fields = ('vehicle',)
+    show_full_result_count = False
+
 # Register with custom admin class
 admin.site.register(Vehicle, VehicleAdmin)
-
-# Register other models
-admin.site.register(VehiclePart)
-admin.site.register(VehiclePartCompatibility)
-admin.site.register(ServiceRecord)
-admin.site.register(ServicePartUsage)
\ No newline at end of file
+admin.site.register(Employee, EmployeeAdmin)
+admin.site.register(JobAssignment, JobAssignmentAdmin)
+admin.site.register(BackgroundJob, BackgroundJobAdmin)
+admin.site.register(VehiclePart, VehiclePartAdmin)
+admin.site.register(VehiclePartCompatibility, VehiclePartCompatibilityAdmin)
+admin.site.register(ServiceRecord, ServiceRecordAdmin)
+admin.site.register(ServicePartUsage, ServicePartUsageAdmin)
+admin.site.register(FuelTransaction, FuelTransactionAdmin)
@@ -0,0 +1,145 @@
+# vehicle_management/alerts.py
+from bisect import bisect_left, bisect_right
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import CharField, F, Value
+from django.db.models.functions import Concat
+from django.utils import timezone
+
+from .models import Vehicle, Employee
+
+# The nightly digest covers this many days ahead; longer windows fall back to a live query
+DIGEST_HORIZON_DAYS = 90
+DIGEST_CACHE_PREFIX = 'vehicle_management:expiry_digest'
+DIGEST_TIMEOUT = 60 * 60 * 26  # Keep a day's digest around until the next nightly rebuild
+
+ALERT_FIELDS = ('kind', 'object_id', 'label', 'reference', 'expiry_date')
+
+
+def _vehicle_alerts(date_field, kind, start, end):
+    """Vehicles whose `date_field` falls in the window, shaped as alert rows"""
+    window = {f'{date_field}__lte': end}
+    if start is not None:
+        window[f'{date_field}__gte'] = start
+    return Vehicle.objects.filter(**window).annotate(
+        kind=Value(kind, output_field=CharField()),
+        object_id=F('pk'),
+        label=F('name'),
+        reference=F('registration'),
+        expiry_date=F(date_field),
+    ).values(*ALERT_FIELDS)
+
+
+def _licence_alerts(start, end):
+    """Employees whose licence expires in the window, shaped as alert rows"""
+    window = {'license_expiry__lte': end}
+    if start is not None:
+        window['license_expiry__gte'] = start
+    return Employee.objects.filter(**window).annotate(
+        kind=Value('licence', output_field=CharField()),
+        object_id=F('pk'),
+        label=Concat('first_name', Value(' '), 'last_name', output_field=CharField()),
+        reference=F('employee_id'),
+        expiry_date=F('license_expiry'),
+    ).values(*ALERT_FIELDS)
+
+
+def expiry_alerts_queryset(start, end):
+    """
+    Registration, insurance and licence expiries between `start` and `end`
+    as a single UNION ALL query. Each branch is a range scan on the indexed
+    expiry column; pass start=None to include everything already expired.
+    """
+    return _vehicle_alerts('registration_expiry', 'registration', start, end).union(
+        _vehicle_alerts('insurance_expiry', 'insurance', start, end),
+        _licence_alerts(start, end),
+        all=True,
+    ).order_by('expiry_date', 'kind', 'object_id')
+
+
+def _serialize_alert(row, today):
+    return {
+        'kind': row['kind'],
+        'object_id': row['object_id'],
+        'label': row['label'],
+        'reference': row['reference'],
+        'expiry_date': row['expiry_date'].isoformat(),
+        'days_remaining': (row['expiry_date'] - today).days,
+    }
+
+
+def digest_cache_key(today):
+    return f'{DIGEST_CACHE_PREFIX}:{today.isoformat()}'
+
+
+def build_expiry_digest(today=None):
+    """
+    Precompute every expiry from the start of time up to the digest horizon
+    and store it in the cache for the day. Alerts are kept date-sorted with a
+    parallel list of date ordinals so any window can be sliced by bisection.
+    Always read from the live database: saves drop the digest, and one built
+    from an older reporting snapshot would be cached for the rest of the day.
+    """
+    today = today or timezone.now().date()
+    until = today + timedelta(days=DIGEST_HORIZON_DAYS)
+
+    alerts = [_serialize_alert(row, today) for row in expiry_alerts_queryset(None, until).using('default')]
+    digest = {
+        'generated_at': timezone.now().isoformat(),
+        'date': today.isoformat(),
+        'horizon_days': DIGEST_HORIZON_DAYS,
+        'ordinals': [today.toordinal() + alert['days_remaining'] for alert in alerts],
+        'alerts': alerts,
+    }
+    cache.set(digest_cache_key(today), digest, DIGEST_TIMEOUT)
+    return digest
+
+
+def get_expiry_digest(today=None):
+    """Return today's digest, building it on a cache miss"""
+    today = today or timezone.now().date()
+    digest = cache.get(digest_cache_key(today))
+    if digest is None:
+        digest = build_expiry_digest(today)
+    return digest
+
+
+def invalidate_expiry_digest():
+    """Drop today's digest so the next read rebuilds it"""
+    cache.delete(digest_cache_key(timezone.now().date()))
+
+
+def expiry_alerts(days=30, include_expired=False, page=1, page_size=50, today=None):
+    """
+    Return one page of the merged, date-sorted expiry feed for the next `days` days.
+
+    Windows inside the digest horizon are sliced straight out of the cached
+    digest; longer windows run the UNION query with LIMIT/OFFSET.
+    """
+    today = today or timezone.now().date()
+    until = today + timedelta(days=days)
+    offset = (page - 1) * page_size
+
+    if days <= DIGEST_HORIZON_DAYS:
+        digest = get_expiry_digest(today)
+        ordinals = digest['ordinals']
+        first = 0 if include_expired else bisect_left(ordinals, today.toordinal())
+        last = bisect_right(ordinals, until.toordinal())
+        count = last - first
+        results = digest['alerts'][first + offset:min(first + offset + page_size, last)]
+        generated_at = digest['generated_at']
+    else:
+        queryset = expiry_alerts_queryset(None if include_expired else today, until)
+        count = queryset.count()
+        results = [_serialize_alert(row, today) for row in queryset[offset:offset + page_size]]
+        generated_at = timezone.now().isoformat()
+
+    return {
+        'count': count,
+        'page': page,
+        'page_size': page_size,
+        'days': days,
+        'generated_at': generated_at,
+        'results': results,
+    }
@@ -0,0 +1,105 @@
+# vehicle_management/archive.py
+# Archive tier for service history. Services older than a cutoff, with their
+# part usages, move to the Archived* tables in batched transactions, which
+# keeps the live tables and their indexes sized to recent history. Reports
+# read the archive too, but only when the requested range reaches back past
+# the newest archived service.
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import (
+    ArchivedServicePartUsage, ArchivedServiceRecord, ServicePartUsage, ServiceRecord, TrackedModel,
+)
+from .sync import batched_tombstones
+
+# Default age at which `archive_services` moves a service out of the live table
+ARCHIVE_AFTER = timedelta(days=getattr(settings, 'SERVICE_ARCHIVE_AFTER_DAYS', 730))
+BATCH_SIZE = 1000
+
+SERVICE_FIELDS = ['id', 'vehicle_id', 'service_date', 'mileage_at_service', 'service_type', 'notes',
+                  'performed_by', 'cost', 'created_at', 'updated_at']
+USAGE_FIELDS = ['id', 'service_id', 'part_id', 'quantity', 'created_at', 'updated_at']
+
+
+def default_cutoff():
+    return timezone.now().date() - ARCHIVE_AFTER
+
+
+def archived_through():
+    """Date of the newest archived service, None while the archive is empty"""
+    return ArchivedServiceRecord.objects.aggregate(latest=Max('service_date'))['latest']
+
+
+def service_sources(start_date):
+    """
+    (service model, part usage model) pairs holding services on or after
+    start_date: the live tables, plus the archive when it reaches that far.
+    """
+    latest = archived_through()
+    sources = [(ServiceRecord, ServicePartUsage)]
+    if latest is not None and (start_date is None or start_date <= latest):
+        sources.append((ArchivedServiceRecord, ArchivedServicePartUsage))
+    return sources
+
+
+def _copy(model, rows):
+    rows = list(rows)
+    objects = model.objects.bulk_create([model(**row) for row in rows])
+    if issubclass(model, TrackedModel):
+        # bulk_create stamps created_at and updated_at with now; put created_at back
+        for instance, row in zip(objects, rows):
+            instance.created_at = row['created_at']
+        model.objects.bulk_update(objects, ['created_at'])
+
+
+def _move(services, source, target, usage_source, usage_target, batch_size, progress):
+    """
+    Copy `services` and their part usages into the target tables and delete
+    them from the source, one transaction per batch of services, oldest
+    first. Deleting live rows leaves tombstones for delta sync.
+    Returns the number of services moved.
+    """
+    total = services.count()
+    moved = 0
+    while True:
+        ids = list(services.order_by('service_date', 'id').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            break
+        with batched_tombstones():
+            rows = source.objects.filter(id__in=ids).values(*SERVICE_FIELDS)
+            usages = usage_source.objects.filter(service_id__in=ids).values(*USAGE_FIELDS)
+            _copy(target, rows)
+            _copy(usage_target, usages)
+            usage_source.objects.filter(service_id__in=ids).delete()
+            source.objects.filter(id__in=ids).delete()
+        moved += len(ids)
+        progress(moved, total)
+    return moved
+
+
+def archive_services(cutoff=None, batch_size=BATCH_SIZE, progress=None):
+    """Move services dated before `cutoff` (default: ARCHIVE_AFTER ago) into the archive"""
+    cutoff = cutoff or default_cutoff()
+    return _move(
+        ServiceRecord.objects.filter(service_date__lt=cutoff),
+        ServiceRecord, ArchivedServiceRecord, ServicePartUsage, ArchivedServicePartUsage,
+        batch_size, progress or (lambda done, total: None),
+    )
+
+
+def restore_services(since, until=None, batch_size=BATCH_SIZE, progress=None):
+    """
+    Move archived services dated from `since` (to `until`, inclusive) back
+    into the live tables under their old ids. Their updated_at becomes now,
+    so `?since=` clients that saw the tombstones fetch them again.
+    """
+    services = ArchivedServiceRecord.objects.filter(service_date__gte=since)
+    if until is not None:
+        services = services.filter(service_date__lte=until)
+    return _move(
+        services, ArchivedServiceRecord, ServiceRecord, ArchivedServicePartUsage, ServicePartUsage,
+        batch_size, progress or (lambda done, total: None),
+    )
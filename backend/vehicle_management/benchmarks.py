@@ -0,0 +1,444 @@
+# vehicle_management/benchmarks.py
+import io
+import json
+import os
+import platform
+import statistics
+import tempfile
+import threading
+from contextlib import ExitStack, contextmanager
+from time import perf_counter
+
+import django
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test import Client
+from django.utils import timezone
+from django.utils.text import compress_string
+
+from .instrumentation import QueryRecorder
+from .seeding import seed_fleet, clear_fleet, write_register_workbooks
+
+DEFAULT_SCALES = (1000, 10000, 100000)
+
+# (name, url) pairs timed at every scale
+LIST_ENDPOINTS = [
+    ('api.vehicles', '/api/vehicles/'),
+    ('api.vehicles.due_for_service', '/api/vehicles/due_for_service/'),
+    ('api.parts', '/api/parts/'),
+    ('api.parts.low_stock', '/api/parts/low_stock/'),
+    ('api.services', '/api/services/'),
+    ('api.compatibility', '/api/compatibility/'),
+]
+REPORT_ENDPOINTS = [
+    ('report.service_forecast', '/api/reports/service-forecast/'),
+    ('report.vehicle_utilization', '/api/reports/vehicle-utilization/'),
+    ('report.maintenance_costs.month', '/api/reports/maintenance-costs/?group_by=month'),
+    ('report.maintenance_costs.vehicle', '/api/reports/maintenance-costs/?group_by=vehicle'),
+    ('report.maintenance_costs.service_type', '/api/reports/maintenance-costs/?group_by=service_type'),
+    ('report.parts_usage', '/api/reports/parts-usage/'),
+    ('report.expiry_alerts', '/api/reports/expiry-alerts/?days=90'),
+]
+
+
+class _Timer:
+    """Time a callable `repeat` times while counting the SQL it runs"""
+
+    def __init__(self, repeat):
+        self.repeat = repeat
+
+    def __call__(self, func):
+        timings = []
+        queries = 0
+        result = None
+        for _ in range(self.repeat):
+            recorder = QueryRecorder()
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(recorder))
+                start = perf_counter()
+                result = func()
+                timings.append(perf_counter() - start)
+            queries = recorder.count
+        return {
+            'median_s': round(statistics.median(timings), 6),
+            'min_s': round(min(timings), 6),
+            'queries': queries,
+        }, result
+
+
+def time_endpoints(client, endpoints, repeat=3):
+    """Time GET requests against each endpoint; returns a list of result rows"""
+    timer = _Timer(repeat)
+    rows = []
+    for name, url in endpoints:
+        stats, response = timer(lambda: client.get(url))
+        stats.update({
+            'name': name,
+            'status': response.status_code,
+            'bytes': len(response.content),
+        })
+        rows.append(stats)
+    return rows
+
+
+def time_excel_import(scale, seed=42, repeat=1):
+    """Time `import_excel_data` on synthetic registers with `scale` rows"""
+    timer = _Timer(repeat)
+    with tempfile.TemporaryDirectory() as directory:
+        vehicles_path, parts_path = write_register_workbooks(directory, vehicles=scale, seed=seed)
+        stats, _ = timer(lambda: call_command(
+            'import_excel_data', vehicles=vehicles_path, parts=parts_path, stdout=io.StringIO()
+        ))
+    stats.update({'name': 'import.excel', 'status': None, 'bytes': None})
+    return [stats]
+
+
+def run_suite(scales=DEFAULT_SCALES, seed=42, repeat=3, include_import=True, log=None):
+    """
+    Seed each scale into the current database and time every endpoint.
+
+    Expects to run against a throwaway database (see `benchmark_database`),
+    because each scale starts by deleting all fleet data.
+    """
+    log = log or (lambda message: None)
+    client = Client()
+    results = []
+
+    for scale in scales:
+        log(f'Seeding {scale} vehicles')
+        clear_fleet()
+        seed_fleet(vehicles=scale, seed=seed)
+
+        for row in time_endpoints(client, LIST_ENDPOINTS + REPORT_ENDPOINTS, repeat=repeat):
+            row['scale'] = scale
+            results.append(row)
+            log(f"  {row['name']:<40} {row['median_s'] * 1000:10.1f} ms {row['queries']:6d} queries")
+
+        if include_import:
+            clear_fleet()
+            for row in time_excel_import(scale, seed=seed):
+                row['scale'] = scale
+                results.append(row)
+                log(f"  {row['name']:<40} {row['median_s'] * 1000:10.1f} ms {row['queries']:6d} queries")
+
+    return {
+        'meta': {
+            'created_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'seed': seed,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def time_rendering(scale, seed=42, repeat=3, log=None):
+    """
+    Time JSON rendering of the vehicle and service lists with DRF's stock
+    renderer and FastJSONRenderer, and the bytes each sends plain and gzipped.
+    Serialisation happens once up front, so only the renderer is timed.
+    """
+    from rest_framework.renderers import JSONRenderer
+
+    from .renderers import FastJSONRenderer, orjson
+    from .serializers import ServiceRecordSerializer, VehicleSerializer
+    from .views import ServiceRecordViewSet, VehicleViewSet
+
+    log = log or (lambda message: None)
+    timer = _Timer(repeat)
+    renderers = [('stdlib', JSONRenderer()), ('orjson' if orjson else 'fast', FastJSONRenderer())]
+    rows = []
+    for name, viewset, serializer_class in [
+        ('api.vehicles', VehicleViewSet, VehicleSerializer),
+        ('api.services', ServiceRecordViewSet, ServiceRecordSerializer),
+    ]:
+        data = serializer_class(viewset.queryset.all(), many=True).data
+        for label, renderer in renderers:
+            stats, body = timer(lambda: renderer.render(data))
+            gzip_stats, compressed = timer(lambda: compress_string(body))
+            stats.update({
+                'name': f'render.{name}.{label}',
+                'scale': scale,
+                'status': None,
+                'bytes': len(body),
+                'gzip_bytes': len(compressed),
+                'gzip_s': gzip_stats['median_s'],
+            })
+            rows.append(stats)
+            log(f"  {stats['name']:<40} {stats['median_s'] * 1000:10.1f} ms {len(body):>12,d} B "
+                f"-> gzip {len(compressed):>10,d} B (+{stats['gzip_s'] * 1000:.1f} ms)")
+    return rows
+
+
+# Report URLs timed as lists of dicts and again with ?format=columnar (and the parts matrix)
+COLUMNAR_REPORTS = [
+    ('report.vehicle_utilization', '/api/reports/vehicle-utilization/'),
+    ('report.maintenance_costs.vehicle', '/api/reports/maintenance-costs/?group_by=vehicle'),
+    ('report.parts_usage', '/api/reports/parts-usage/'),
+]
+
+
+def time_report_formats(scale, repeat=3, log=None):
+    """
+    Time report requests end to end (query, build, render) in the default row
+    format and with ?format=columnar, and the bytes each sends plain and gzipped.
+    """
+    log = log or (lambda message: None)
+    timer = _Timer(repeat)
+    client = Client()
+    rows = []
+    for name, url in COLUMNAR_REPORTS:
+        separator = '&' if '?' in url else '?'
+        variants = [('rows', url), ('columnar', f'{url}{separator}format=columnar')]
+        if name == 'report.parts_usage':
+            variants.append(('matrix', f'{url}{separator}format=columnar&matrix=1'))
+        for label, variant_url in variants:
+            stats, response = timer(lambda: client.get(variant_url))
+            compressed = compress_string(response.content)
+            stats.update({
+                'name': f'{name}.{label}',
+                'scale': scale,
+                'status': response.status_code,
+                'bytes': len(response.content),
+                'gzip_bytes': len(compressed),
+            })
+            rows.append(stats)
+            log(f"  {stats['name']:<40} {stats['median_s'] * 1000:10.1f} ms {len(response.content):>12,d} B "
+                f"-> gzip {len(compressed):>10,d} B")
+    return rows
+
+
+def run_render_suite(scales=(10000,), seed=42, repeat=3, log=None):
+    """Seed each scale and compare JSON renderers and report formats on it"""
+    log = log or (lambda message: None)
+    results = []
+    for scale in scales:
+        log(f'Seeding {scale} vehicles')
+        clear_fleet()
+        seed_fleet(vehicles=scale, seed=seed)
+        results.extend(time_rendering(scale, seed=seed, repeat=repeat, log=log))
+        results.extend(time_report_formats(scale, repeat=repeat, log=log))
+    return {
+        'meta': {
+            'created_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'seed': seed,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+class benchmark_database:
+    """
+    Context manager that points the default connection at a fresh test
+    database for the duration of a benchmark run. SQLite gets a temporary
+    file rather than the in-memory test default so timings include real I/O.
+    """
+
+    def __init__(self, verbosity=0):
+        self.verbosity = verbosity
+
+    def __enter__(self):
+        from django.test.utils import override_settings, setup_test_environment
+
+        setup_test_environment()
+        # Keep benchmark digests out of the shared cache
+        self.cache_override = override_settings(CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+        })
+        self.cache_override.enable()
+        self.tempdir = None
+        if connection.vendor == 'sqlite':
+            self.tempdir = tempfile.TemporaryDirectory()
+            connection.settings_dict.setdefault('TEST', {})['NAME'] = os.path.join(
+                self.tempdir.name, 'benchmark.sqlite3'
+            )
+        self.old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=self.verbosity, autoclobber=True, serialize=False)
+        return connection
+
+    def __exit__(self, *exc_info):
+        from django.test.utils import teardown_test_environment
+
+        connection.creation.destroy_test_db(self.old_name, verbosity=self.verbosity)
+        self.cache_override.disable()
+        teardown_test_environment()
+        if self.tempdir:
+            self.tempdir.cleanup()
+        return False
+
+
+# Connection settings for each side of the concurrency comparison. The
+# development profile resets journal_mode because WAL persists in the file.
+DATABASE_PROFILES = {
+    'development': {
+        'pragmas': {'journal_mode': 'DELETE'},
+        'conn_max_age': 0,
+        'options': {},
+    },
+    'production': {
+        'pragmas': settings.SQLITE_PRODUCTION_PRAGMAS,
+        'conn_max_age': 600,
+        'options': {'transaction_mode': 'IMMEDIATE'},
+    },
+}
+
+
+@contextmanager
+def database_profile(name):
+    """Reconnect the default SQLite database with one of DATABASE_PROFILES"""
+    from django.test.utils import override_settings
+
+    profile = DATABASE_PROFILES[name]
+    settings_dict = connection.settings_dict
+    previous = (settings_dict['CONN_MAX_AGE'], settings_dict['OPTIONS'])
+    settings_dict['CONN_MAX_AGE'] = profile['conn_max_age']
+    settings_dict['OPTIONS'] = dict(profile['options'])
+    connections.close_all()
+    try:
+        with override_settings(SQLITE_PRAGMAS=profile['pragmas']):
+            yield
+    finally:
+        connections.close_all()
+        settings_dict['CONN_MAX_AGE'], settings_dict['OPTIONS'] = previous
+
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def _reader(stop, endpoints, latencies, errors):
+    """Hit report endpoints in a loop until `stop` is set, recording latency and lock errors"""
+    client = Client()
+    index = 0
+    try:
+        while not stop.is_set():
+            name, url = endpoints[index % len(endpoints)]
+            index += 1
+            start = perf_counter()
+            try:
+                response = client.get(url)
+                failed = response.status_code >= 500
+                detail = response.content[:200].decode(errors='replace') if failed else ''
+            except Exception as e:
+                failed, detail = True, str(e)
+            latencies.append(perf_counter() - start)
+            if failed:
+                errors.append(detail)
+    finally:
+        connection.close()
+
+
+def run_concurrency(vehicles=2000, import_rows=2000, readers=4, seed=42, log=None):
+    """
+    Run the Excel import while `readers` threads hammer the report endpoints,
+    once per database profile, and compare lock errors and read latency.
+
+    Needs a file-backed SQLite database (see `benchmark_database`); with an
+    in-memory database there is no locking to measure.
+    """
+    log = log or (lambda message: None)
+    results = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        vehicles_path, parts_path = write_register_workbooks(directory, vehicles=import_rows, seed=seed)
+
+        for profile in DATABASE_PROFILES:
+            with database_profile(profile):
+                clear_fleet()
+                seed_fleet(vehicles=vehicles, seed=seed)
+                connections.close_all()
+
+                stop = threading.Event()
+                latencies, read_errors = [], []
+                threads = [
+                    threading.Thread(target=_reader, args=(stop, REPORT_ENDPOINTS, latencies, read_errors))
+                    for _ in range(readers)
+                ]
+                for thread in threads:
+                    thread.start()
+
+                output = io.StringIO()
+                start = perf_counter()
+                call_command('import_excel_data', vehicles=vehicles_path, parts=parts_path, stdout=output)
+                import_s = perf_counter() - start
+
+                stop.set()
+                for thread in threads:
+                    thread.join()
+
+            import_errors = [line for line in output.getvalue().splitlines() if 'locked' in line]
+            row = {
+                'profile': profile,
+                'import_s': round(import_s, 3),
+                'import_lock_errors': len(import_errors),
+                'reads': len(latencies),
+                'read_errors': len(read_errors),
+                'read_lock_errors': sum('locked' in error for error in read_errors),
+                'read_p50_ms': round((_percentile(latencies, 0.5) or 0) * 1000, 2),
+                'read_p95_ms': round((_percentile(latencies, 0.95) or 0) * 1000, 2),
+                'read_max_ms': round(max(latencies, default=0) * 1000, 2),
+            }
+            results.append(row)
+            log(f"  {profile:<12} import {row['import_s']:8.2f}s  lock errors {row['import_lock_errors']:4d} | "
+                f"{row['reads']:5d} reads, lock errors {row['read_lock_errors']:4d}, "
+                f"p50 {row['read_p50_ms']:8.1f} ms, p95 {row['read_p95_ms']:8.1f} ms")
+
+    return {
+        'meta': {
+            'created_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'vehicles': vehicles,
+            'import_rows': import_rows,
+            'readers': readers,
+        },
+        'results': results,
+    }
+
+
+def compare_results(current, baseline, threshold=0.2, min_delta_s=0.005):
+    """
+    Compare two result sets by (scale, name). A regression is a median that
+    grew by more than `threshold` (fractional) and by at least `min_delta_s`.
+    """
+    previous = {(row['scale'], row['name']): row for row in baseline['results']}
+    comparisons = []
+    for row in current['results']:
+        before = previous.get((row['scale'], row['name']))
+        if before is None:
+            continue
+        delta = row['median_s'] - before['median_s']
+        ratio = row['median_s'] / before['median_s'] if before['median_s'] else float('inf')
+        comparisons.append({
+            'scale': row['scale'],
+            'name': row['name'],
+            'baseline_s': before['median_s'],
+            'current_s': row['median_s'],
+            'ratio': round(ratio, 3),
+            'baseline_queries': before['queries'],
+            'current_queries': row['queries'],
+            'regression': delta >= min_delta_s and ratio > 1 + threshold,
+        })
+    return comparisons
+
+
+def write_results(results, path):
+    with open(path, 'w') as handle:
+        json.dump(results, handle, indent=2)
+
+
+def load_results(path):
+    with open(path) as handle:
+        return json.load(handle)
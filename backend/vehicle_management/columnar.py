@@ -0,0 +1,50 @@
+# vehicle_management/columnar.py
+# `?format=columnar`: tables as {columns: [...], data: {column: [values]}}
+# instead of a list of dicts repeating every key on every row. Report views
+# build it straight from tuples; other endpoints are converted by the renderer.
+from rest_framework.response import Response
+
+from .renderers import FastJSONRenderer
+
+
+def wants_columnar(request):
+    renderer = getattr(request, 'accepted_renderer', None)
+    return renderer is not None and renderer.format == ColumnarRenderer.format
+
+
+def columnar(columns, rows):
+    """Transpose tuples in `columns` order into column arrays, without a dict per row"""
+    rows = rows if isinstance(rows, list) else list(rows)
+    if not rows:
+        return {'columns': list(columns), 'data': {column: [] for column in columns}}
+    return {'columns': list(columns), 'data': dict(zip(columns, map(list, zip(*rows))))}
+
+
+def from_records(records):
+    """Columnar form of a list of dicts, keyed by the first record's keys"""
+    if not records:
+        return columnar([], [])
+    columns = list(records[0])
+    return columnar(columns, [tuple(record.get(column) for column in columns) for record in records])
+
+
+def table_response(request, columns, rows):
+    """Response with `rows` (tuples in `columns` order) as columns or as the usual list of dicts"""
+    if wants_columnar(request):
+        return Response(columnar(columns, rows))
+    return Response([dict(zip(columns, row)) for row in rows])
+
+
+class ColumnarRenderer(FastJSONRenderer):
+    """
+    Selected by ?format=columnar. Payloads already in columnar form pass
+    through; a list of dicts, or one under 'results', is converted here.
+    """
+    format = 'columnar'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, list) and all(isinstance(row, dict) for row in data):
+            data = from_records(data)
+        elif isinstance(data, dict) and isinstance(data.get('results'), list) and 'columns' not in data:
+            data = dict(data, results=from_records(data['results']))
+        return super().render(data, accepted_media_type, renderer_context)
@@ -0,0 +1,255 @@
+# vehicle_management/compat_graph.py
+# Process-local bipartite index over VehiclePartCompatibility. Each vehicle
+# and part keeps a sorted array('i') of its neighbours, built from the link
+# table in one query and patched by signals (see signals.py) afterwards.
+import heapq
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from time import perf_counter, time
+
+from django.conf import settings
+
+from .models import VehiclePartCompatibility
+
+# Other worker processes do not see this process's signals, so a graph older
+# than this many seconds is rebuilt on next use. None disables the limit.
+DEFAULT_MAX_AGE = 300
+
+
+def part_category(description):
+    """'Oil Filter - Toyota Hilux' -> 'Oil Filter'; parts in one category are interchangeable slots"""
+    return (description or '').split(' - ', 1)[0].strip() or 'Uncategorised'
+
+
+def _insert(values, value):
+    index = bisect_left(values, value)
+    if index == len(values) or values[index] != value:
+        values.insert(index, value)
+
+
+def _remove(values, value):
+    index = bisect_left(values, value)
+    if index < len(values) and values[index] == value:
+        del values[index]
+
+
+class CompatibilityGraph:
+    """
+    Vehicle <-> part adjacency held as sorted integer arrays, plus the set of
+    active vehicles and each part's category. Reads take no lock; writers
+    swap in whole structures or patch single arrays under `_lock`.
+    """
+
+    def __init__(self, max_age=DEFAULT_MAX_AGE):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.built = False
+        self.built_at = None
+        self.build_seconds = None
+        self.vehicle_parts = {}
+        self.part_vehicles = {}
+        self.part_categories = {}
+        self.category_names = []
+        self.active_vehicles = set()
+
+    # -- building ---------------------------------------------------------
+
+    def build(self, using='default'):
+        """Load every link in one joined query and replace the current index"""
+        start = perf_counter()
+        vehicle_parts, part_vehicles = {}, {}
+        part_categories, category_ids = {}, {}
+        active = set()
+
+        rows = VehiclePartCompatibility.objects.using(using).order_by('vehicle_id', 'part_id').values_list(
+            'vehicle_id', 'part_id', 'vehicle__status', 'part__description'
+        )
+        for vehicle_id, part_id, status, description in rows.iterator(chunk_size=10000):
+            vehicle_parts.setdefault(vehicle_id, array('i')).append(part_id)
+            part_vehicles.setdefault(part_id, array('i')).append(vehicle_id)
+            if status == 'active':
+                active.add(vehicle_id)
+            if part_id not in part_categories:
+                category = part_category(description)
+                part_categories[part_id] = category_ids.setdefault(category, len(category_ids))
+
+        # Rows arrive ordered by (vehicle, part), so both sides come out sorted
+        with self._lock:
+            self.vehicle_parts = vehicle_parts
+            self.part_vehicles = part_vehicles
+            self.part_categories = part_categories
+            self.category_names = list(category_ids)
+            self.active_vehicles = active
+            self.built_at = time()
+            self.build_seconds = perf_counter() - start
+            self.built = True
+        return self
+
+    def ensure_built(self, using='default'):
+        stale = self.max_age is not None and self.built and time() - self.built_at > self.max_age
+        if not self.built or stale:
+            self.build(using=using)
+        return self
+
+    def invalidate(self):
+        """Drop the index; the next query rebuilds it (used after bulk writes that skip signals)"""
+        with self._lock:
+            self._reset()
+
+    # -- incremental updates ----------------------------------------------
+
+    def add_link(self, vehicle_id, part_id, vehicle_status, part_description):
+        if not self.built:
+            return
+        with self._lock:
+            _insert(self.vehicle_parts.setdefault(vehicle_id, array('i')), part_id)
+            _insert(self.part_vehicles.setdefault(part_id, array('i')), vehicle_id)
+            if part_id not in self.part_categories:
+                category = part_category(part_description)
+                if category not in self.category_names:
+                    self.category_names.append(category)
+                self.part_categories[part_id] = self.category_names.index(category)
+            if vehicle_status == 'active':
+                self.active_vehicles.add(vehicle_id)
+
+    def remove_link(self, vehicle_id, part_id):
+        if not self.built:
+            return
+        with self._lock:
+            _remove(self.vehicle_parts.get(vehicle_id, array('i')), part_id)
+            _remove(self.part_vehicles.get(part_id, array('i')), vehicle_id)
+            if not self.vehicle_parts.get(vehicle_id):
+                self.vehicle_parts.pop(vehicle_id, None)
+                self.active_vehicles.discard(vehicle_id)
+            if not self.part_vehicles.get(part_id):
+                self.part_vehicles.pop(part_id, None)
+                self.part_categories.pop(part_id, None)
+
+    def set_vehicle_status(self, vehicle_id, status):
+        if not self.built or vehicle_id not in self.vehicle_parts:
+            return
+        with self._lock:
+            if status == 'active':
+                self.active_vehicles.add(vehicle_id)
+            else:
+                self.active_vehicles.discard(vehicle_id)
+
+    def set_part_description(self, part_id, description):
+        if not self.built or part_id not in self.part_categories:
+            return
+        with self._lock:
+            category = part_category(description)
+            if category not in self.category_names:
+                self.category_names.append(category)
+            self.part_categories[part_id] = self.category_names.index(category)
+
+    # -- queries ----------------------------------------------------------
+
+    def top_parts(self, limit=20):
+        """
+        Parts ranked by how many active vehicles they fit. Coverage is relative
+        to active vehicles that have any compatibility data.
+        """
+        active = self.active_vehicles
+        counts = [
+            (sum(1 for vehicle_id in vehicles if vehicle_id in active), part_id)
+            # Snapshot the items: a signal may add a part while we iterate
+            for part_id, vehicles in list(self.part_vehicles.items())
+        ]
+        counts.sort(key=lambda item: (-item[0], item[1]))
+        total = len(active)
+        return [
+            {
+                'part_id': part_id,
+                'active_vehicles': count,
+                'coverage': round(count / total, 4) if total else 0.0,
+            }
+            for count, part_id in counts[:limit] if count
+        ]
+
+    def vehicles_sharing_parts(self, vehicle_id=None, part_ids=None):
+        """
+        Vehicles compatible with every one of `part_ids`, or with every part of
+        `vehicle_id` (excluding that vehicle). Intersects the shortest lists first.
+        """
+        if part_ids is None:
+            part_ids = list(self.vehicle_parts.get(vehicle_id, ()))
+        if not part_ids:
+            return []
+        lists = sorted((self.part_vehicles.get(part_id, array('i')) for part_id in part_ids), key=len)
+        shared = set(lists[0])
+        for vehicles in lists[1:]:
+            if not shared:
+                break
+            shared.intersection_update(vehicles)
+        shared.discard(vehicle_id)
+        return sorted(shared)
+
+    def minimal_part_set(self, vehicle_ids):
+        """
+        Greedy set cover: pick parts until every (vehicle, part category) slot
+        among `vehicle_ids` is filled by at least one stocked part. Returns
+        (parts in pick order with the slots each newly covered, uncovered vehicles).
+        """
+        selection = {vehicle_id for vehicle_id in vehicle_ids if vehicle_id in self.vehicle_parts}
+        categories = self.part_categories
+
+        # Slots still to fill, and for each candidate part the slots it fills
+        uncovered = set()
+        candidates = {}
+        for vehicle_id in selection:
+            for part_id in self.vehicle_parts[vehicle_id]:
+                slot = (vehicle_id, categories.get(part_id))
+                uncovered.add(slot)
+                candidates.setdefault(part_id, set()).add(slot)
+
+        # Lazy greedy: gains only shrink as slots get covered, so a popped
+        # candidate whose refreshed gain still tops the heap is the best pick
+        heap = [(-len(slots), part_id) for part_id, slots in candidates.items()]
+        heapq.heapify(heap)
+        picks = []
+        while uncovered and heap:
+            _, part_id = heapq.heappop(heap)
+            slots = candidates[part_id]
+            slots &= uncovered
+            if not slots:
+                continue
+            if heap and len(slots) < -heap[0][0]:
+                heapq.heappush(heap, (-len(slots), part_id))
+                continue
+            picks.append({'part_id': part_id, 'slots_covered': len(slots)})
+            uncovered -= slots
+
+        without_data = sorted(set(vehicle_ids) - selection)
+        return picks, without_data
+
+    def stats(self):
+        """Sizes and approximate memory of the arrays and their containers"""
+        arrays = list(self.vehicle_parts.values()) + list(self.part_vehicles.values())
+        array_bytes = sum(sys.getsizeof(values) for values in arrays)
+        container_bytes = sum(sys.getsizeof(container) for container in (
+            self.vehicle_parts, self.part_vehicles, self.part_categories, self.active_vehicles
+        ))
+        return {
+            'built': self.built,
+            'built_at': self.built_at,
+            'build_ms': round(self.build_seconds * 1000, 2) if self.build_seconds is not None else None,
+            'vehicles': len(self.vehicle_parts),
+            'active_vehicles': len(self.active_vehicles),
+            'parts': len(self.part_vehicles),
+            'links': sum(len(values) for values in self.vehicle_parts.values()),
+            'categories': len(self.category_names),
+            'memory_bytes': array_bytes + container_bytes,
+        }
+
+
+graph = CompatibilityGraph(max_age=getattr(settings, 'COMPAT_GRAPH_MAX_AGE', DEFAULT_MAX_AGE))
+
+
+def get_graph(using='default'):
+    return graph.ensure_built(using=using)
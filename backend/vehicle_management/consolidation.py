@@ -0,0 +1,112 @@
+# vehicle_management/consolidation.py
+import hashlib
+import math
+
+from .models import VehiclePart, VehiclePartCompatibility
+
+DEFAULT_HORIZON_MONTHS = 6
+
+# Vehicles that will not be serviced again do not drive stock demand
+EXCLUDED_STATUSES = ('decommissioned',)
+
+
+def fingerprint(part_ids):
+    """Stable short ID for a sorted tuple of part ids, the same across processes and runs"""
+    return hashlib.blake2b(','.join(map(str, part_ids)).encode(), digest_size=8).hexdigest()
+
+
+def _expected_services(interval_months, horizon_months):
+    """Services a vehicle needs over the horizon at its service interval (fractional)"""
+    return horizon_months / interval_months if interval_months and interval_months > 0 else 0.0
+
+
+def part_consolidation(horizon_months=DEFAULT_HORIZON_MONTHS, min_vehicles=1, limit=None):
+    """
+    Group vehicles by their exact set of compatible parts and forecast the
+    stock each group needs over `horizon_months`.
+
+    One ordered pass over the link table builds every vehicle's part tuple,
+    which is hashed straight into its cluster; a second query only labels
+    the parts. Each service is assumed to consume one of each part.
+    """
+    rows = VehiclePartCompatibility.objects.exclude(
+        vehicle__status__in=EXCLUDED_STATUSES
+    ).order_by('vehicle_id', 'part_id').values_list(
+        'vehicle_id', 'part_id', 'vehicle__name', 'vehicle__service_interval_months'
+    )
+
+    clusters = {}
+
+    def close(vehicle_id, name, interval, parts):
+        cluster = clusters.get(parts)
+        if cluster is None:
+            cluster = clusters[parts] = {'vehicles': [], 'expected_services': 0.0}
+        cluster['vehicles'].append({'id': vehicle_id, 'name': name})
+        cluster['expected_services'] += _expected_services(interval, horizon_months)
+
+    current, parts = None, []
+    for vehicle_id, part_id, name, interval in rows.iterator(chunk_size=10000):
+        if current is not None and vehicle_id != current[0]:
+            close(*current, tuple(parts))
+            parts = []
+        current = (vehicle_id, name, interval)
+        parts.append(part_id)
+    if current is not None:
+        close(*current, tuple(parts))
+
+    part_info = VehiclePart.objects.in_bulk(
+        {part_id for part_ids in clusters for part_id in part_ids}
+    )
+
+    # Demand for each part summed over every cluster that uses it
+    part_demand = {}
+    results = []
+    for part_ids, cluster in clusters.items():
+        demand = math.ceil(cluster['expected_services'])
+        for part_id in part_ids:
+            part_demand[part_id] = part_demand.get(part_id, 0) + cluster['expected_services']
+        if len(cluster['vehicles']) < min_vehicles:
+            continue
+        results.append({
+            'fingerprint': fingerprint(part_ids),
+            'vehicle_count': len(cluster['vehicles']),
+            'forecast_services': round(cluster['expected_services'], 2),
+            'parts': [
+                {
+                    'part_id': part_id,
+                    'part_number': part_info[part_id].part_number,
+                    'description': part_info[part_id].description,
+                    'forecast_demand': demand,
+                }
+                for part_id in part_ids
+            ],
+            'vehicles': sorted(cluster['vehicles'], key=lambda vehicle: vehicle['name']),
+        })
+
+    results.sort(key=lambda cluster: (-cluster['vehicle_count'], cluster['fingerprint']))
+    vehicle_count = sum(len(cluster['vehicles']) for cluster in clusters.values())
+
+    stock = []
+    for part_id, expected in part_demand.items():
+        part = part_info[part_id]
+        demand = math.ceil(expected)
+        stock.append({
+            'part_id': part_id,
+            'part_number': part.part_number,
+            'forecast_demand': demand,
+            'current_stock': part.current_stock,
+            'minimum_stock': part.minimum_stock,
+            # Enough to cover the forecast and still sit at the reorder floor
+            'shortfall': max(0, demand + part.minimum_stock - part.current_stock),
+        })
+    stock.sort(key=lambda part: (-part['shortfall'], part['part_number']))
+
+    return {
+        'horizon_months': horizon_months,
+        'vehicles': vehicle_count,
+        'clusters': len(clusters),
+        'singleton_clusters': sum(1 for cluster in clusters.values() if len(cluster['vehicles']) == 1),
+        'skus': len(part_demand),
+        'results': results[:limit] if limit else results,
+        'stock': stock,
+    }
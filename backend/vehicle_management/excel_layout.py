@@ -0,0 +1,205 @@
+# vehicle_management/excel_layout.py
+# Layouts of the two registers `import_excel_data` reads, and streaming
+# readers for them. openpyxl's read-only mode walks the sheet XML row by row,
+# so sniffing or sampling a large workbook never loads it whole.
+import re
+from datetime import date, datetime
+
+import openpyxl
+
+# Asset register: first sheet, one header row
+VEHICLE_KEY_COLUMNS = ['Motor Vehicle ID', 'Registration', 'Driver', 'Insurance Company', 'Rego Expiry',
+                       'Insurance Expiry']
+VEHICLE_SEARCH_TERMS = ['Insurance', 'Expiry', 'Rego', 'Company']
+# Importer field -> the header it reads, then other names registers use for it
+VEHICLE_FIELD_HEADERS = {
+    'name': ['Motor Vehicle ID', 'Vehicle ID', 'Asset ID', 'Fleet Number', 'Unit'],
+    'registration': ['Registration', 'Rego', 'Registration Number', 'Plate'],
+    'employee_name': ['Driver', 'Employee', 'Assigned To', 'Operator'],
+    'insurance_company': ['Insurance Company', 'Insurer', 'Insurance Provider'],
+    'registration_expiry': ['Rego Expiry', 'Registration Expiry', 'Rego Due'],
+    'insurance_expiry': ['Insurance Expiry', 'Insurance Due', 'Policy Expiry'],
+}
+
+# Spares register: positional columns on this sheet, below a header and a sub-header row
+PARTS_SHEET = 'Vehicle Stock levels'
+PARTS_FIRST_DATA_ROW = 3
+PARTS_COLUMNS = ['Motor Vehicle ID', 'Rego', 'Model', 'Year',
+                 'Fuel Filter', 'Stock', 'Oil Filter', 'Stock', 'Air Filter', 'Stock',
+                 'Cabin Filter', 'Stock', 'Tyre Size', 'Rim Colour']
+# (part number column, stock column, description) for each filter slot
+PART_SLOTS = [(4, 5, 'Fuel Filter'), (6, 7, 'Oil Filter'), (8, 9, 'Air Filter'), (10, 11, 'Cabin Filter')]
+TYRE_SIZE_COLUMN, RIM_COLOUR_COLUMN = 12, 13
+
+_DATE_FORMATS = ('%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%d/%m/%Y', '%d/%m/%y', '%m/%d/%Y')
+
+
+def normalise_header(header):
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', header.lower()).split())
+
+
+# Normalised header or alias -> the header the importer reads
+_CANONICAL_HEADERS = {
+    normalise_header(alias): aliases[0] for aliases in VEHICLE_FIELD_HEADERS.values() for alias in aliases
+}
+
+
+def canonical_header(header):
+    """The importer's name for a header, so 'Rego ' and 'Registration' read as the same column"""
+    return _CANONICAL_HEADERS.get(normalise_header(header), header)
+
+
+def open_workbook(path):
+    return openpyxl.load_workbook(path, read_only=True, data_only=True)
+
+
+def cell_str(value):
+    """Cell value as the import would store it: '' for empty, whole floats without '.0'"""
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def cell_int(value, default=0):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return default
+
+
+def cell_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = cell_str(value)
+    for date_format in _DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _headers(sheet):
+    for row in sheet.iter_rows(max_row=1, values_only=True):
+        return [cell_str(value) for value in row]
+    return []
+
+
+def _row_count(sheet, header_rows=1):
+    # Read-only sheets report their <dimension>; fall back to counting when it is missing
+    if sheet.max_row is not None and sheet.max_row > 0:
+        return max(0, sheet.max_row - header_rows)
+    return max(0, sum(1 for _ in sheet.iter_rows(values_only=True)) - header_rows)
+
+
+def sniff_workbook(path):
+    """
+    Work out which register a workbook is: 'vehicles' when the first sheet
+    carries a registration column under any of its aliases, 'parts' when it
+    has the spares sheet.
+    Returns the layout plus every sheet's columns and row count.
+    """
+    workbook = open_workbook(path)
+    try:
+        sheets = []
+        for sheet in workbook.worksheets:
+            header_rows = PARTS_FIRST_DATA_ROW - 1 if sheet.title == PARTS_SHEET else 1
+            sheets.append({
+                'name': sheet.title,
+                'columns': [column for column in _headers(sheet) if column],
+                'rows': _row_count(sheet, header_rows),
+            })
+    finally:
+        workbook.close()
+
+    first_columns = sheets[0]['columns'] if sheets else []
+    canonical = {canonical_header(column) for column in first_columns}
+    found = [column for column in VEHICLE_KEY_COLUMNS if column in canonical]
+    if any(sheet['name'] == PARTS_SHEET for sheet in sheets):
+        layout = 'parts'
+    elif 'Registration' in found:
+        layout = 'vehicles'
+    else:
+        layout = 'unknown'
+
+    return {
+        'layout': layout,
+        'sheets': sheets,
+        'key_columns_found': found,
+        'key_columns_missing': [column for column in VEHICLE_KEY_COLUMNS if column not in canonical],
+        'partial_matches': {
+            term: [column for column in first_columns if term in column]
+            for term in VEHICLE_SEARCH_TERMS
+        },
+    }
+
+
+def vehicle_rows(path, limit=None):
+    """
+    Asset register rows as the fields `import_vehicles` reads, with headers
+    matched through their aliases. `row` is the spreadsheet row number,
+    matching the import's error messages.
+    """
+    workbook = open_workbook(path)
+    try:
+        sheet = workbook.worksheets[0]
+        headers = _headers(sheet)
+        index = {}
+        for position, name in enumerate(headers):
+            if name:
+                index.setdefault(canonical_header(name), position)
+
+        def get(values, column):
+            position = index.get(column)
+            return values[position] if position is not None and position < len(values) else None
+
+        for number, values in enumerate(sheet.iter_rows(min_row=2, values_only=True), start=2):
+            if limit is not None and number - 2 >= limit:
+                break
+            if not any(value is not None for value in values):
+                continue
+            yield {
+                'row': number,
+                'name': cell_str(get(values, 'Motor Vehicle ID') or (values[0] if values else None)),
+                'registration': cell_str(get(values, 'Registration')),
+                'employee_name': cell_str(get(values, 'Driver')),
+                'insurance_company': cell_str(get(values, 'Insurance Company')),
+                'registration_expiry': cell_date(get(values, 'Rego Expiry')),
+                'insurance_expiry': cell_date(get(values, 'Insurance Expiry')),
+            }
+    finally:
+        workbook.close()
+
+
+def part_rows(path, limit=None):
+    """Spares register rows: the vehicle they belong to and (part number, description, stock) per slot"""
+    workbook = open_workbook(path)
+    try:
+        sheet = workbook[PARTS_SHEET]
+        rows = sheet.iter_rows(min_row=PARTS_FIRST_DATA_ROW, values_only=True)
+        for number, values in enumerate(rows, start=PARTS_FIRST_DATA_ROW):
+            if limit is not None and number - PARTS_FIRST_DATA_ROW >= limit:
+                break
+            values = list(values) + [None] * (RIM_COLOUR_COLUMN + 1 - len(values))
+            if values[0] is None:
+                continue
+            yield {
+                'row': number,
+                'name': cell_str(values[0]),
+                'registration': cell_str(values[1]),
+                'model': cell_str(values[2]),
+                'year': cell_int(values[3]),
+                'parts': [
+                    (cell_str(values[number_column]), description, cell_int(values[stock_column]))
+                    for number_column, stock_column, description in PART_SLOTS
+                    if values[number_column] is not None
+                ],
+                'tyre_size': cell_str(values[TYRE_SIZE_COLUMN]),
+                'rim_colour': cell_str(values[RIM_COLOUR_COLUMN]),
+            }
+    finally:
+        workbook.close()
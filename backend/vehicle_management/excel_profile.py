@@ -0,0 +1,246 @@
+# vehicle_management/excel_profile.py
+# Column profiles for every sheet of a workbook, streamed through openpyxl's
+# read-only reader, and the column mapping import_excel_data would use.
+import re
+from collections import Counter
+from datetime import date, datetime, time
+from difflib import SequenceMatcher
+
+from openpyxl.utils import get_column_letter
+
+from .excel_layout import (
+    PARTS_COLUMNS, PARTS_FIRST_DATA_ROW, PARTS_SHEET, VEHICLE_FIELD_HEADERS, canonical_header, cell_date, cell_str,
+    normalise_header, open_workbook,
+)
+
+# Distinct values tracked per column before the count is reported as a lower bound
+CARDINALITY_CAP = 50000
+# Rows buffered per sheet before they are folded into the column stats
+CHUNK_ROWS = 5000
+# Minimum fuzzy score for a header to be proposed for a field
+MATCH_THRESHOLD = 0.6
+
+_DATE_LIKE = re.compile(r'^\d{1,4}[-/.]\d{1,2}[-/.]\d{1,4}( \d{1,2}:\d{2}(:\d{2})?)?$')
+
+DATE_FIELDS = {'registration_expiry', 'insurance_expiry'}
+
+
+class _ColumnStats:
+    __slots__ = ('values', 'nulls', 'types', 'dates', 'distinct', 'capped', 'examples')
+
+    def __init__(self):
+        self.values = 0
+        self.nulls = 0
+        self.types = Counter()
+        self.dates = 0
+        self.distinct = set()
+        self.capped = False
+        self.examples = []
+
+    def add_many(self, values):
+        """Fold a chunk of one column's cells in, leaning on C-level set/Counter work per chunk"""
+        self.values += len(values)
+        by_type = Counter(map(type, values))
+        present = [value for value in values if value is not None]
+        if str in by_type:
+            present = [value.strip() if type(value) is str else value for value in present]
+            present = [value for value in present if value != '']
+        self.nulls += len(values) - len(present)
+
+        for kind, count in by_type.items():
+            if kind is bool:
+                self.types['boolean'] += count
+            elif kind is int:
+                self.types['integer'] += count
+            elif kind is float:
+                whole = sum(1 for value in present if type(value) is float and value.is_integer())
+                self.types['integer'] += whole
+                self.types['decimal'] += count - whole
+            elif kind in (datetime, date, time):
+                self.types['date'] += count
+                self.dates += count
+        texts = [value for value in present if type(value) is str]
+        # Only strings shaped like a date are handed to strptime; the rest fail on the regex
+        dates = sum(1 for value in texts if _DATE_LIKE.match(value) and cell_date(value))
+        self.dates += dates
+        self.types['date'] += dates
+        self.types['text'] += len(texts) - dates
+        self.types = +self.types
+
+        if not self.capped:
+            self.distinct.update(present)
+            self.capped = len(self.distinct) >= CARDINALITY_CAP
+        for value in present:
+            if len(self.examples) >= 3:
+                break
+            if value not in self.examples:
+                self.examples.append(value)
+
+    def summary(self):
+        present = self.values - self.nulls
+        inferred = self.types.most_common(1)[0][0] if self.types else 'empty'
+        if present and self.types[inferred] < 0.9 * present:
+            inferred = f'mixed ({inferred})'
+        return {
+            'type': inferred,
+            'types': dict(self.types),
+            'null_rate': round(self.nulls / self.values, 4) if self.values else 1.0,
+            'cardinality': len(self.distinct),
+            'cardinality_capped': self.capped,
+            'date_rate': round(self.dates / present, 4) if present else 0.0,
+            'examples': [_example(value) for value in self.examples],
+        }
+
+
+def _example(value):
+    if isinstance(value, datetime) and value.time() == time():
+        value = value.date()
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    return cell_str(value)
+
+
+def profile_workbook(path, sample=None):
+    """
+    Profile every column of every sheet: inferred type, null rate,
+    cardinality and the share of values that parse as dates. With `sample`,
+    only the first `sample` data rows of each sheet are read.
+    """
+    workbook = open_workbook(path)
+    sheets = []
+    try:
+        for sheet in workbook.worksheets:
+            first_data_row = PARTS_FIRST_DATA_ROW if sheet.title == PARTS_SHEET else 2
+            rows = sheet.iter_rows(values_only=True)
+            headers = [cell_str(value) for value in next(rows, ())]
+            for _ in range(first_data_row - 2):
+                next(rows, None)
+
+            stats = [_ColumnStats() for _ in headers]
+            scanned = 0
+            chunk = []
+
+            def flush():
+                width = max(len(stats), max(map(len, chunk)))
+                headers.extend([''] * (width - len(headers)))
+                # Columns first seen in this chunk were empty in every earlier row
+                for _ in range(width - len(stats)):
+                    stats.append(_ColumnStats())
+                    stats[-1].add_many([None] * (scanned - len(chunk)))
+                padded = [row + (None,) * (width - len(row)) for row in chunk]
+                for column, values in zip(stats, zip(*padded)):
+                    column.add_many(values)
+                chunk.clear()
+
+            for values in rows:
+                if sample is not None and scanned >= sample:
+                    break
+                if not any(value is not None for value in values):
+                    continue
+                scanned += 1
+                chunk.append(values)
+                if len(chunk) >= CHUNK_ROWS:
+                    flush()
+            if chunk:
+                flush()
+
+            sheets.append({
+                'name': sheet.title,
+                'first_data_row': first_data_row,
+                'rows_scanned': scanned,
+                'sampled': sample is not None and scanned >= sample,
+                'columns': [
+                    dict(column.summary(), index=index, letter=get_column_letter(index + 1), header=header)
+                    for index, (header, column) in enumerate(zip(headers, stats))
+                ],
+            })
+    finally:
+        workbook.close()
+    return {'file': str(path), 'sheets': sheets}
+
+
+def header_score(header, candidates):
+    """Best fuzzy match of `header` against candidate names, 0..1; whole-word containment scores 0.9"""
+    header = normalise_header(header)
+    if not header:
+        return 0.0
+    words = set(header.split())
+    best = 0.0
+    for candidate in map(normalise_header, candidates):
+        if header == candidate:
+            return 1.0
+        score = SequenceMatcher(None, header, candidate).ratio()
+        if set(candidate.split()) <= words:
+            score = max(score, 0.9)
+        best = max(best, score)
+    return best
+
+
+def _vehicle_mapping(sheet):
+    """
+    Assign importer fields to the sheet's columns, best score first, each
+    column used once. Date fields are steered towards columns that parse as dates.
+    """
+    scored = []
+    for field, candidates in VEHICLE_FIELD_HEADERS.items():
+        for column in sheet['columns']:
+            score = header_score(column['header'], candidates)
+            wants_date = field in DATE_FIELDS
+            if column['type'] != 'empty' and (column['date_rate'] >= 0.5) != wants_date:
+                score *= 0.7
+            if score >= MATCH_THRESHOLD:
+                scored.append((score, field, column))
+
+    mapping, used = {}, set()
+    for score, field, column in sorted(scored, key=lambda item: -item[0]):
+        if field in mapping or column['index'] in used:
+            continue
+        used.add(column['index'])
+        mapping[field] = {
+            'column': column['header'],
+            'letter': column['letter'],
+            'score': round(score, 3),
+            'exact': canonical_header(column['header']) == VEHICLE_FIELD_HEADERS[field][0],
+        }
+    return {
+        'sheet': sheet['name'],
+        'fields': {field: mapping.get(field) for field in VEHICLE_FIELD_HEADERS},
+        # The importer reads the listed headers and aliases, so a fuzzy match means renaming the column first
+        'rename': {
+            entry['column']: VEHICLE_FIELD_HEADERS[field][0]
+            for field, entry in mapping.items() if not entry['exact']
+        },
+    }
+
+
+def _parts_mapping(sheet):
+    """The spares import reads by position; check each position holds the expected column"""
+    columns = sheet['columns']
+    positions = []
+    for index, expected in enumerate(PARTS_COLUMNS):
+        found = columns[index]['header'] if index < len(columns) else ''
+        entry = {
+            'letter': get_column_letter(index + 1),
+            'expected': expected,
+            'found': found,
+            'score': round(header_score(found, [expected]), 3),
+        }
+        if entry['score'] < MATCH_THRESHOLD:
+            best = max(columns, key=lambda column: header_score(column['header'], [expected]), default=None)
+            if best is not None and header_score(best['header'], [expected]) >= MATCH_THRESHOLD:
+                entry['best_match'] = best['letter']
+        positions.append(entry)
+    return {'sheet': sheet['name'], 'positions': positions,
+            'ok': all(entry['score'] >= MATCH_THRESHOLD for entry in positions)}
+
+
+def propose_mapping(profile):
+    """Column mapping for the asset register (first sheet) and the spares sheet, when present"""
+    mapping = {}
+    sheets = profile['sheets']
+    if sheets and sheets[0]['name'] != PARTS_SHEET:
+        mapping['vehicles'] = _vehicle_mapping(sheets[0])
+    for sheet in sheets:
+        if sheet['name'] == PARTS_SHEET:
+            mapping['parts'] = _parts_mapping(sheet)
+    return mapping
@@ -0,0 +1,320 @@
+# vehicle_management/fuel.py
+# Fuel card statements streamed in from CSV or Excel, matched to vehicles by
+# card number, and summarised per vehicle as L/100km and cost per km.
+import csv
+import re
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from pathlib import Path
+
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, OuterRef, Q, Subquery, Sum
+from django.utils import timezone
+
+from .excel_layout import cell_str, open_workbook
+from .models import FuelTransaction, Vehicle
+
+BATCH_SIZE = 5000
+# Fills this far over the tank capacity are flagged; tank necks and pump cut-offs vary a little
+TANK_TOLERANCE = Decimal('1.05')
+# Vehicles that should not be buying fuel
+OFF_ROAD_STATUSES = ('maintenance', 'off_road', 'decommissioned')
+# Invalid lines reported back in full; the rest are only counted
+MAX_ERRORS = 20
+
+# Statement field -> the headers card providers use for it
+STATEMENT_HEADERS = {
+    'card_number': ['Card Number', 'Card No', 'Card', 'Fuel Card', 'Card Num'],
+    'date': ['Transaction Date', 'Date', 'Date Time', 'Transaction Date Time', 'Txn Date'],
+    'time': ['Time', 'Transaction Time', 'Txn Time'],
+    'litres': ['Litres', 'Liters', 'Quantity', 'Qty', 'Volume'],
+    'amount': ['Amount', 'Total', 'Total Amount', 'Value', 'Cost'],
+    'odometer': ['Odometer', 'Odo', 'Kms', 'Km', 'Odometer Reading'],
+    'site': ['Site', 'Site Name', 'Merchant', 'Location'],
+    'product': ['Product', 'Product Description', 'Fuel Type', 'Grade'],
+}
+REQUIRED_FIELDS = ('card_number', 'date', 'litres', 'amount')
+
+_DATETIME_FORMATS = ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%dT%H:%M:%S', '%d/%m/%Y %H:%M:%S',
+                     '%d/%m/%Y %H:%M', '%Y-%m-%d', '%d/%m/%Y', '%d/%m/%y')
+_TIME_FORMATS = ('%H:%M:%S', '%H:%M')
+
+
+def card_key(value):
+    """'7034 0000-0001 23' -> '70340000000123', so statements and the register agree on a card"""
+    return re.sub(r'[^0-9A-Za-z]', '', cell_str(value)).upper()
+
+
+def _header_key(header):
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', cell_str(header).lower()).split())
+
+
+def statement_columns(headers):
+    """Statement field -> column index for a header row; ValueError when a required field is missing"""
+    aliases = {_header_key(alias): field for field, names in STATEMENT_HEADERS.items() for alias in names}
+    columns = {}
+    for index, header in enumerate(headers):
+        field = aliases.get(_header_key(header))
+        if field and field not in columns:
+            columns[field] = index
+    missing = [field for field in REQUIRED_FIELDS if field not in columns]
+    if missing:
+        raise ValueError(f"Statement has no column for: {', '.join(missing)}")
+    return columns
+
+
+def _rows(path):
+    """Rows of the CSV or the workbook's first sheet, header first, streamed"""
+    if Path(path).suffix.lower() in ('.xlsx', '.xlsm'):
+        workbook = open_workbook(path)
+        try:
+            yield from workbook.worksheets[0].iter_rows(values_only=True)
+        finally:
+            workbook.close()
+    else:
+        with open(path, newline='', encoding='utf-8-sig') as handle:
+            yield from csv.reader(handle)
+
+
+def statement_rows(path):
+    """Yield (line number, {field: raw value}) for every non-blank statement line"""
+    rows = _rows(path)
+    columns = statement_columns(next(rows, ()))
+    for line, values in enumerate(rows, start=2):
+        if not any(value not in (None, '') for value in values):
+            continue
+        yield line, {field: values[index] if index < len(values) else None for field, index in columns.items()}
+
+
+def _decimal(value, field):
+    if isinstance(value, (int, float, Decimal)):
+        return Decimal(str(value)).quantize(Decimal('0.01'))
+    try:
+        return Decimal(cell_str(value).replace('$', '').replace(',', '')).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        raise ValueError(f'{field} is not a number: {value!r}')
+
+
+def _strptime(text, formats, kind):
+    """Parse with the first matching format, moving it to the front: a statement uses one format throughout"""
+    for index, fmt in enumerate(formats):
+        try:
+            parsed = datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+        if index:
+            formats.insert(0, formats.pop(index))
+        return parsed
+    raise ValueError(f'Unrecognised {kind}: {text!r}')
+
+
+class LineParser:
+    """Turns statement lines into FuelTransaction field values, remembering the date formats seen"""
+
+    def __init__(self):
+        self.datetime_formats = list(_DATETIME_FORMATS)
+        self.time_formats = list(_TIME_FORMATS)
+        # Statements are in local time
+        self.zone = timezone.get_current_timezone()
+        # A card appears on many lines; normalise each spelling once
+        self.cards = {}
+
+    def moment(self, value, time_value=None):
+        if isinstance(value, datetime):
+            moment = value
+        elif isinstance(value, date):
+            moment = datetime.combine(value, time())
+        else:
+            moment = _strptime(cell_str(value), self.datetime_formats, 'date')
+
+        if isinstance(time_value, time):
+            moment = datetime.combine(moment.date(), time_value)
+        elif time_value not in (None, ''):
+            moment = datetime.combine(moment.date(), _strptime(cell_str(time_value), self.time_formats, 'time').time())
+        return timezone.make_aware(moment, self.zone) if timezone.is_naive(moment) else moment
+
+    def __call__(self, row):
+        """FuelTransaction field values for one line; ValueError when it cannot be read"""
+        raw_card = row['card_number']
+        card = self.cards.get(raw_card)
+        if card is None:
+            card = self.cards[raw_card] = card_key(raw_card)
+        if not card:
+            raise ValueError('Missing card number')
+        odometer = cell_str(row.get('odometer')).replace(',', '')
+        return {
+            'card_number': card,
+            'transacted_at': self.moment(row['date'], row.get('time')),
+            'litres': _decimal(row['litres'], 'litres'),
+            'amount': _decimal(row['amount'], 'amount'),
+            'odometer': int(float(odometer)) if odometer else None,
+            'site': cell_str(row.get('site'))[:200],
+            'product': cell_str(row.get('product'))[:50],
+        }
+
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def ingest_statement(path, batch_size=BATCH_SIZE, log=None):
+    """
+    Load a statement in one transaction. Cards are matched to vehicles
+    through a dict built from a single query, and lines are written with
+    bulk_create in batches; lines already loaded are skipped.
+    """
+    log = log or (lambda message: None)
+    cards = {
+        card_key(card): pk
+        for pk, card in Vehicle.objects.exclude(fuel_card_number='').values_list('pk', 'fuel_card_number')
+    }
+    source = Path(path).name[:255]
+    summary = {'file': str(path), 'lines': 0, 'matched': 0, 'unmatched': 0, 'invalid': 0, 'errors': []}
+    unmatched_cards = set()
+    parse_line = LineParser()
+
+    def transactions():
+        for line, row in statement_rows(path):
+            summary['lines'] += 1
+            try:
+                fields = parse_line(row)
+            except (ValueError, TypeError) as e:
+                summary['invalid'] += 1
+                if len(summary['errors']) < MAX_ERRORS:
+                    summary['errors'].append(f'Line {line}: {e}')
+                continue
+            vehicle_id = cards.get(fields['card_number'])
+            if vehicle_id is None:
+                summary['unmatched'] += 1
+                unmatched_cards.add(fields['card_number'])
+            else:
+                summary['matched'] += 1
+            yield FuelTransaction(vehicle_id=vehicle_id, source=source, **fields)
+
+    before = FuelTransaction.objects.count()
+    with transaction.atomic():
+        for batch in _batched(transactions(), batch_size):
+            FuelTransaction.objects.bulk_create(batch, ignore_conflicts=True)
+            log(f'Read {summary["lines"]} lines')
+    summary['inserted'] = FuelTransaction.objects.count() - before
+    summary['duplicates'] = summary['matched'] + summary['unmatched'] - summary['inserted']
+    summary['unmatched_cards'] = sorted(unmatched_cards)[:MAX_ERRORS]
+    return summary
+
+
+def _window(start_date, end_date):
+    """Aware datetimes bounding whole local days, so transacted_at's index is usable"""
+    return (timezone.make_aware(datetime.combine(start_date, time())),
+            timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time())))
+
+
+FUEL_EFFICIENCY_COLUMNS = ['vehicle_id', 'vehicle_name', 'registration', 'fills', 'litres', 'amount',
+                           'distance_km', 'l_per_100km', 'cost_per_km']
+
+
+def fuel_efficiency(start_date, end_date):
+    """
+    Per-vehicle fuel use from one grouped query. Distance is the odometer
+    spread over the period; the first fill bought fuel burnt before it, so
+    its litres and cost are left out of the rates (the full-tank method).
+    Rows are tuples in FUEL_EFFICIENCY_COLUMNS order, thirstiest first.
+    """
+    start, end = _window(start_date, end_date)
+    fills = FuelTransaction.objects.filter(vehicle__isnull=False, transacted_at__gte=start, transacted_at__lt=end)
+    first_fill = fills.filter(vehicle=OuterRef('vehicle')).order_by('transacted_at', 'id')
+    totals = fills.values('vehicle').annotate(
+        fill_count=Count('id'),
+        total_litres=Sum('litres'),
+        total_amount=Sum('amount'),
+        first_odometer=Min('odometer'),
+        last_odometer=Max('odometer'),
+        first_litres=Subquery(first_fill.values('litres')[:1]),
+        first_amount=Subquery(first_fill.values('amount')[:1]),
+    ).order_by().values_list(
+        'vehicle_id', 'vehicle__name', 'vehicle__registration', 'fill_count', 'total_litres', 'total_amount',
+        'first_odometer', 'last_odometer', 'first_litres', 'first_amount',
+    )
+
+    rows = []
+    for (vehicle_id, name, registration, count, litres, amount,
+         first_odometer, last_odometer, first_litres, first_amount) in totals:
+        distance = last_odometer - first_odometer if first_odometer is not None else None
+        if distance:
+            l_per_100km = round(float(litres - first_litres) / distance * 100, 2)
+            cost_per_km = round(float(amount - first_amount) / distance, 3)
+        else:
+            l_per_100km = cost_per_km = None
+        rows.append((vehicle_id, name, registration, count, float(litres), float(amount),
+                     distance, l_per_100km, cost_per_km))
+    rows.sort(key=lambda row: (row[7] is None, -(row[7] or 0), row[0]))
+    return rows
+
+
+def fuel_anomalies_queryset(start_date, end_date):
+    """
+    Transactions in the period that need a look: cards matching no vehicle,
+    fills beyond the tank capacity, fuel bought for vehicles that are off the
+    road, and odometers lower than the vehicle's previous fill.
+    """
+    start, end = _window(start_date, end_date)
+    previous_fill = FuelTransaction.objects.filter(
+        vehicle=OuterRef('vehicle'), transacted_at__lt=OuterRef('transacted_at'), odometer__isnull=False,
+    ).order_by('-transacted_at', '-id')
+    return FuelTransaction.objects.filter(transacted_at__gte=start, transacted_at__lt=end).annotate(
+        previous_odometer=Subquery(previous_fill.values('odometer')[:1]),
+    ).filter(
+        Q(vehicle__isnull=True)
+        | Q(litres__gt=F('vehicle__fuel_tank_capacity') * TANK_TOLERANCE)
+        | Q(vehicle__status__in=OFF_ROAD_STATUSES)
+        | Q(odometer__lt=F('previous_odometer'))
+    ).order_by('-transacted_at', '-id')
+
+
+ANOMALY_FIELDS = ('id', 'transacted_at', 'card_number', 'vehicle_id', 'vehicle__name', 'vehicle__status',
+                  'vehicle__fuel_tank_capacity', 'litres', 'amount', 'odometer', 'previous_odometer', 'site')
+
+
+def _reasons(row):
+    reasons = []
+    if row['vehicle_id'] is None:
+        reasons.append('unmatched_card')
+    capacity = row['vehicle__fuel_tank_capacity']
+    if capacity is not None and row['litres'] > capacity * TANK_TOLERANCE:
+        reasons.append('over_tank_capacity')
+    if row['vehicle__status'] in OFF_ROAD_STATUSES:
+        reasons.append('vehicle_not_active')
+    previous = row['previous_odometer']
+    if row['odometer'] is not None and previous is not None and row['odometer'] < previous:
+        reasons.append('odometer_rollback')
+    return reasons
+
+
+def fuel_anomalies(start_date, end_date, page=1, page_size=50):
+    queryset = fuel_anomalies_queryset(start_date, end_date)
+    offset = (page - 1) * page_size
+    results = []
+    for row in queryset.values(*ANOMALY_FIELDS)[offset:offset + page_size]:
+        results.append({
+            'id': row['id'],
+            'transacted_at': row['transacted_at'],
+            'card_number': row['card_number'],
+            'vehicle_id': row['vehicle_id'],
+            'vehicle_name': row['vehicle__name'],
+            'vehicle_status': row['vehicle__status'],
+            'tank_capacity': row['vehicle__fuel_tank_capacity'],
+            'litres': row['litres'],
+            'amount': row['amount'],
+            'odometer': row['odometer'],
+            'previous_odometer': row['previous_odometer'],
+            'site': row['site'],
+            'reasons': _reasons(row),
+        })
+    return {
+        'count': queryset.count(),
+        'page': page,
+        'page_size': page_size,
+        'results': results,
+    }
@@ -0,0 +1,207 @@
+# vehicle_management/import_diff.py
+# What `import_excel_data` would change, computed with a fixed number of bulk
+# reads instead of a query per row. Rows come from excel_layout's readers.
+from datetime import date
+
+from .matching import MatchReport, VehicleIndex
+from .models import Vehicle, VehiclePart, VehiclePartCompatibility
+
+# Values import_vehicles writes on every create *and* update
+VEHICLE_IMPORT_DEFAULTS = {
+    'make': 'Toyota',
+    'model': 'Unknown',
+    'year': 2020,
+    'status': 'active',
+}
+VEHICLE_ROW_FIELDS = ['name', 'employee_name', 'insurance_company', 'registration_expiry', 'insurance_expiry']
+
+# Values import_parts writes besides the part number and stock
+PART_IMPORT_DEFAULTS = {
+    'supplier': 'Unknown',
+    'minimum_stock': 1,
+    'cost': None,
+}
+
+# Keys per `__in` lookup, under SQLite's oldest bound-parameter limit
+IN_BATCH_SIZE = 900
+
+
+def _in_batches(queryset, lookup, keys):
+    """Yield queryset.filter(**{lookup: batch}) over `keys` in IN_BATCH_SIZE slices"""
+    keys = list(keys)
+    for start in range(0, len(keys), IN_BATCH_SIZE):
+        yield queryset.filter(**{lookup: keys[start:start + IN_BATCH_SIZE]})
+
+
+def _empty_summary():
+    return {'create': 0, 'update': 0, 'unchanged': 0, 'skipped': 0, 'changes': []}
+
+
+def _record(summary, action, example, max_examples, key='changes'):
+    summary[action] = summary.get(action, 0) + 1
+    if action not in ('unchanged', 'existing') and (max_examples is None or len(summary[key]) < max_examples):
+        summary[key].append(dict(example, action=action))
+
+
+def diff_vehicles(rows, max_examples=50, today=None, removed=False, index=None):
+    """
+    Classify asset register rows as create / update / unchanged / skipped /
+    ambiguous, matching them to vehicles as the import does. Rows are
+    applied in order to `index` (built from the database when not given),
+    so a vehicle repeated later in the file is compared against the earlier
+    row, and a parts diff run with the same index sees the planned fleet.
+    With `removed`, also list vehicles in the database but not in the
+    register; the import leaves those alone.
+    """
+    rows = list(rows)
+    today = today or date.today()
+    index = VehicleIndex.from_database() if index is None else index
+    report = MatchReport()
+    fields = VEHICLE_ROW_FIELDS + list(VEHICLE_IMPORT_DEFAULTS) + ['registration', 'purchase_date']
+    matched = {index.resolve(row['name'], row['registration']).key for row in rows}
+    current = {}
+    for batch in _in_batches(Vehicle.objects.all(), 'pk__in', matched - {None}):
+        current.update((vehicle['pk'], vehicle) for vehicle in batch.values('pk', *fields))
+
+    summary = _empty_summary()
+    summary['ambiguous'] = 0
+    for row in rows:
+        if not row['name'] or not row['registration']:
+            _record(summary, 'skipped', {'row': row['row'], 'reason': 'Missing vehicle ID or registration'},
+                    max_examples)
+            continue
+
+        incoming = {field: row[field] for field in VEHICLE_ROW_FIELDS}
+        incoming.update(VEHICLE_IMPORT_DEFAULTS, registration=row['registration'], purchase_date=today)
+        example = {'row': row['row'], 'registration': row['registration'], 'name': row['name']}
+        match = index.resolve(row['name'], row['registration'])
+        report.record(index, match, row['row'], row['name'], row['registration'])
+        if match.candidates and match.key is None:
+            _record(summary, 'ambiguous', example, max_examples)
+            continue
+
+        key = match.key
+        if key is None:
+            key = f"new:{row['registration']}"
+            report.claim(key, row['row'])
+            _record(summary, 'create', example, max_examples)
+        else:
+            existing = current[key]
+            changes = {
+                field: [existing[field], value]
+                for field, value in incoming.items()
+                if existing[field] != value and not (existing[field] in ('', None) and value in ('', None))
+            }
+            _record(summary, 'update' if changes else 'unchanged', dict(example, fields=changes), max_examples)
+        current[key] = incoming
+        index.add(key, row['name'], row['registration'])
+    summary['matching'] = report.as_dict(max_examples)
+
+    if removed:
+        summary['removed'] = 0
+        fleet = Vehicle.objects.order_by('registration').values_list('pk', 'registration', 'name')
+        for pk, registration, name in fleet:
+            if pk not in report.claimed:
+                _record(summary, 'removed', {'registration': registration, 'name': name}, max_examples)
+    return summary
+
+
+def _vehicles_for(rows, index):
+    """
+    Vehicle each spares row links to, by registration or else name, as
+    import_parts matches them. Keys in `index` that are not pks are
+    vehicles a preceding asset register diff planned to create.
+    Returns ({row number: [vehicle key]}, MatchReport).
+    """
+    report = MatchReport()
+    matches = {}
+    for row in rows:
+        match = index.resolve(row['name'], row['registration'])
+        report.record(index, match, row['row'], row['name'], row['registration'])
+        matches[row['row']] = [] if match.key is None else [match.key]
+    return matches, report
+
+
+def diff_parts(rows, max_examples=50, planned=None, removed=False):
+    """
+    Classify the part numbers on spares register rows as create / update /
+    unchanged, and the compatibility links the import would add. `planned`
+    is the VehicleIndex a diff_vehicles() of an asset register imported
+    first left behind. With
+    `removed`, also list parts absent from the register and links the
+    register no longer lists for the vehicles it covers.
+    """
+    rows = list(rows)
+    part_numbers = {number for row in rows for number, _, _ in row['parts']}
+    fields = ['description', 'current_stock'] + list(PART_IMPORT_DEFAULTS)
+    current = {}
+    for batch in _in_batches(VehiclePart.objects.all(), 'part_number__in', part_numbers):
+        current.update((part['part_number'], part) for part in batch.values('part_number', *fields))
+
+    index = VehicleIndex.from_database() if planned is None else planned
+    matches, report = _vehicles_for(rows, index)
+    existing_links = {}
+    saved_vehicles = [key for keys in matches.values() for key in keys if isinstance(key, int)]
+    for batch in _in_batches(VehiclePartCompatibility.objects.all(), 'vehicle_id__in', saved_vehicles):
+        for vehicle_id, number in batch.values_list('vehicle_id', 'part__part_number'):
+            existing_links.setdefault(vehicle_id, set()).add(number)
+    current_tyres = {}
+    for batch in _in_batches(Vehicle.objects.all(), 'pk__in', saved_vehicles):
+        for pk, size, colour in batch.values_list('pk', 'tyre_size', 'rim_color'):
+            current_tyres[pk] = (size, colour)
+
+    summary = _empty_summary()
+    summary.update(links={'create': 0, 'existing': 0, 'changes': []}, rows_without_vehicle=0,
+                   tyres={'update': 0, 'unchanged': 0, 'changes': []})
+    listed = {}
+    tyres = {}
+    for row in rows:
+        for number, description, stock in row['parts']:
+            incoming = dict(PART_IMPORT_DEFAULTS, description=description, current_stock=stock)
+            existing = current.get(number)
+            example = {'row': row['row'], 'part_number': number}
+            if existing is None:
+                _record(summary, 'create', example, max_examples)
+            else:
+                changes = {
+                    field: [existing[field], value] for field, value in incoming.items() if existing[field] != value
+                }
+                _record(summary, 'update' if changes else 'unchanged', dict(example, fields=changes), max_examples)
+            current[number] = dict(incoming, part_number=number)
+
+        linked = matches[row['row']]
+        if not linked:
+            summary['rows_without_vehicle'] += 1
+        for vehicle in linked:
+            if row['tyre_size'] or row['rim_colour']:
+                tyres[vehicle] = (row['tyre_size'], row['rim_colour'])
+            numbers = listed.setdefault(vehicle, set())
+            for number, _, _ in row['parts']:
+                action = 'existing' if number in numbers or number in existing_links.get(vehicle, ()) else 'create'
+                numbers.add(number)
+                _record(summary['links'], action,
+                        {'row': row['row'], 'registration': index.registration(vehicle), 'part_number': number},
+                        max_examples)
+
+    # Blank cells keep the vehicle's current tyre size or rim colour
+    for vehicle, (size, colour) in tyres.items():
+        old = current_tyres.get(vehicle, ('', ''))
+        new = (size or old[0], colour or old[1])
+        changes = {field: [before, after] for field, before, after in zip(('tyre_size', 'rim_color'), old, new)
+                   if before != after}
+        _record(summary['tyres'], 'update' if changes else 'unchanged',
+                {'registration': index.registration(vehicle), 'fields': changes}, max_examples)
+
+    summary['matching'] = report.as_dict(max_examples)
+
+    if removed:
+        summary['removed'] = 0
+        for number in VehiclePart.objects.order_by('part_number').values_list('part_number', flat=True):
+            if number not in part_numbers:
+                _record(summary, 'removed', {'part_number': number}, max_examples)
+        summary['links']['removed'] = 0
+        for vehicle, numbers in existing_links.items():
+            for number in sorted(numbers - listed.get(vehicle, set())):
+                _record(summary['links'], 'removed',
+                        {'registration': index.registration(vehicle), 'part_number': number}, max_examples)
+    return summary
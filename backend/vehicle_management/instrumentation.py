@@ -0,0 +1,178 @@
+# vehicle_management/instrumentation.py
+import threading
+from bisect import bisect_left
+from collections import deque
+from contextvars import ContextVar
+from time import monotonic, perf_counter
+
+from django.conf import settings
+
+METRIC_PREFIX = 'vehicle_management'
+
+# Histograms cover the last METRICS_WINDOW_SECONDS, expiring in WINDOW_SLOTS steps
+METRICS_WINDOW = getattr(settings, 'METRICS_WINDOW_SECONDS', 300)
+WINDOW_SLOTS = 10
+
+# Upper bounds for each histogram; the implicit +Inf bucket catches everything above
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+class QueryRecorder:
+    """
+    `connection.execute_wrapper` hook counting queries and summing the time
+    spent inside the database driver.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += perf_counter() - start
+            self.count += 1
+
+
+class SerializationTimer:
+    """
+    Time spent in serializers' `to_representation` during one request.
+    Only the outermost call is timed, so nested serializers count once.
+    """
+
+    def __init__(self):
+        self.duration = 0.0
+        self._depth = 0
+
+    def __call__(self, represent, instance):
+        if self._depth:
+            return represent(instance)
+        self._depth += 1
+        start = perf_counter()
+        try:
+            return represent(instance)
+        finally:
+            self._depth -= 1
+            self.duration += perf_counter() - start
+
+
+# Set by RequestMetricsMiddleware for the duration of a request
+serialization_timer = ContextVar('serialization_timer', default=None)
+
+
+class TimedSerializerMixin:
+    """Serializer mixin counting representation time towards the request's `serialize` timing"""
+
+    def to_representation(self, instance):
+        timer = serialization_timer.get()
+        if timer is None:
+            return super().to_representation(instance)
+        return timer(super().to_representation, instance)
+
+
+class Histogram:
+    """
+    Rolling histogram: per-bucket counts plus sum and count over the last
+    `window` seconds, kept as `slots` sub-histograms that expire in turn.
+    """
+
+    def __init__(self, buckets, window=METRICS_WINDOW, slots=WINDOW_SLOTS, clock=monotonic):
+        self.buckets = buckets
+        self.slots = slots
+        self.slot_seconds = window / slots
+        self.clock = clock
+        self._slots = deque()  # (slot number, bucket counts, [sum, count]), oldest first
+
+    def _current_slot(self):
+        slot = int(self.clock() // self.slot_seconds)
+        while self._slots and self._slots[0][0] <= slot - self.slots:
+            self._slots.popleft()
+        return slot
+
+    def observe(self, value):
+        slot = self._current_slot()
+        if not self._slots or self._slots[-1][0] != slot:
+            self._slots.append((slot, [0] * (len(self.buckets) + 1), [0.0, 0]))
+        _, counts, totals = self._slots[-1]
+        counts[bisect_left(self.buckets, value)] += 1
+        totals[0] += value
+        totals[1] += 1
+
+    def snapshot(self):
+        """(per-bucket counts, sum, count) over the window"""
+        self._current_slot()
+        counts = [0] * (len(self.buckets) + 1)
+        total, count = 0.0, 0
+        for _, slot_counts, (slot_sum, slot_count) in self._slots:
+            counts = [a + b for a, b in zip(counts, slot_counts)]
+            total += slot_sum
+            count += slot_count
+        return counts, total, count
+
+
+class MetricsRegistry:
+    """
+    Process-local per-view request metrics over a rolling window, rendered in
+    Prometheus text format. Windowed counts go down as old requests expire,
+    so the bucket, sum and count series are exposed as gauges rather than a
+    counter-based histogram; histogram_quantile() works on them unchanged.
+    """
+
+    METRICS = (
+        ('request_duration_seconds', 'Wall-clock time spent handling the request', DURATION_BUCKETS),
+        ('sql_queries', 'Number of SQL queries executed per request', QUERY_COUNT_BUCKETS),
+        ('sql_duration_seconds', 'Time spent executing SQL per request', DURATION_BUCKETS),
+        ('serialize_duration_seconds', 'Time spent in DRF serializers building the response data', DURATION_BUCKETS),
+        ('render_duration_seconds', 'Time spent encoding the response body', DURATION_BUCKETS),
+        ('response_size_bytes', 'Size of the response body', SIZE_BUCKETS),
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}  # (metric, view) -> Histogram
+
+    def observe(self, view, **values):
+        with self._lock:
+            for metric, _, buckets in self.METRICS:
+                if metric not in values:
+                    continue
+                key = (metric, view)
+                if key not in self._histograms:
+                    self._histograms[key] = Histogram(buckets)
+                self._histograms[key].observe(values[metric])
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def render(self):
+        """Return every histogram in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for metric, description, buckets in self.METRICS:
+                name = f'{METRIC_PREFIX}_{metric}'
+                series = {'bucket': [], 'sum': [], 'count': []}
+                for (key_metric, view), histogram in sorted(self._histograms.items()):
+                    if key_metric != metric:
+                        continue
+                    label = view.replace('\\', '\\\\').replace('"', '\\"')
+                    counts, total, count = histogram.snapshot()
+                    cumulative = 0
+                    for bound, bucket_count in zip(buckets, counts):
+                        cumulative += bucket_count
+                        series['bucket'].append(f'{name}_bucket{{view="{label}",le="{bound}"}} {cumulative}')
+                    series['bucket'].append(f'{name}_bucket{{view="{label}",le="+Inf"}} {count}')
+                    series['sum'].append(f'{name}_sum{{view="{label}"}} {total:.6f}')
+                    series['count'].append(f'{name}_count{{view="{label}"}} {count}')
+                for suffix, samples in series.items():
+                    lines.append(f'# HELP {name}_{suffix} {description}, last {METRICS_WINDOW:g}s ({suffix})')
+                    lines.append(f'# TYPE {name}_{suffix} gauge')
+                    lines.extend(samples)
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
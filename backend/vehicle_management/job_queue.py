@@ -0,0 +1,237 @@
+# vehicle_management/job_queue.py
+# Database-backed job queue. Jobs are claimed with a conditional UPDATE, so
+# any number of `run_worker` processes can poll the same table safely.
+import csv
+import io
+import os
+import traceback
+from datetime import timedelta
+from time import monotonic, perf_counter
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db.models import F
+from django.utils import timezone
+
+from .alerts import build_expiry_digest
+from .models import BackgroundJob, ServiceRecord, Vehicle, VehiclePart
+from .search import rebuild_search_index
+from .sync import prune_tombstones
+
+# Failed attempts are retried after 30s, 60s, 120s, ...
+RETRY_BASE_SECONDS = 30
+# A running job whose worker has not reported progress for this long is requeued
+STALE_AFTER = timedelta(minutes=10)
+# Minimum seconds between progress writes, so chatty handlers don't hammer the table
+PROGRESS_INTERVAL = 1.0
+
+HANDLERS = {}
+
+
+def handler(kind):
+    """Register a function(job, context) -> JSON-serialisable result for a job kind"""
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+class JobContext:
+    """Passed to handlers; progress updates double as the worker heartbeat"""
+
+    def __init__(self, job):
+        self.job = job
+        self._last_write = None
+
+    def progress(self, percent, message='', force=False):
+        now = monotonic()
+        if not force and self._last_write is not None and now - self._last_write < PROGRESS_INTERVAL:
+            return
+        self._last_write = now
+        BackgroundJob.objects.filter(pk=self.job.pk).update(
+            progress=max(0, min(100, int(percent))),
+            message=message[:255],
+            heartbeat_at=timezone.now(),
+        )
+
+
+def import_path(name):
+    """Resolve a file name under IMPORT_ROOT, refusing anything that escapes it"""
+    root = os.path.realpath(settings.IMPORT_ROOT)
+    path = os.path.realpath(os.path.join(root, name))
+    if os.path.commonpath([root, path]) != root:
+        raise ValueError(f'{name} is outside the import directory')
+    return path
+
+
+# -- handlers --------------------------------------------------------------
+
+@handler('import')
+def run_import(job, context):
+    """
+    params: {'vehicles': file, 'parts': file}, names relative to IMPORT_ROOT.
+    The files are deleted once the job succeeds or runs out of attempts.
+    """
+    stages = [stage for stage in ('vehicles', 'parts') if job.params.get(stage)]
+    share = 100 / max(len(stages), 1)
+
+    def progress(stage, done, total):
+        context.progress(stages.index(stage) * share + share * done / max(total, 1),
+                         f'Importing {stage}: row {done} of {total}')
+
+    output = io.StringIO()
+    paths = {stage: import_path(job.params[stage]) for stage in stages}
+    finished = False
+    try:
+        call_command(
+            'import_excel_data',
+            vehicles=paths.get('vehicles'),
+            parts=paths.get('parts'),
+            progress=progress,
+            stdout=output,
+        )
+        finished = True
+    finally:
+        # Keep the workbooks while a retry may still read them
+        if finished or job.attempts >= job.max_attempts:
+            for path in paths.values():
+                if os.path.exists(path):
+                    os.remove(path)
+    lines = output.getvalue().splitlines()
+    errors = [line for line in lines if line.startswith('Error')]
+    return {
+        'summary': [line for line in lines if line.startswith('Successfully')],
+        'errors': len(errors),
+        'error_samples': errors[:20],
+    }
+
+
+# dataset -> (queryset factory, columns)
+EXPORTS = {
+    'vehicles': (lambda: Vehicle.objects.order_by('id'), [
+        'id', 'name', 'registration', 'make', 'model', 'year', 'status', 'employee_name',
+        'registration_expiry', 'insurance_expiry', 'current_mileage', 'last_service_date',
+    ]),
+    'parts': (lambda: VehiclePart.objects.order_by('id'), [
+        'id', 'part_number', 'description', 'supplier', 'current_stock', 'minimum_stock', 'cost',
+    ]),
+    'services': (lambda: ServiceRecord.objects.order_by('id'), [
+        'id', 'vehicle__name', 'service_date', 'mileage_at_service', 'service_type', 'performed_by', 'cost',
+    ]),
+}
+
+
+@handler('export')
+def run_export(job, context):
+    """params: {'dataset': one of EXPORTS}; writes a CSV under EXPORT_ROOT"""
+    dataset = job.params['dataset']
+    queryset_factory, columns = EXPORTS[dataset]
+    queryset = queryset_factory()
+    total = queryset.count()
+
+    os.makedirs(settings.EXPORT_ROOT, exist_ok=True)
+    filename = f"{dataset}-{job.pk}-{timezone.now():%Y%m%d%H%M%S}.csv"
+    rows = 0
+    with open(os.path.join(settings.EXPORT_ROOT, filename), 'w', newline='') as handle:
+        writer = csv.writer(handle)
+        writer.writerow(columns)
+        for row in queryset.values_list(*columns).iterator(chunk_size=2000):
+            writer.writerow(row)
+            rows += 1
+            if rows % 1000 == 0:
+                context.progress(100 * rows / max(total, 1), f'Exported {rows} of {total} rows')
+    return {'file': filename, 'rows': rows}
+
+
+ROLLUPS = {
+    'expiry_digest': lambda: len(build_expiry_digest()['alerts']),
+    'search_index': rebuild_search_index,
+    'prune_tombstones': prune_tombstones,
+}
+
+
+@handler('rollup')
+def run_rollup(job, context):
+    """params: {'name': one of ROLLUPS, or 'all'}"""
+    name = job.params.get('name', 'all')
+    names = list(ROLLUPS) if name == 'all' else [name]
+    results = {}
+    for index, rollup in enumerate(names):
+        context.progress(100 * index / len(names), f'Rebuilding {rollup}', force=True)
+        start = perf_counter()
+        rows = ROLLUPS[rollup]()
+        results[rollup] = {'rows': rows, 'seconds': round(perf_counter() - start, 3)}
+    return results
+
+
+# -- queue -----------------------------------------------------------------
+
+def enqueue(kind, params=None, max_attempts=3):
+    if kind not in HANDLERS:
+        raise ValueError(f'Unknown job kind: {kind}')
+    return BackgroundJob.objects.create(kind=kind, params=params or {}, max_attempts=max_attempts)
+
+
+def claim_next(worker):
+    """
+    Atomically move the oldest runnable job to 'running' for `worker`.
+    Another worker winning the race simply makes our UPDATE match no rows.
+    """
+    now = timezone.now()
+    candidates = BackgroundJob.objects.filter(
+        status='queued', run_after__lte=now
+    ).order_by('run_after', 'id').values_list('pk', flat=True)[:10]
+    for pk in candidates:
+        claimed = BackgroundJob.objects.filter(pk=pk, status='queued').update(
+            status='running',
+            worker=worker,
+            started_at=now,
+            heartbeat_at=now,
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return BackgroundJob.objects.get(pk=pk)
+    return None
+
+
+def run_job(job):
+    """Run a claimed job, recording the result or scheduling a retry. Returns True on success."""
+    context = JobContext(job)
+    try:
+        result = HANDLERS[job.kind](job, context)
+    except Exception:
+        now = timezone.now()
+        error = traceback.format_exc()
+        jobs = BackgroundJob.objects.filter(pk=job.pk)
+        if job.attempts < job.max_attempts:
+            delay = RETRY_BASE_SECONDS * 2 ** (job.attempts - 1)
+            jobs.update(status='queued', error=error, worker='', run_after=now + timedelta(seconds=delay),
+                        message=f'Attempt {job.attempts} failed, retrying in {delay}s')
+        else:
+            jobs.update(status='failed', error=error, finished_at=now,
+                        message=f'Failed after {job.attempts} attempts')
+        return False
+
+    BackgroundJob.objects.filter(pk=job.pk).update(
+        status='succeeded', progress=100, result=result, error='', finished_at=timezone.now(), message='Done'
+    )
+    return True
+
+
+def requeue_stale(stale_after=STALE_AFTER):
+    """Put jobs from workers that died mid-run back in the queue, or fail them once out of attempts"""
+    now = timezone.now()
+    stale = BackgroundJob.objects.filter(status='running', heartbeat_at__lt=now - stale_after)
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status='failed', worker='', finished_at=now, message='Worker went silent on the last attempt'
+    )
+    requeued = stale.update(status='queued', worker='', message='Requeued after worker went silent')
+    return requeued + failed
+
+
+def retry(job):
+    """Manually requeue a failed job with a fresh set of attempts"""
+    BackgroundJob.objects.filter(pk=job.pk).update(
+        status='queued', attempts=0, error='', progress=0, run_after=timezone.now(),
+        message='Requeued', finished_at=None,
+    )
@@ -0,0 +1,128 @@
+# vehicle_management/jobs.py
+import re
+from datetime import datetime, timedelta
+
+from django.db.models import Q
+
+from .models import Employee, JobAssignment
+
+# ISO dates and the dd/mm/yyyy style used in the site registers
+_DATE = re.compile(r'\b(\d{4}-\d{1,2}-\d{1,2}|\d{1,2}[/.]\d{1,2}[/.]\d{2,4})\b')
+_DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d/%m/%y', '%d.%m.%Y', '%d.%m.%y')
+# Vehicle IDs such as "MAD 2", "MAD-12" or "LV104"
+_VEHICLE = re.compile(r'\b([A-Za-z]{2,4})[ -]?(\d{1,4})\b')
+# A date or date range with its connecting words, once dates are marked with \x00
+_DATE_PHRASE = re.compile(
+    r'(?:\b(?:from|on|between)\s+)?\x00(?:\s*(?:-|–|to|until|till|and)\s*\x00)?', re.IGNORECASE
+)
+# Bullets and separators left at either end of the job text
+_EDGES = re.compile(r'^[\s\-–*•:|,]+|[\s\-–*•:|,]+$')
+
+
+def _parse_date(value):
+    for date_format in _DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            continue
+    return None
+
+
+def vehicle_key(name):
+    """'MAD 2', 'mad-2' and 'MAD2' all map to 'MAD2'"""
+    return re.sub(r'[\W_]+', '', name or '').upper()
+
+
+def parse_job_history(text, vehicle_ids=None):
+    """
+    Split free-text job history into assignment dicts, one per line (or ';').
+    The first two dates found become start and end; a single date is taken
+    as a one-day job. A vehicle ID mentioned in the line is resolved through
+    `vehicle_ids` ({vehicle_key(name): pk}). Lines without dates are kept
+    with empty dates so no history is lost.
+    """
+    vehicle_ids = vehicle_ids or {}
+    assignments = []
+    for line in re.split(r'[\n;]+', text or ''):
+        line = line.strip()
+        if not line:
+            continue
+
+        dates = [parsed for parsed in map(_parse_date, _DATE.findall(line)) if parsed]
+        start = dates[0] if dates else None
+        end = dates[1] if len(dates) > 1 else start
+        if start and end and end < start:
+            start, end = end, start
+
+        vehicle_id = None
+        for match in _VEHICLE.finditer(line):
+            vehicle_id = vehicle_ids.get(vehicle_key(match.group(0)))
+            if vehicle_id:
+                break
+
+        job = _DATE_PHRASE.sub(' ', _DATE.sub('\x00', line))
+        job = _EDGES.sub('', re.sub(r'\(\s*\)', '', job))
+        job = re.sub(r'\s{2,}', ' ', job)
+
+        assignments.append({
+            'job': (job or line)[:200],
+            'start_date': start,
+            'end_date': end,
+            'vehicle_id': vehicle_id,
+            'notes': line,
+        })
+    return assignments
+
+
+def overlapping(queryset, start_date=None, end_date=None):
+    """Assignments whose period overlaps [start_date, end_date]; an empty end_date means ongoing"""
+    if end_date:
+        queryset = queryset.filter(start_date__lte=end_date)
+    if start_date:
+        queryset = queryset.filter(Q(end_date__gte=start_date) | Q(end_date__isnull=True))
+    return queryset
+
+
+def employee_utilization(start_date, end_date, employee_ids=None):
+    """
+    Days each employee spent on jobs within the range, overlapping stints
+    merged so double-booked days count once. One indexed range scan for the
+    assignments plus one query to label the employees.
+    """
+    rows = overlapping(JobAssignment.objects.filter(start_date__isnull=False), start_date, end_date)
+    if employee_ids:
+        rows = rows.filter(employee_id__in=employee_ids)
+    rows = rows.order_by('employee_id', 'start_date').values_list(
+        'employee_id', 'vehicle_id', 'start_date', 'end_date'
+    )
+
+    range_days = (end_date - start_date).days + 1
+    stats = {}
+    for employee_id, vehicle_id, stint_start, stint_end in rows.iterator(chunk_size=5000):
+        stint_start = max(stint_start, start_date)
+        stint_end = min(stint_end or end_date, end_date)
+        entry = stats.setdefault(employee_id, {
+            'jobs': 0, 'vehicles': set(), 'days': 0, 'covered_until': start_date - timedelta(days=1),
+        })
+        entry['jobs'] += 1
+        if vehicle_id:
+            entry['vehicles'].add(vehicle_id)
+        # Stints arrive ordered by start, so only days past the furthest end so far are new
+        if stint_end > entry['covered_until']:
+            entry['days'] += (stint_end - max(stint_start, entry['covered_until'] + timedelta(days=1))).days + 1
+            entry['covered_until'] = stint_end
+
+    employees = Employee.objects.in_bulk(list(stats))
+    results = [
+        {
+            'employee_id': employee_id,
+            'employee': employees[employee_id].full_name,
+            'jobs': entry['jobs'],
+            'vehicles': len(entry['vehicles']),
+            'assigned_days': entry['days'],
+            'utilization': round(entry['days'] / range_days, 4),
+        }
+        for employee_id, entry in stats.items()
+    ]
+    results.sort(key=lambda row: (-row['utilization'], row['employee']))
+    return results
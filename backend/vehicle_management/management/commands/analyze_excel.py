@@ -1,49 +1,74 @@
 # vehicle_management/management/commands/analyze_excel.py
-import pandas as pd
+import json
+from time import perf_counter
+
 from django.core.management.base import BaseCommand
 
+from vehicle_management.excel_profile import profile_workbook, propose_mapping
+
+
 class Command(BaseCommand):
-    help = 'Analyze Excel file structure'
+    help = 'Profile every sheet of an Excel file and propose the column mapping the importer would use'
 
     def add_arguments(self, parser):
         parser.add_argument('--file', type=str, required=True, help='Path to Excel file')
+        parser.add_argument('--sample', type=int, help='Only read the first N data rows of each sheet')
+        parser.add_argument('--json', action='store_true', help='Print the profile and mapping as JSON')
 
     def handle(self, *args, **options):
         file_path = options['file']
         try:
-            # Read the Excel file
-            df = pd.read_excel(file_path)
-            
-            # Print the first 5 rows as a preview
-            self.stdout.write("First 5 rows of data:")
-            self.stdout.write(str(df.head()))
-            
-            # Print column names
-            self.stdout.write("\nColumn Names:")
-            for i, col in enumerate(df.columns):
-                self.stdout.write(f"{i}: {col}")
-                
-            # Print data types
-            self.stdout.write("\nData Types:")
-            self.stdout.write(str(df.dtypes))
-            
-            # Look for specific columns
-            self.stdout.write("\nSearching for insurance and expiry columns:")
-            key_columns = ['Insurance Company', 'Rego Expiry', 'Insurance Expiry']
-            for col in key_columns:
-                if col in df.columns:
-                    self.stdout.write(f"Found column: '{col}'")
-                    # Show a sample of this column's data
-                    self.stdout.write(f"Sample data: {df[col].head()}")
-                else:
-                    self.stdout.write(f"Column not found: '{col}'")
-            
-            # Try partial matches
-            self.stdout.write("\nSearching for partial matches:")
-            for search_term in ['Insurance', 'Expiry', 'Rego', 'Company']:
-                matches = [col for col in df.columns if search_term in col]
-                if matches:
-                    self.stdout.write(f"Columns containing '{search_term}': {matches}")
-            
+            start = perf_counter()
+            profile = profile_workbook(file_path, sample=options.get('sample'))
+            mapping = propose_mapping(profile)
+            seconds = round(perf_counter() - start, 3)
         except Exception as e:
-            self.stdout.write(self.style.ERROR(f"Error analyzing file: {str(e)}"))
\ No newline at end of file
+            self.stdout.write(self.style.ERROR(f"Error analyzing file: {str(e)}"))
+            return
+
+        if options['json']:
+            self.stdout.write(json.dumps(dict(profile, mapping=mapping, seconds=seconds), indent=1))
+            return
+
+        for sheet in profile['sheets']:
+            sampled = ' (sampled)' if sheet['sampled'] else ''
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"\nSheet '{sheet['name']}': {sheet['rows_scanned']} rows{sampled}, "
+                f"data from row {sheet['first_data_row']}"
+            ))
+            self.stdout.write(f"{'Col':<4} {'Header':<24} {'Type':<18} {'Null %':>7} {'Distinct':>9} {'Date %':>7}  Examples")
+            for column in sheet['columns']:
+                distinct = f"{column['cardinality']}{'+' if column['cardinality_capped'] else ''}"
+                self.stdout.write(
+                    f"{column['letter']:<4} {column['header'][:24]:<24} {column['type']:<18} "
+                    f"{100 * column['null_rate']:>6.1f}% {distinct:>9} {100 * column['date_rate']:>6.1f}%  "
+                    f"{', '.join(column['examples'])[:40]}"
+                )
+
+        if 'vehicles' in mapping:
+            vehicles = mapping['vehicles']
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\nVehicle import mapping (sheet '{vehicles['sheet']}'):"))
+            for field, entry in vehicles['fields'].items():
+                if entry is None:
+                    self.stdout.write(self.style.WARNING(f"  {field:<20} no matching column"))
+                elif entry['exact']:
+                    self.stdout.write(f"  {field:<20} {entry['letter']} '{entry['column']}'")
+                else:
+                    self.stdout.write(self.style.WARNING(
+                        f"  {field:<20} {entry['letter']} '{entry['column']}' (fuzzy, score {entry['score']})"
+                    ))
+            for found, expected in vehicles['rename'].items():
+                self.stdout.write(f"  Rename '{found}' to '{expected}' before importing")
+
+        if 'parts' in mapping:
+            parts = mapping['parts']
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\nParts import columns (sheet '{parts['sheet']}', by position):"))
+            for entry in parts['positions']:
+                line = f"  {entry['letter']:<3} expects '{entry['expected']}', found '{entry['found']}'"
+                if entry['score'] >= 0.6:
+                    self.stdout.write(line)
+                else:
+                    hint = f"; best match is column {entry['best_match']}" if 'best_match' in entry else ''
+                    self.stdout.write(self.style.WARNING(line + hint))
+
+        self.stdout.write(self.style.SUCCESS(f"\nProfiled {len(profile['sheets'])} sheet(s) in {seconds}s"))
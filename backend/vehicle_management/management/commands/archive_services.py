@@ -0,0 +1,33 @@
+# vehicle_management/management/commands/archive_services.py
+from datetime import datetime
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from vehicle_management.archive import BATCH_SIZE, archive_services, default_cutoff
+
+
+class Command(BaseCommand):
+    help = 'Move service records (and their part usages) older than a cutoff into the archive tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--before', type=str,
+                            help='Archive services dated before this YYYY-MM-DD '
+                                 '(default: SERVICE_ARCHIVE_AFTER_DAYS ago, two years unless set)')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Services moved per transaction')
+
+    def handle(self, *args, **options):
+        try:
+            cutoff = datetime.strptime(options['before'], '%Y-%m-%d').date() if options['before'] else default_cutoff()
+        except ValueError:
+            raise CommandError('--before must be a date in YYYY-MM-DD format')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        self.stdout.write(f'Archiving services dated before {cutoff}')
+        start = perf_counter()
+        moved = archive_services(cutoff, batch_size=options['batch_size'], progress=self.progress)
+        self.stdout.write(self.style.SUCCESS(f'Archived {moved} services in {perf_counter() - start:.1f}s'))
+
+    def progress(self, done, total):
+        self.stdout.write(f'  {done}/{total} services archived')
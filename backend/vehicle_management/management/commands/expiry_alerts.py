@@ -0,0 +1,43 @@
+# vehicle_management/management/commands/expiry_alerts.py
+from django.core.management.base import BaseCommand
+
+from vehicle_management.alerts import build_expiry_digest, expiry_alerts, DIGEST_HORIZON_DAYS
+
+
+class Command(BaseCommand):
+    help = 'List registration, insurance and licence expiries, or rebuild the nightly digest'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help='Look-ahead window in days (default 30)')
+        parser.add_argument('--include-expired', action='store_true', help='Also list items that have already expired')
+        parser.add_argument('--rebuild-digest', action='store_true',
+                            help='Rebuild the cached expiry digest (run nightly from cron)')
+
+    def handle(self, *args, **options):
+        if options['rebuild_digest']:
+            digest = build_expiry_digest()
+            self.stdout.write(self.style.SUCCESS(
+                f"Rebuilt expiry digest: {len(digest['alerts'])} alerts up to {DIGEST_HORIZON_DAYS} days ahead"
+            ))
+            return
+
+        page = 1
+        while True:
+            feed = expiry_alerts(
+                days=options['days'],
+                include_expired=options['include_expired'],
+                page=page,
+                page_size=500,
+            )
+            if page == 1:
+                self.stdout.write(f"{feed['count']} expiries in the next {options['days']} days")
+
+            for alert in feed['results']:
+                line = (f"{alert['expiry_date']}  {alert['kind']:<12} {alert['label']} "
+                        f"({alert['reference']})  {alert['days_remaining']} days")
+                style = self.style.ERROR if alert['days_remaining'] < 0 else self.style.WARNING
+                self.stdout.write(style(line))
+
+            if page * feed['page_size'] >= feed['count']:
+                break
+            page += 1
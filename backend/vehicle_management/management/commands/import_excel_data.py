@@ -1,22 +1,40 @@
 import os
-import pandas as pd
+import json
 import datetime
 from datetime import date
+from time import perf_counter
 from django.core.management.base import BaseCommand
 from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from vehicle_management.excel_layout import part_rows, vehicle_rows
+from vehicle_management.import_diff import diff_parts, diff_vehicles
+from vehicle_management.matching import MatchReport, VehicleIndex
 from vehicle_management.models import Vehicle, VehiclePart, VehiclePartCompatibility
 
 
 class Command(BaseCommand):
     help = 'Import data from Excel files'
+    # progress(stage, done, total) callback, passed by the background job runner
+    stealth_options = ('progress',)
 
     def add_arguments(self, parser):
         parser.add_argument('--vehicles', type=str, help='Path to vehicles Excel file')
         parser.add_argument('--parts', type=str, help='Path to parts Excel file')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Write nothing; report what the import would change')
+        parser.add_argument('--diff-file', type=str,
+                            help='Where --dry-run writes the full JSON diff (default: import-diff-<timestamp>.json)')
 
     def handle(self, *args, **options):
         vehicles_file = options.get('vehicles')
         parts_file = options.get('parts')
+        self.progress = options.get('progress') or (lambda stage, done, total: None)
+        self.debug = options.get('verbosity', 1) > 1
+
+        if options.get('dry_run'):
+            self.dry_run(vehicles_file, parts_file, options.get('diff_file'))
+            return
 
         if vehicles_file and os.path.exists(vehicles_file):
             self.import_vehicles(vehicles_file)
@@ -28,90 +46,46 @@ class Command(BaseCommand):
         else:
             self.stdout.write(self.style.WARNING('Parts file not found or not specified'))
 
-    def safe_str(self, value, default=""):
-        """Safely convert value to string, handling NaN values"""
-        if pd.isna(value):
-            return default
-        return str(value)
-
     def import_vehicles(self, file_path):
         """Import vehicles from Excel file."""
         try:
             self.stdout.write(f'Importing vehicles from {file_path}')
             
-            # Read Excel file
-            df = pd.read_excel(file_path)
-            
-            # Print column names for debugging
-            self.stdout.write(f'Found columns: {df.columns.tolist()}')
+            # Read the rows the dry run reads, so both see the same values
+            rows = list(vehicle_rows(file_path))
             
             vehicles_created = 0
             vehicles_updated = 0
+            parsed = []  # (row number, vehicle fields) for rows with an ID and registration
             
             # Process each row
-            for idx, row in df.iterrows():
+            for position, row in enumerate(rows):
+                if position % 100 == 0:
+                    self.progress('vehicles', position, len(rows))
                 try:
-                    # Get vehicle ID
-                    vehicle_id = None
-                    if 'Motor Vehicle ID' in df.columns and not pd.isna(row['Motor Vehicle ID']):
-                        vehicle_id = self.safe_str(row['Motor Vehicle ID'])
-                    elif not pd.isna(row.iloc[0]):
-                        vehicle_id = self.safe_str(row.iloc[0])
-                    
-                    # Get registration
-                    registration = None
-                    if 'Registration' in df.columns and not pd.isna(row['Registration']):
-                        registration = self.safe_str(row['Registration'])
-                    
-                    # Get employee
-                    employee_name = None
-                    if 'Driver' in df.columns and not pd.isna(row['Driver']):
-                        employee_name = self.safe_str(row['Driver'])
-                    
-                    # Get insurance company - using the exact column name you provided
-                    insurance_company = None
-                    if 'Insurance Company' in df.columns and not pd.isna(row['Insurance Company']):
-                        insurance_company = self.safe_str(row['Insurance Company'])
-                    
-                    # Get registration expiry - using the exact column name you provided
-                    registration_expiry = None
-                    if 'Rego Expiry' in df.columns and not pd.isna(row['Rego Expiry']):
-                        registration_expiry = row['Rego Expiry']
-                        if not isinstance(registration_expiry, datetime.date):
-                            try:
-                                registration_expiry = pd.to_datetime(registration_expiry).date()
-                            except:
-                                registration_expiry = None
-                    
-                    # Get insurance expiry - using the exact column name you provided
-                    insurance_expiry = None
-                    if 'Insurance Expiry' in df.columns and not pd.isna(row['Insurance Expiry']):
-                        insurance_expiry = row['Insurance Expiry']
-                        if not isinstance(insurance_expiry, datetime.date):
-                            try:
-                                insurance_expiry = pd.to_datetime(insurance_expiry).date()
-                            except:
-                                insurance_expiry = None
+                    vehicle_id = row['name']
+                    registration = row['registration']
                     
                     # Skip rows with missing essential data
                     if not vehicle_id or not registration:
-                        self.stdout.write(self.style.WARNING(f'Skipping row {idx+2}: Missing vehicle ID or registration'))
+                        self.stdout.write(self.style.WARNING(f"Skipping row {row['row']}: Missing vehicle ID or registration"))
                         continue
                     
                     # Debug output
-                    self.stdout.write(f'Vehicle: {vehicle_id}, Registration: {registration}')
-                    self.stdout.write(f'  Employee: {employee_name}')
-                    self.stdout.write(f'  Insurance: {insurance_company}, Expires: {insurance_expiry}')
-                    self.stdout.write(f'  Registration Expires: {registration_expiry}')
+                    if self.debug:
+                        self.stdout.write(f'Vehicle: {vehicle_id}, Registration: {registration}')
+                        self.stdout.write(f"  Employee: {row['employee_name']}")
+                        self.stdout.write(f"  Insurance: {row['insurance_company']}, Expires: {row['insurance_expiry']}")
+                        self.stdout.write(f"  Registration Expires: {row['registration_expiry']}")
                     
                     # Create vehicle record
                     vehicle_data = {
                         'name': vehicle_id,
                         'registration': registration,
-                        'employee_name': employee_name,
-                        'insurance_company': insurance_company,
-                        'registration_expiry': registration_expiry,
-                        'insurance_expiry': insurance_expiry,
+                        'employee_name': row['employee_name'],
+                        'insurance_company': row['insurance_company'],
+                        'registration_expiry': row['registration_expiry'],
+                        'insurance_expiry': row['insurance_expiry'],
                         'make': 'Toyota',  # Default - update if needed
                         'model': 'Unknown',  # Default - update if needed
                         'year': 2020,  # Default - update if needed
@@ -119,130 +93,73 @@ class Command(BaseCommand):
                         'status': 'active',  # Default
                     }
                     
-                    # Create or update vehicle
-                    vehicle, created = Vehicle.objects.update_or_create(
-                        registration=registration,
-                        defaults=vehicle_data
-                    )
+                    parsed.append((row['row'], vehicle_data))
+                    
+                except Exception as e:
+                    self.stdout.write(self.style.ERROR(f"Error importing row {row['row']}: {str(e)}"))
+            
+            # Match every row against one index of the fleet, then load the matched vehicles in one query
+            index = VehicleIndex.from_database()
+            report = MatchReport()
+            matched = {index.resolve(data['name'], data['registration']).key for _, data in parsed}
+            matched.discard(None)
+            vehicles = Vehicle.objects.in_bulk(list(matched))
+            
+            for row_number, vehicle_data in parsed:
+                try:
+                    match = index.resolve(vehicle_data['name'], vehicle_data['registration'])
+                    report.record(index, match, row_number, vehicle_data['name'], vehicle_data['registration'])
+                    if match.candidates and match.key is None:
+                        continue
                     
-                    if created:
+                    if match.key is None:
+                        vehicle = Vehicle.objects.create(**vehicle_data)
+                        report.claim(vehicle.pk, row_number)
                         vehicles_created += 1
                     else:
+                        vehicle = vehicles[match.key]
+                        for field, value in vehicle_data.items():
+                            setattr(vehicle, field, value)
+                        vehicle.save(update_fields=[*vehicle_data, 'updated_at'])
                         vehicles_updated += 1
+                    vehicles[vehicle.pk] = vehicle
+                    index.add(vehicle.pk, vehicle.name, vehicle.registration)
                     
                 except Exception as e:
-                    self.stdout.write(self.style.ERROR(f'Error importing row {idx+2}: {str(e)}'))
+                    self.stdout.write(self.style.ERROR(f'Error importing row {row_number}: {str(e)}'))
             
             self.stdout.write(self.style.SUCCESS(f'Successfully imported {vehicles_created} vehicles and updated {vehicles_updated} vehicles'))
+            self.write_match_report(report)
             
         except Exception as e:
             self.stdout.write(self.style.ERROR(f'Error reading Excel file: {str(e)}'))
-    
-
 
-        
     def import_parts(self, file_path):
         """Import parts from Excel file's 'Vehicle Stock levels' tab."""
         try:
             self.stdout.write(f'Importing parts from {file_path} (Vehicle Stock levels tab)')
             
-            # Read Excel file, specifically the 'Vehicle Stock levels' tab
-            df = pd.read_excel(file_path, sheet_name='Vehicle Stock levels')
-            
-            # Skip the first row which contains headers
-            df = df.iloc[1:]
-            
-            # Print column names for debugging
-            self.stdout.write(f'Found columns: {df.columns.tolist()}')
+            # Read the rows the dry run reads, so part numbers like 1234 are stored as '1234'
+            rows = list(part_rows(file_path))
             
             parts_created = 0
             parts_updated = 0
+            tyre_specs = {}  # vehicle pk -> (tyre size, rim colour) from the sheet
+            index = VehicleIndex.from_database()
+            report = MatchReport()
             
             # Process each row (vehicle)
-            for idx, row in df.iterrows():
+            for position, row in enumerate(rows):
+                if position % 100 == 0:
+                    self.progress('parts', position, len(rows))
                 try:
-                    # Skip empty rows
-                    if pd.isna(row.iloc[0]):
-                        continue
-                    
-                    # Get vehicle details
-                    vehicle_id = str(row.iloc[0]) if not pd.isna(row.iloc[0]) else ""  # Motor Vehicle ID
-                    registration = str(row.iloc[1]) if not pd.isna(row.iloc[1]) else ""  # Rego
-                    model = str(row.iloc[2]) if not pd.isna(row.iloc[2]) else ""  # Model
-                    year = self.safe_int(row.iloc[3], 0)  # Year
-                    tyre_size = str(row.iloc[12]) if not pd.isna(row.iloc[12]) else ""  # Tyre size
-                    rim_colour = str(row.iloc[13]) if not pd.isna(row.iloc[13]) else ""  # Rim colour
-                    
-                    # Process Fuel Filter
-                    if not pd.isna(row.iloc[4]):  # Fuel filter part #
-                        part_data = {
-                            'part_number': str(row.iloc[4]),
-                            'description': 'Fuel Filter',
-                            'supplier': 'Unknown',
-                            'current_stock': self.safe_int(row.iloc[5], 0),  # Fuel filter stock
-                            'minimum_stock': 1,
-                            'cost': None,
-                        }
-                        
-                        part, created = VehiclePart.objects.update_or_create(
-                            part_number=part_data['part_number'],
-                            defaults=part_data
-                        )
-                        
-                        if created:
-                            parts_created += 1
-                        else:
-                            parts_updated += 1
-                    
-                    # Process Oil Filter
-                    if not pd.isna(row.iloc[6]):  # Oil filter part #
-                        part_data = {
-                            'part_number': str(row.iloc[6]),
-                            'description': 'Oil Filter',
-                            'supplier': 'Unknown',
-                            'current_stock': self.safe_int(row.iloc[7], 0),  # Oil filter stock
-                            'minimum_stock': 1,
-                            'cost': None,
-                        }
-                        
-                        part, created = VehiclePart.objects.update_or_create(
-                            part_number=part_data['part_number'],
-                            defaults=part_data
-                        )
-                        
-                        if created:
-                            parts_created += 1
-                        else:
-                            parts_updated += 1
-                    
-                    # Process Air Filter
-                    if not pd.isna(row.iloc[8]):  # Air filter part #
-                        part_data = {
-                            'part_number': str(row.iloc[8]),
-                            'description': 'Air Filter',
-                            'supplier': 'Unknown',
-                            'current_stock': self.safe_int(row.iloc[9], 0),  # Air filter stock
-                            'minimum_stock': 1,
-                            'cost': None,
-                        }
-                        
-                        part, created = VehiclePart.objects.update_or_create(
-                            part_number=part_data['part_number'],
-                            defaults=part_data
-                        )
-                        
-                        if created:
-                            parts_created += 1
-                        else:
-                            parts_updated += 1
-                    
-                    # Process Cabin Filter
-                    if not pd.isna(row.iloc[10]):  # Cabin filter part #
+                    # Process each filter slot: fuel, oil, air and cabin
+                    for part_number, description, stock in row['parts']:
                         part_data = {
-                            'part_number': str(row.iloc[10]),
-                            'description': 'Cabin Filter',
+                            'part_number': part_number,
+                            'description': description,
                             'supplier': 'Unknown',
-                            'current_stock': self.safe_int(row.iloc[11], 0),  # Cabin filter stock
+                            'current_stock': stock,
                             'minimum_stock': 1,
                             'cost': None,
                         }
@@ -257,51 +174,126 @@ class Command(BaseCommand):
                         else:
                             parts_updated += 1
                     
-                    # Try to find matching vehicle in database for compatibility
-                    # First try by vehicle_id (Motor Vehicle ID)
-                    matching_vehicles = Vehicle.objects.filter(name__iexact=vehicle_id)
-                    
-                    # If no match by name, try by registration
-                    if not matching_vehicles.exists() and registration:
-                        matching_vehicles = Vehicle.objects.filter(registration__iexact=registration)
+                    # Find the vehicle for compatibility links, by registration or else Motor Vehicle ID
+                    match = index.resolve(row['name'], row['registration'])
+                    report.record(index, match, row['row'], row['name'], row['registration'])
                     
-                    for vehicle in matching_vehicles:
-                        # Update vehicle with additional info from parts sheet
-                        if tyre_size or rim_colour:
-                            # Add these as custom_fields or notes
-                            notes = vehicle.notes if hasattr(vehicle, 'notes') else ""
-                            if tyre_size:
-                                notes += f"Tyre Size: {tyre_size}\n"
-                            if rim_colour:
-                                notes += f"Rim Colour: {rim_colour}\n"
-                            
-                            if hasattr(vehicle, 'notes'):
-                                vehicle.notes = notes
-                                vehicle.save()
+                    if match.key is not None:
+                        vehicle_pk = match.key
+                        # Tyre specs are written in bulk once every row is read
+                        if row['tyre_size'] or row['rim_colour']:
+                            tyre_specs[vehicle_pk] = (row['tyre_size'], row['rim_colour'])
                         
                         # Create the compatibility record for each part
-                        for part_idx, part_type in [(4, 'Fuel Filter'), (6, 'Oil Filter'), (8, 'Air Filter'), (10, 'Cabin Filter')]:
-                            if not pd.isna(row.iloc[part_idx]):
-                                try:
-                                    part = VehiclePart.objects.get(part_number=str(row.iloc[part_idx]))
-                                    compatibility, created = VehiclePartCompatibility.objects.get_or_create(
-                                        vehicle=vehicle,
-                                        part=part
-                                    )
+                        for part_number, part_type, _ in row['parts']:
+                            try:
+                                part = VehiclePart.objects.get(part_number=part_number)
+                                compatibility, created = VehiclePartCompatibility.objects.get_or_create(
+                                    vehicle_id=vehicle_pk,
+                                    part=part
+                                )
+                                if self.debug:
                                     self.stdout.write(self.style.SUCCESS(
-                                        f'Linked {part_type} {part.part_number} to vehicle {vehicle.registration}'
-                                    ))
-                                except VehiclePart.DoesNotExist:
-                                    self.stdout.write(self.style.WARNING(
-                                        f'Part {str(row.iloc[part_idx])} not found for {part_type}'
+                                        f'Linked {part_type} {part.part_number} to vehicle '
+                                        f'{index.registration(vehicle_pk)}'
                                     ))
+                            except VehiclePart.DoesNotExist:
+                                self.stdout.write(self.style.WARNING(
+                                    f'Part {part_number} not found for {part_type}'
+                                ))
                     
                 except Exception as e:
-                    self.stdout.write(self.style.ERROR(f'Error importing row {idx+2}: {str(e)}'))
+                    self.stdout.write(self.style.ERROR(f"Error importing row {row['row']}: {str(e)}"))
+            
+            tyres_updated = self.update_tyre_specs(tyre_specs)
             
             self.stdout.write(self.style.SUCCESS(
-                f'Successfully imported {parts_created} parts and updated {parts_updated} parts'
+                f'Successfully imported {parts_created} parts and updated {parts_updated} parts; '
+                f'tyre size or rim colour changed on {tyres_updated} vehicles'
             ))
+            self.write_match_report(report)
             
         except Exception as e:
-            self.stdout.write(self.style.ERROR(f'Error reading Excel file: {str(e)}'))
\ No newline at end of file
+            self.stdout.write(self.style.ERROR(f'Error reading Excel file: {str(e)}'))
+
+    def write_match_report(self, report):
+        """Warn about rows matching several vehicles (skipped) or a vehicle an earlier row matched (applied again)"""
+        for example in report.ambiguous:
+            candidates = ', '.join(f"{vehicle['name']} ({vehicle['registration']})"
+                                   for vehicle in example['candidates'])
+            self.stdout.write(self.style.WARNING(
+                f"Skipping row {example['row']}: {example['via']} matches several vehicles: {candidates}"
+            ))
+        for example in report.duplicates:
+            self.stdout.write(self.style.WARNING(
+                f"Row {example['row']} ({example['name']}, {example['registration']}) matches the same vehicle "
+                f"as row {example['first_row']}"
+            ))
+
+    def update_tyre_specs(self, specs):
+        """
+        Store the sheet's tyre size and rim colour on each vehicle. Blank cells
+        keep the current value, and only vehicles whose values differ are
+        written, in bulk, so re-running the import changes nothing.
+        """
+        now = timezone.now()
+        changed = []
+        vehicles = Vehicle.objects.only('tyre_size', 'rim_color').in_bulk(list(specs))
+        for pk, (tyre_size, rim_colour) in specs.items():
+            vehicle = vehicles[pk]
+            tyre_size = tyre_size or vehicle.tyre_size
+            rim_colour = rim_colour or vehicle.rim_color
+            if (vehicle.tyre_size, vehicle.rim_color) != (tyre_size, rim_colour):
+                vehicle.tyre_size, vehicle.rim_color = tyre_size, rim_colour
+                # bulk_update skips auto_now
+                vehicle.updated_at = now
+                changed.append(vehicle)
+        Vehicle.objects.bulk_update(changed, ['tyre_size', 'rim_color', 'updated_at'], batch_size=500)
+        return len(changed)
+
+    def dry_run(self, vehicles_file, parts_file, diff_file=None):
+        """Diff the registers against the database without writing, and save the full diff as JSON."""
+        start = perf_counter()
+        diff = {'vehicles_file': vehicles_file, 'parts_file': parts_file}
+        # The vehicle diff updates the index as the import would, so the parts diff sees its result
+        planned = VehicleIndex.from_database()
+        if vehicles_file and os.path.exists(vehicles_file):
+            diff['vehicles'] = diff_vehicles(vehicle_rows(vehicles_file), max_examples=None, removed=True,
+                                             index=planned)
+        else:
+            self.stdout.write(self.style.WARNING('Vehicles file not found or not specified'))
+        if parts_file and os.path.exists(parts_file):
+            diff['parts'] = diff_parts(part_rows(parts_file), max_examples=None, planned=planned, removed=True)
+        else:
+            self.stdout.write(self.style.WARNING('Parts file not found or not specified'))
+        diff['seconds'] = round(perf_counter() - start, 3)
+
+        for section in ('vehicles', 'parts'):
+            if section in diff:
+                counts = diff[section]
+                self.stdout.write(
+                    f"{section.capitalize()}: {counts['create']} new, {counts['update']} changed, "
+                    f"{counts['unchanged']} unchanged, {counts['removed']} removed, {counts['skipped']} skipped"
+                )
+        if 'parts' in diff:
+            links = diff['parts']['links']
+            self.stdout.write(
+                f"Compatibility links: {links['create']} new, {links['existing']} unchanged, "
+                f"{links['removed']} removed; {diff['parts']['rows_without_vehicle']} rows match no vehicle"
+            )
+            tyres = diff['parts']['tyres']
+            self.stdout.write(f"Tyre specs: {tyres['update']} vehicles changed, {tyres['unchanged']} unchanged")
+        for section in ('vehicles', 'parts'):
+            if section in diff:
+                matching = diff[section]['matching']
+                self.stdout.write(
+                    f"{section.capitalize()} matching: {matching['ambiguous']} rows match several vehicles, "
+                    f"{matching['duplicates']} rows repeat a vehicle"
+                )
+
+        diff_file = diff_file or f'import-diff-{datetime.datetime.now():%Y%m%d%H%M%S}.json'
+        with open(diff_file, 'w') as handle:
+            json.dump(diff, handle, cls=DjangoJSONEncoder, indent=1)
+        self.stdout.write(self.style.SUCCESS(
+            f"Dry run finished in {diff['seconds']}s, nothing written to the database. Full diff: {diff_file}"
+        ))
@@ -0,0 +1,34 @@
+# vehicle_management/management/commands/import_fuel_transactions.py
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from vehicle_management.fuel import BATCH_SIZE, ingest_statement
+
+
+class Command(BaseCommand):
+    help = 'Load a fuel card statement (CSV or Excel) and match its cards to vehicles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', type=str, required=True, help='Path to the statement')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Transactions per INSERT batch')
+
+    def handle(self, *args, **options):
+        log = self.stdout.write if options['verbosity'] > 1 else None
+        start = perf_counter()
+        try:
+            summary = ingest_statement(options['file'], batch_size=options['batch_size'], log=log)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Error importing statement: {e}")
+
+        for error in summary['errors']:
+            self.stdout.write(self.style.WARNING(error))
+        if summary['unmatched_cards']:
+            self.stdout.write(self.style.WARNING(
+                f"Cards matching no vehicle: {', '.join(summary['unmatched_cards'])}"
+            ))
+        self.stdout.write(self.style.SUCCESS(
+            f"Read {summary['lines']} lines in {perf_counter() - start:.1f}s: {summary['inserted']} imported, "
+            f"{summary['duplicates']} already loaded, {summary['unmatched']} on unknown cards, "
+            f"{summary['invalid']} invalid"
+        ))
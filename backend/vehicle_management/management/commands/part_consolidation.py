@@ -0,0 +1,50 @@
+# vehicle_management/management/commands/part_consolidation.py
+import json
+
+from django.core.management.base import BaseCommand
+
+from vehicle_management.consolidation import part_consolidation, DEFAULT_HORIZON_MONTHS
+
+
+class Command(BaseCommand):
+    help = 'Group vehicles by identical compatible part sets and forecast stock needs per group'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--horizon-months', type=int, default=DEFAULT_HORIZON_MONTHS,
+                            help=f'Forecast window in months (default {DEFAULT_HORIZON_MONTHS})')
+        parser.add_argument('--min-vehicles', type=int, default=2,
+                            help='Only list clusters with at least this many vehicles (default 2)')
+        parser.add_argument('--limit', type=int, help='Only list the largest N clusters')
+        parser.add_argument('--json', action='store_true', help='Print the full report as JSON')
+
+    def handle(self, *args, **options):
+        report = part_consolidation(
+            horizon_months=options['horizon_months'],
+            min_vehicles=options['min_vehicles'],
+            limit=options['limit'],
+        )
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['vehicles']} vehicles in {report['clusters']} part-set clusters "
+            f"({report['singleton_clusters']} singletons) using {report['skus']} SKUs"
+        ))
+
+        for cluster in report['results']:
+            part_numbers = ', '.join(part['part_number'] for part in cluster['parts'])
+            self.stdout.write(
+                f"{cluster['fingerprint']}  {cluster['vehicle_count']:5d} vehicles  "
+                f"{cluster['forecast_services']:8.1f} services  {part_numbers}"
+            )
+
+        short = [part for part in report['stock'] if part['shortfall']]
+        if short:
+            self.stdout.write(self.style.WARNING(f"\n{len(short)} parts short for the next {report['horizon_months']} months:"))
+            for part in short:
+                self.stdout.write(
+                    f"  {part['part_number']:<20} demand {part['forecast_demand']:6d}  "
+                    f"stock {part['current_stock']:6d}  order {part['shortfall']:6d}"
+                )
@@ -0,0 +1,77 @@
+# vehicle_management/management/commands/plan_workshop.py
+import csv
+from datetime import datetime
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from vehicle_management.scheduling import (
+    BAYS, EARLY_DAYS, HORIZON_DAYS, PARTS_LEAD_DAYS, PLANNED_SERVICE_TYPES, SCHEDULE_COLUMNS, WEEKEND_BAYS,
+    plan_workshop,
+)
+
+
+class Command(BaseCommand):
+    help = 'Book upcoming services into workshop bays, earliest due first, and report overdue days'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=str, help='First day of the plan, YYYY-MM-DD (default today)')
+        parser.add_argument('--days', type=int, default=HORIZON_DAYS, help=f'Horizon in days (default {HORIZON_DAYS})')
+        parser.add_argument('--bays', type=int, default=BAYS, help=f'Bays open Monday to Friday (default {BAYS})')
+        parser.add_argument('--weekend-bays', type=int, default=WEEKEND_BAYS,
+                            help=f'Bays open on Saturday and Sunday (default {WEEKEND_BAYS})')
+        parser.add_argument('--duration', action='append', default=[], metavar='TYPE=DAYS',
+                            help='Bay-days for "Minor Service" or "Major Service", e.g. "Major Service=3"; repeatable')
+        parser.add_argument('--early-days', type=int, default=EARLY_DAYS,
+                            help=f'Book at most this many days before a service is due (default {EARLY_DAYS})')
+        parser.add_argument('--parts-lead-days', type=int, default=PARTS_LEAD_DAYS,
+                            help=f'Days for out-of-stock parts to arrive (default {PARTS_LEAD_DAYS})')
+        parser.add_argument('--csv', type=str, help='Write the full schedule to this CSV file')
+
+    def handle(self, *args, **options):
+        try:
+            start = datetime.strptime(options['start'], '%Y-%m-%d').date() if options['start'] else None
+            durations = {}
+            for duration in options['duration']:
+                service_type, days = duration.rsplit('=', 1)
+                durations[service_type.strip()] = int(days)
+        except ValueError:
+            raise CommandError('--start must be YYYY-MM-DD and --duration TYPE=DAYS')
+        if options['days'] < 1 or options['bays'] < 0 or options['weekend_bays'] < 0 or \
+                any(days < 1 for days in durations.values()):
+            raise CommandError('--days and durations must be at least 1, bay counts not negative')
+        unknown = sorted(set(durations) - set(PLANNED_SERVICE_TYPES))
+        if unknown:
+            raise CommandError(f"No due dates are predicted for {', '.join(unknown)}; "
+                               f"--duration takes {', '.join(PLANNED_SERVICE_TYPES)}")
+
+        began = perf_counter()
+        plan = plan_workshop(
+            start=start, days=options['days'], bays=options['bays'], weekend_bays=options['weekend_bays'],
+            durations=durations, early_days=options['early_days'], parts_lead_days=options['parts_lead_days'],
+        )
+        elapsed = perf_counter() - began
+
+        if options['csv']:
+            with open(options['csv'], 'w', newline='') as handle:
+                writer = csv.writer(handle)
+                writer.writerow(SCHEDULE_COLUMNS)
+                for booking in plan['schedule']:
+                    writer.writerow(booking._replace(parts=' '.join(booking.parts)))
+            self.stdout.write(f"Schedule written to {options['csv']}")
+
+        for order in plan['parts_to_order']:
+            self.stdout.write(self.style.WARNING(f"Order {order['quantity']} x {order['part_number']}"))
+        if plan['unscheduled']:
+            self.stdout.write(self.style.WARNING(
+                f"{len(plan['unscheduled'])} services due in the horizon found no free bay; add bays or extend --days"
+            ))
+        if plan['unplanned_service_types']:
+            self.stdout.write(self.style.WARNING(
+                f"Not planned, nothing predicts when they fall due: {', '.join(plan['unplanned_service_types'])}"
+            ))
+        summary = plan['summary']
+        self.stdout.write(self.style.SUCCESS(
+            f"Planned {summary['scheduled']} services from {summary['start']} over {summary['days']} days "
+            f"in {elapsed:.2f}s: {summary['late_services']} late, {summary['overdue_days']} overdue days in total"
+        ))
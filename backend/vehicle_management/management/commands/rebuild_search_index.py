@@ -0,0 +1,15 @@
+# vehicle_management/management/commands/rebuild_search_index.py
+from django.core.management.base import BaseCommand
+
+from vehicle_management.search import rebuild_search_index, search_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for vehicles, employees and parts'
+
+    def handle(self, *args, **options):
+        if search_backend() != 'fts5':
+            self.stdout.write(self.style.WARNING('Full-text index is only used on SQLite; nothing to rebuild'))
+            return
+        total = rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {total} records'))
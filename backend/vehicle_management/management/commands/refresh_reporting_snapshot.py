@@ -0,0 +1,35 @@
+# vehicle_management/management/commands/refresh_reporting_snapshot.py
+import time
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from vehicle_management.reporting import REPORTING_DB, refresh_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Copy the SQLite database to the read-only snapshot the report views read'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--every', type=float,
+                            help='Keep running and refresh every this many seconds '
+                                 '(keep it well under REPORTING_SNAPSHOT_MAX_AGE)')
+
+    def handle(self, *args, **options):
+        if REPORTING_DB not in settings.DATABASES:
+            raise CommandError('No reporting database is configured; snapshots need the default database on SQLite')
+        every = options['every']
+        try:
+            while True:
+                start = perf_counter()
+                taken_at = refresh_snapshot()
+                self.stdout.write(self.style.SUCCESS(
+                    f'Snapshot taken at {taken_at:%Y-%m-%d %H:%M:%S} in {perf_counter() - start:.1f}s: '
+                    f'{settings.REPORTING_SNAPSHOT}'
+                ))
+                if not every:
+                    break
+                time.sleep(max(0.0, every - (perf_counter() - start)))
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('Stopped'))
@@ -0,0 +1,33 @@
+# vehicle_management/management/commands/restore_services.py
+from datetime import datetime
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from vehicle_management.archive import BATCH_SIZE, restore_services
+
+
+class Command(BaseCommand):
+    help = 'Move archived service records dated within a range back into the live tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', type=str, required=True, help='Restore services dated on or after YYYY-MM-DD')
+        parser.add_argument('--until', type=str, help='...and on or before YYYY-MM-DD (default: no limit)')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Services moved per transaction')
+
+    def handle(self, *args, **options):
+        try:
+            since = datetime.strptime(options['since'], '%Y-%m-%d').date()
+            until = datetime.strptime(options['until'], '%Y-%m-%d').date() if options['until'] else None
+        except ValueError:
+            raise CommandError('--since and --until must be dates in YYYY-MM-DD format')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        self.stdout.write(f"Restoring archived services dated from {since}{f' to {until}' if until else ''}")
+        start = perf_counter()
+        moved = restore_services(since, until, batch_size=options['batch_size'], progress=self.progress)
+        self.stdout.write(self.style.SUCCESS(f'Restored {moved} services in {perf_counter() - start:.1f}s'))
+
+    def progress(self, done, total):
+        self.stdout.write(f'  {done}/{total} services restored')
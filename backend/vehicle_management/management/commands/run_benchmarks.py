@@ -0,0 +1,68 @@
+# vehicle_management/management/commands/run_benchmarks.py
+from django.core.management.base import BaseCommand, CommandError
+
+from vehicle_management.benchmarks import (
+    DEFAULT_SCALES, benchmark_database, compare_results, load_results, run_render_suite, run_suite, write_results
+)
+
+
+class Command(BaseCommand):
+    help = ('Benchmark the REST endpoints, reports and Excel import on synthetic fleets. '
+            'To compare database backends, write a baseline on SQLite and rerun with '
+            'DATABASE_URL set and --compare pointing at it.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scales', type=str, default=','.join(str(s) for s in DEFAULT_SCALES),
+                            help='Comma-separated fleet sizes to benchmark (default 1000,10000,100000)')
+        parser.add_argument('--seed', type=int, default=42, help='Seed for the synthetic data')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per endpoint; the median is reported')
+        parser.add_argument('--skip-import', action='store_true', help='Do not benchmark the Excel import')
+        parser.add_argument('--render', action='store_true',
+                            help='Only compare JSON renderers, report formats and gzip sizes')
+        parser.add_argument('--output', type=str, default='benchmark_results.json', help='Where to write JSON results')
+        parser.add_argument('--compare', type=str, help='Baseline JSON file to compare against')
+        parser.add_argument('--threshold', type=float, default=0.2,
+                            help='Fractional slowdown that counts as a regression (default 0.2 = 20%%)')
+
+    def handle(self, *args, **options):
+        try:
+            scales = [int(s) for s in options['scales'].split(',') if s.strip()]
+        except ValueError:
+            raise CommandError('--scales must be a comma-separated list of integers')
+
+        baseline = load_results(options['compare']) if options['compare'] else None
+
+        # Runs against a throwaway database, never the configured one
+        with benchmark_database():
+            if options['render']:
+                results = run_render_suite(
+                    scales=scales, seed=options['seed'], repeat=options['repeat'], log=self.stdout.write
+                )
+            else:
+                results = run_suite(
+                    scales=scales,
+                    seed=options['seed'],
+                    repeat=options['repeat'],
+                    include_import=not options['skip_import'],
+                    log=self.stdout.write,
+                )
+
+        write_results(results, options['output'])
+        self.stdout.write(self.style.SUCCESS(f"Wrote results to {options['output']}"))
+
+        if baseline is None:
+            return
+
+        self.stdout.write(f"Comparing {results['meta']['database']} run against "
+                          f"{baseline['meta']['database']} baseline from {baseline['meta']['created_at']}")
+        comparisons = compare_results(results, baseline, threshold=options['threshold'])
+        regressions = [c for c in comparisons if c['regression']]
+        for c in comparisons:
+            line = (f"{c['scale']:>7} {c['name']:<40} {c['baseline_s'] * 1000:10.1f} ms -> "
+                    f"{c['current_s'] * 1000:10.1f} ms (x{c['ratio']}) "
+                    f"queries {c['baseline_queries']} -> {c['current_queries']}")
+            self.stdout.write(self.style.ERROR(line) if c['regression'] else line)
+
+        if regressions:
+            raise CommandError(f'{len(regressions)} benchmark(s) regressed by more than {options["threshold"]:.0%}')
+        self.stdout.write(self.style.SUCCESS('No regressions against baseline'))
@@ -0,0 +1,34 @@
+# vehicle_management/management/commands/run_concurrency_benchmark.py
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from vehicle_management.benchmarks import benchmark_database, run_concurrency, write_results
+
+
+class Command(BaseCommand):
+    help = 'Compare lock errors and read latency during an import under each SQLite profile'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--vehicles', type=int, default=2000, help='Fleet size seeded before the import')
+        parser.add_argument('--import-rows', type=int, default=2000, help='Rows in the imported registers')
+        parser.add_argument('--readers', type=int, default=4, help='Concurrent report reader threads')
+        parser.add_argument('--seed', type=int, default=42, help='Seed for the synthetic data')
+        parser.add_argument('--output', type=str, default='concurrency_results.json',
+                            help='Where to write JSON results')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('The concurrency benchmark compares SQLite profiles; the default database is '
+                               f'{connection.vendor}')
+
+        with benchmark_database():
+            results = run_concurrency(
+                vehicles=options['vehicles'],
+                import_rows=options['import_rows'],
+                readers=options['readers'],
+                seed=options['seed'],
+                log=self.stdout.write,
+            )
+
+        write_results(results, options['output'])
+        self.stdout.write(self.style.SUCCESS(f"Wrote results to {options['output']}"))
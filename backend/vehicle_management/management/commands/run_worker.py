@@ -0,0 +1,72 @@
+# vehicle_management/management/commands/run_worker.py
+import os
+import socket
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from vehicle_management.job_queue import claim_next, requeue_stale, run_job
+
+
+class Command(BaseCommand):
+    help = ('Run queued background jobs (imports, exports, rollup rebuilds) on a thread pool. '
+            'Start several workers for more throughput; claiming a job is safe across processes.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=2, help='Jobs to run at once (default 2)')
+        parser.add_argument('--poll-interval', type=float, default=2.0,
+                            help='Seconds to wait for new jobs when the queue is empty (default 2)')
+        parser.add_argument('--once', action='store_true', help='Exit once the queue is drained')
+        parser.add_argument('--name', help='Worker name recorded on claimed jobs (default host:pid)')
+
+    def handle(self, *args, **options):
+        name = options['name'] or f'{socket.gethostname()}:{os.getpid()}'
+        threads = max(1, options['threads'])
+        poll_interval = options['poll_interval']
+        self.stdout.write(self.style.SUCCESS(f'Worker {name} started with {threads} threads'))
+
+        in_flight = {}
+        with ThreadPoolExecutor(max_workers=threads, thread_name_prefix='job') as pool:
+            try:
+                while True:
+                    requeued = requeue_stale()
+                    if requeued:
+                        self.stdout.write(self.style.WARNING(f'Requeued {requeued} stale jobs'))
+
+                    # Fill free slots
+                    while len(in_flight) < threads:
+                        job = claim_next(name)
+                        if job is None:
+                            break
+                        self.stdout.write(f'Started {self.label(job)}')
+                        in_flight[pool.submit(self.run, job)] = job
+
+                    if not in_flight:
+                        if options['once']:
+                            break
+                        time.sleep(poll_interval)
+                        continue
+
+                    done, _ = wait(in_flight, timeout=poll_interval, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        job = in_flight.pop(future)
+                        if future.result():
+                            self.stdout.write(self.style.SUCCESS(f'Finished {self.label(job)}'))
+                        else:
+                            self.stdout.write(self.style.ERROR(f'Failed {self.label(job)} (attempt {job.attempts})'))
+            except KeyboardInterrupt:
+                self.stdout.write(self.style.WARNING(f'Stopping; waiting for {len(in_flight)} running jobs'))
+
+    @staticmethod
+    def label(job):
+        return f'{job.get_kind_display()} #{job.pk}'
+
+    @staticmethod
+    def run(job):
+        try:
+            return run_job(job)
+        finally:
+            # Each pool thread has its own connection; don't leave it open between jobs
+            connection.close()
@@ -0,0 +1,39 @@
+# vehicle_management/management/commands/seed_fleet.py
+from django.core.management.base import BaseCommand, CommandError
+
+from vehicle_management.seeding import seed_fleet, clear_fleet
+
+
+class Command(BaseCommand):
+    help = 'Generate deterministic synthetic fleet data for development and benchmarking'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--vehicles', type=int, default=1000, help='Number of vehicles to create (default 1000)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed; the same seed gives the same data')
+        parser.add_argument('--services-per-vehicle', type=int, default=4,
+                            help='Average number of service records per vehicle')
+        parser.add_argument('--parts-per-service', type=int, default=2,
+                            help='Number of parts used on each service')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Rows per bulk insert')
+        parser.add_argument('--clear', action='store_true',
+                            help='Delete ALL existing vehicles, employees, parts and services first')
+
+    def handle(self, *args, **options):
+        if options['vehicles'] < 1:
+            raise CommandError('--vehicles must be at least 1')
+
+        if options['clear']:
+            self.stdout.write(self.style.WARNING('Deleting existing fleet data'))
+            clear_fleet()
+
+        counts = seed_fleet(
+            vehicles=options['vehicles'],
+            seed=options['seed'],
+            services_per_vehicle=options['services_per_vehicle'],
+            parts_per_service=options['parts_per_service'],
+            batch_size=options['batch_size'],
+            log=self.stdout.write,
+        )
+
+        summary = ', '.join(f'{count} {name}' for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f'Seeded fleet: {summary}'))
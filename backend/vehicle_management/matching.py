@@ -0,0 +1,106 @@
+# vehicle_management/matching.py
+# Resolve register rows to vehicles. Registrations and vehicle IDs are
+# normalised ("MAD 2", "mad-2" and "MAD2" are one key) and looked up in an
+# in-memory blocking index built with one query, so each row costs a dict
+# lookup instead of a query.
+import re
+from collections import namedtuple
+
+from .models import Vehicle
+
+_NOT_ALPHANUMERIC = re.compile(r'[^0-9A-Z]')
+
+# key: the vehicle matched, None when nothing or several vehicles match
+# via: the identifier that decided, 'registration' or 'name'
+# candidates: every vehicle that identifier hit
+Match = namedtuple('Match', 'key via candidates')
+NO_MATCH = Match(None, None, [])
+
+
+def normalise(value):
+    """Registration or vehicle ID as a match key: uppercase letters and digits only"""
+    return _NOT_ALPHANUMERIC.sub('', str(value or '').upper())
+
+
+class VehicleIndex:
+    """
+    Vehicles blocked by normalised registration and by normalised name.
+    The registration decides; the name is tried only when the registration
+    matches nothing, which also catches a re-registered vehicle. An
+    identifier shared by several vehicles is ambiguous and matches none.
+    Keys are vehicle pks, or any other hashable for vehicles an import
+    has only planned.
+    """
+
+    FIELDS = ('registration', 'name')
+
+    def __init__(self, vehicles=()):
+        self.identities = {}
+        self.blocks = {field: {} for field in self.FIELDS}
+        for key, name, registration in vehicles:
+            self.add(key, name, registration)
+
+    @classmethod
+    def from_database(cls, queryset=None):
+        queryset = Vehicle.objects.all() if queryset is None else queryset
+        return cls(queryset.values_list('pk', 'name', 'registration').iterator(chunk_size=2000))
+
+    def add(self, key, name, registration):
+        """Index a vehicle, or re-index one whose name or registration changed"""
+        self.discard(key)
+        self.identities[key] = (name, registration)
+        for field, value in zip(self.FIELDS, (registration, name)):
+            value = normalise(value)
+            if value:
+                self.blocks[field].setdefault(value, []).append(key)
+
+    def discard(self, key):
+        name, registration = self.identities.pop(key, (None, None))
+        for field, value in zip(self.FIELDS, (registration, name)):
+            block = self.blocks[field]
+            keys = block.get(normalise(value))
+            if keys and key in keys:
+                keys.remove(key)
+                if not keys:
+                    del block[normalise(value)]
+
+    def resolve(self, name='', registration=''):
+        for field, value in zip(self.FIELDS, (registration, name)):
+            candidates = self.blocks[field].get(normalise(value))
+            if candidates:
+                return Match(candidates[0] if len(candidates) == 1 else None, field, list(candidates))
+        return NO_MATCH
+
+    def registration(self, key):
+        return self.identities[key][1]
+
+
+class MatchReport:
+    """Rows that matched several vehicles, and rows matching a vehicle an earlier row already matched"""
+
+    def __init__(self):
+        self.claimed = {}
+        self.ambiguous = []
+        self.duplicates = []
+
+    def record(self, index, match, row, name, registration):
+        example = {'row': row, 'name': name, 'registration': registration}
+        if len(match.candidates) > 1:
+            self.ambiguous.append(dict(example, via=match.via, candidates=[
+                dict(zip(('name', 'registration'), index.identities[key])) for key in match.candidates
+            ]))
+        elif match.key is not None:
+            self.claim(match.key, row, example)
+
+    def claim(self, key, row, example=None):
+        if key in self.claimed and example is not None:
+            self.duplicates.append(dict(example, first_row=self.claimed[key]))
+        self.claimed.setdefault(key, row)
+
+    def as_dict(self, max_examples=None):
+        return {
+            'ambiguous': len(self.ambiguous),
+            'duplicates': len(self.duplicates),
+            'ambiguous_rows': self.ambiguous[:max_examples],
+            'duplicate_rows': self.duplicates[:max_examples],
+        }
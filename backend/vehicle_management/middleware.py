@@ -0,0 +1,94 @@
+# vehicle_management/middleware.py
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+from django.middleware.gzip import GZipMiddleware
+
+from .instrumentation import QueryRecorder, SerializationTimer, registry, serialization_timer
+
+
+class RequestMetricsMiddleware:
+    """
+    Record per-view query count, SQL time, serializer time, render time and
+    response size. Serializer time is spent inside the view, in serializers
+    using TimedSerializerMixin; render time is encoding the response body.
+
+    The figures are returned to the client as a `Server-Timing` header and
+    accumulated in the process-wide registry served by the metrics endpoint.
+    Keep this first in MIDDLEWARE so the timings cover the whole stack.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        serializing = SerializationTimer()
+        request._metrics_render_duration = 0.0
+        start = perf_counter()
+
+        token = serialization_timer.set(serializing)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(recorder))
+                response = self.get_response(request)
+        finally:
+            serialization_timer.reset(token)
+
+        total = perf_counter() - start
+        render = request._metrics_render_duration
+
+        if response.streaming:
+            size = int(response.get('Content-Length') or 0)
+        else:
+            size = len(response.content)
+
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={recorder.duration * 1000:.2f};desc="{recorder.count} queries"',
+            f'serialize;dur={serializing.duration * 1000:.2f}',
+            f'render;dur={render * 1000:.2f}',
+            f'total;dur={total * 1000:.2f}',
+        ])
+
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else 'unresolved'
+        if view != 'metrics':
+            registry.observe(
+                view,
+                request_duration_seconds=total,
+                sql_queries=recorder.count,
+                sql_duration_seconds=recorder.duration,
+                serialize_duration_seconds=serializing.duration,
+                render_duration_seconds=render,
+                response_size_bytes=size,
+            )
+
+        return response
+
+    def process_template_response(self, request, response):
+        # Template and DRF responses are rendered straight after this hook runs
+        render_start = perf_counter()
+
+        def record_render(rendered):
+            request._metrics_render_duration = perf_counter() - render_start
+
+        response.add_post_render_callback(record_render)
+        return response
+
+
+class ThresholdGZipMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware that leaves responses under GZIP_MIN_LENGTH bytes alone;
+    compressing small bodies costs more CPU than it saves on the wire.
+    Sits just below RequestMetricsMiddleware, which then records the
+    compressed size.
+    """
+
+    def process_response(self, request, response):
+        min_length = getattr(settings, 'GZIP_MIN_LENGTH', 1024)
+        if not response.streaming and len(response.content) < min_length:
+            return response
+        return super().process_response(request, response)
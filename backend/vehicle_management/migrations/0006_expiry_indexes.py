@@ -0,0 +1,28 @@
+# Generated by Django 5.1.6 on 2026-10-19 00:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vehicle_management', '0005_vehicle_assigned_employee_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='employee',
+            name='license_expiry',
+            field=models.DateField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='vehicle',
+            name='insurance_expiry',
+            field=models.DateField(blank=True, db_index=True, null=True, verbose_name='Insurance Expiry'),
+        ),
+        migrations.AlterField(
+            model_name='vehicle',
+            name='registration_expiry',
+            field=models.DateField(blank=True, db_index=True, null=True, verbose_name='Reg Expiry'),
+        ),
+    ]
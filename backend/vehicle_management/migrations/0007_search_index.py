@@ -0,0 +1,87 @@
+import re
+
+from django.db import migrations
+
+SEARCH_TABLE = 'vehicle_management_search'
+
+# The index layout as of this migration; later changes to search.py do not apply here
+KIND_STRIDE = 4
+KIND_CODES = {'vehicle': 1, 'employee': 2, 'part': 3}
+BATCH_SIZE = 5000
+
+_PUNCTUATION = re.compile(r'[\W_]+')
+
+
+def _compact(value):
+    return _PUNCTUATION.sub('', value or '')
+
+
+def _join(*values):
+    return ' '.join(dict.fromkeys(value for value in values if value))
+
+
+def _vehicle_document(vehicle):
+    title = _join(vehicle.name, vehicle.registration, _compact(vehicle.name), _compact(vehicle.registration))
+    body = _join(vehicle.make, vehicle.model, vehicle.vin, vehicle.employee_name, vehicle.fuel_card_number)
+    return title, body
+
+
+def _employee_document(employee):
+    title = _join(employee.first_name, employee.last_name, employee.employee_id, _compact(employee.employee_id))
+    body = _join(employee.position, employee.department, employee.license_number, employee.email)
+    return title, body
+
+
+def _part_document(part):
+    title = _join(part.part_number, _compact(part.part_number))
+    body = _join(part.description, part.supplier)
+    return title, body
+
+
+DOCUMENTS = {
+    'vehicle': ('Vehicle', _vehicle_document),
+    'employee': ('Employee', _employee_document),
+    'part': ('VehiclePart', _part_document),
+}
+
+
+def create_search_index(apps, schema_editor):
+    # FTS5 is SQLite-only; other backends use the ORM fallback in search.py
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+        "kind UNINDEXED, object_id UNINDEXED, title, body, "
+        "tokenize = 'unicode61', prefix = '2 3 4')"
+    )
+
+    db_alias = schema_editor.connection.alias
+    insert = f'INSERT INTO {SEARCH_TABLE} (rowid, kind, object_id, title, body) VALUES (%s, %s, %s, %s, %s)'
+    with schema_editor.connection.cursor() as cursor:
+        for kind, (model_name, document) in DOCUMENTS.items():
+            model = apps.get_model('vehicle_management', model_name)
+            rows = []
+            for instance in model.objects.using(db_alias).iterator(chunk_size=BATCH_SIZE):
+                rows.append((instance.pk * KIND_STRIDE + KIND_CODES[kind], kind, instance.pk, *document(instance)))
+                if len(rows) >= BATCH_SIZE:
+                    cursor.executemany(insert, rows)
+                    rows = []
+            if rows:
+                cursor.executemany(insert, rows)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vehicle_management', '0006_expiry_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations
+from django.db.models import Count, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Concat, Lower, Trim
+
+
+def backfill_assigned_employee(apps, schema_editor):
+    """
+    Link vehicles to employees whose "first last" name matches the free-text
+    employee_name, case-insensitively, in one UPDATE ... SET = (subquery).
+    Names shared by more than one employee are ambiguous and left unlinked.
+    """
+    Employee = apps.get_model('vehicle_management', 'Employee')
+    Vehicle = apps.get_model('vehicle_management', 'Vehicle')
+    db_alias = schema_editor.connection.alias
+
+    unique_match = (
+        Employee.objects.using(db_alias)
+        .annotate(match_name=Lower(Concat('first_name', Value(' '), 'last_name')))
+        .filter(match_name=Lower(Trim(OuterRef('employee_name'))))
+        .values('match_name')
+        .annotate(matches=Count('pk'), employee_pk=Max('pk'))
+        .filter(matches=1)
+        .values('employee_pk')
+    )
+
+    Vehicle.objects.using(db_alias).filter(
+        assigned_employee__isnull=True,
+    ).exclude(employee_name='').update(assigned_employee=Subquery(unique_match[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vehicle_management', '0007_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_assigned_employee, migrations.RunPython.noop),
+    ]
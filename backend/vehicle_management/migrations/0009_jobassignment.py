@@ -0,0 +1,30 @@
+# Generated by Django 5.1.6 on 2026-10-19 01:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vehicle_management', '0008_backfill_assigned_employee'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobAssignment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job', models.CharField(max_length=200)),
+                ('start_date', models.DateField(blank=True, null=True)),
+                ('end_date', models.DateField(blank=True, null=True)),
+                ('notes', models.TextField(blank=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_assignments', to='vehicle_management.employee')),
+                ('vehicle', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='job_assignments', to='vehicle_management.vehicle')),
+            ],
+            options={
+                'ordering': ['-start_date', '-id'],
+                'indexes': [models.Index(fields=['vehicle', 'start_date'], name='jobassign_vehicle_start_idx'), models.Index(fields=['employee', 'start_date'], name='jobassign_employee_start_idx'), models.Index(fields=['start_date', 'end_date'], name='jobassign_period_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,99 @@
+import re
+from datetime import datetime
+
+from django.db import migrations
+
+# The job history parser as of this migration; later changes to jobs.py do not apply here
+_DATE = re.compile(r'\b(\d{4}-\d{1,2}-\d{1,2}|\d{1,2}[/.]\d{1,2}[/.]\d{2,4})\b')
+_DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d/%m/%y', '%d.%m.%Y', '%d.%m.%y')
+_VEHICLE = re.compile(r'\b([A-Za-z]{2,4})[ -]?(\d{1,4})\b')
+_DATE_PHRASE = re.compile(
+    r'(?:\b(?:from|on|between)\s+)?\x00(?:\s*(?:-|–|to|until|till|and)\s*\x00)?', re.IGNORECASE
+)
+_EDGES = re.compile(r'^[\s\-–*•:|,]+|[\s\-–*•:|,]+$')
+
+
+def _parse_date(value):
+    for date_format in _DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            continue
+    return None
+
+
+def vehicle_key(name):
+    return re.sub(r'[\W_]+', '', name or '').upper()
+
+
+def parse_job_history(text, vehicle_ids):
+    """One assignment dict per line (or ';'), with the first two dates as start and end"""
+    assignments = []
+    for line in re.split(r'[\n;]+', text or ''):
+        line = line.strip()
+        if not line:
+            continue
+
+        dates = [parsed for parsed in map(_parse_date, _DATE.findall(line)) if parsed]
+        start = dates[0] if dates else None
+        end = dates[1] if len(dates) > 1 else start
+        if start and end and end < start:
+            start, end = end, start
+
+        vehicle_id = None
+        for match in _VEHICLE.finditer(line):
+            vehicle_id = vehicle_ids.get(vehicle_key(match.group(0)))
+            if vehicle_id:
+                break
+
+        job = _DATE_PHRASE.sub(' ', _DATE.sub('\x00', line))
+        job = _EDGES.sub('', re.sub(r'\(\s*\)', '', job))
+        job = re.sub(r'\s{2,}', ' ', job)
+
+        assignments.append({
+            'job': (job or line)[:200],
+            'start_date': start,
+            'end_date': end,
+            'vehicle_id': vehicle_id,
+            'notes': line,
+        })
+    return assignments
+
+
+def copy_job_history(apps, schema_editor):
+    """
+    Turn each employee's free-text job_history into JobAssignment rows.
+    job_history itself is left untouched so nothing is lost if a line
+    parses badly; the original line is kept in the assignment's notes.
+    """
+    Employee = apps.get_model('vehicle_management', 'Employee')
+    Vehicle = apps.get_model('vehicle_management', 'Vehicle')
+    JobAssignment = apps.get_model('vehicle_management', 'JobAssignment')
+    db_alias = schema_editor.connection.alias
+
+    vehicle_ids = {
+        vehicle_key(name): pk
+        for pk, name in Vehicle.objects.using(db_alias).values_list('pk', 'name')
+    }
+
+    batch = []
+    histories = Employee.objects.using(db_alias).exclude(job_history='').values_list('pk', 'job_history')
+    for employee_id, history in histories.iterator():
+        for assignment in parse_job_history(history, vehicle_ids):
+            batch.append(JobAssignment(employee_id=employee_id, **assignment))
+        if len(batch) >= 1000:
+            JobAssignment.objects.using(db_alias).bulk_create(batch)
+            batch = []
+    JobAssignment.objects.using(db_alias).bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vehicle_management', '0009_jobassignment'),
+    ]
+
+    operations = [
+        # Reversing keeps the rows: by then they may include appended assignments
+        migrations.RunPython(copy_job_history, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.1.6 on 2026-10-19 02:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vehicle_management', '0012_change_tracking'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vehicle',
+            name='fuel_tank_capacity',
+            field=models.DecimalField(blank=True, decimal_places=1, help_text='Litres; fills above this are flagged', max_digits=6, null=True),
+        ),
+        migrations.CreateModel(
+            name='FuelTransaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('card_number', models.CharField(max_length=50)),
+                ('transacted_at', models.DateTimeField()),
+                ('litres', models.DecimalField(decimal_places=2, max_digits=8)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('odometer', models.IntegerField(blank=True, null=True)),
+                ('site', models.CharField(blank=True, max_length=200)),
+                ('product', models.CharField(blank=True, max_length=50)),
+                ('source', models.CharField(blank=True, max_length=255)),
+                ('imported_at', models.DateTimeField(auto_now_add=True)),
+                ('vehicle', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='fuel_transactions', to='vehicle_management.vehicle')),
+            ],
+            options={
+                'ordering': ['-transacted_at', '-id'],
+                'indexes': [models.Index(fields=['vehicle', 'transacted_at'], name='fueltransaction_vehicle_idx'), models.Index(fields=['transacted_at'], name='fueltransaction_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('card_number', 'transacted_at', 'litres', 'amount'), name='fueltransaction_unique_line')],
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+import re
+
+from django.db import migrations
+from django.db.models import Q
+from django.utils import timezone
+
+# The lines import_parts appended to Vehicle.notes on every run
+TYRE_NOTE = re.compile(r'^(Tyre Size|Rim Colour): (.*)\n?', re.MULTILINE)
+BATCH_SIZE = 900
+
+
+def strip_tyre_notes(apps, schema_editor):
+    """
+    Remove the repeated "Tyre Size: ..." / "Rim Colour: ..." note lines in
+    one pass over the vehicles that have them, moving the latest values into
+    tyre_size and rim_color where those are still empty.
+    """
+    Vehicle = apps.get_model('vehicle_management', 'Vehicle')
+    db_alias = schema_editor.connection.alias
+    now = timezone.now()
+
+    vehicles = Vehicle.objects.using(db_alias).only('notes', 'tyre_size', 'rim_color')
+    # Ids first: SQLite gives no isolation between a cursor and updates to the table it reads
+    ids = list(vehicles.filter(
+        Q(notes__contains='Tyre Size: ') | Q(notes__contains='Rim Colour: ')
+    ).order_by('pk').values_list('pk', flat=True))
+
+    for start in range(0, len(ids), BATCH_SIZE):
+        batch = list(vehicles.in_bulk(ids[start:start + BATCH_SIZE]).values())
+        for vehicle in batch:
+            latest = {label: value.strip() for label, value in TYRE_NOTE.findall(vehicle.notes)}
+            vehicle.notes = TYRE_NOTE.sub('', vehicle.notes)
+            vehicle.tyre_size = vehicle.tyre_size or latest.get('Tyre Size', '')[:50]
+            vehicle.rim_color = vehicle.rim_color or latest.get('Rim Colour', '')[:50]
+            vehicle.updated_at = now
+        Vehicle.objects.using(db_alias).bulk_update(batch, ['notes', 'tyre_size', 'rim_color', 'updated_at'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vehicle_management', '0013_fuel_transactions'),
+    ]
+
+    operations = [
+        migrations.RunPython(strip_tyre_notes, migrations.RunPython.noop),
+    ]
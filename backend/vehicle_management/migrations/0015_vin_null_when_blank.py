@@ -0,0 +1,24 @@
+# Generated by Django 5.1.6 on 2026-10-19 02:11
+
+from django.db import migrations, models
+
+
+def blank_vins_to_null(apps, schema_editor):
+    Vehicle = apps.get_model('vehicle_management', 'Vehicle')
+    Vehicle.objects.using(schema_editor.connection.alias).filter(vin='').update(vin=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vehicle_management', '0014_strip_tyre_notes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='vehicle',
+            name='vin',
+            field=models.CharField(blank=True, max_length=50, null=True, unique=True, verbose_name='VIN'),
+        ),
+        migrations.RunPython(blank_vins_to_null, migrations.RunPython.noop),
+    ]
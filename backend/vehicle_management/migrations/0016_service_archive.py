@@ -0,0 +1,42 @@
+# Generated by Django 5.1.6 on 2026-10-19 02:14
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vehicle_management', '0015_vin_null_when_blank'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedServiceRecord',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('service_date', models.DateField(db_index=True)),
+                ('mileage_at_service', models.IntegerField()),
+                ('service_type', models.CharField(max_length=100)),
+                ('notes', models.TextField(blank=True)),
+                ('performed_by', models.CharField(max_length=200)),
+                ('cost', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('vehicle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_service_records', to='vehicle_management.vehicle')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedServicePartUsage',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('quantity', models.IntegerField(default=1)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('part', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='vehicle_management.vehiclepart')),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='parts_used', to='vehicle_management.archivedservicerecord')),
+            ],
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.6 on 2026-10-19 02:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vehicle_management', '0016_service_archive'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='servicerecord',
+            index=models.Index(fields=['service_date', 'id'], name='service_date_id_idx'),
+        ),
+    ]
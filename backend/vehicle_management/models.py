@@ -1,8 +1,37 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 from datetime import date, timedelta
 
-class Employee(models.Model):
+
+class TrackedModel(models.Model):
+    """
+    Adds change-tracking timestamps for delta sync. auto_now is skipped by
+    QuerySet.update() and bulk_update(), so those must set updated_at themselves.
+    """
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        abstract = True
+
+
+class Tombstone(models.Model):
+    """Marker left when a tracked row is deleted, so `?since=` clients learn to drop it"""
+    model = models.CharField(max_length=100)  # app_label.modelname
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['model', 'deleted_at'], name='tombstone_model_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.model} #{self.object_id} deleted {self.deleted_at:%Y-%m-%d %H:%M}"
+
+
+class Employee(TrackedModel):
     """Model representing a company employee who can be assigned to vehicles"""
     
     # Basic Information
@@ -18,7 +47,7 @@ class Employee(models.Model):
     
     # License Information
     license_number = models.CharField(max_length=50, blank=True)
-    license_expiry = models.DateField(null=True, blank=True)
+    license_expiry = models.DateField(null=True, blank=True, db_index=True)
     license_class = models.CharField(max_length=20, blank=True)  # e.g., C, LR, MR, HR
     
     # Employment Details
@@ -53,7 +82,7 @@ class Employee(models.Model):
         return self.license_expiry >= date.today()
 
 
-class Vehicle(models.Model):
+class Vehicle(TrackedModel):
     """Model representing a company vehicle"""
     STATUS_CHOICES = (
         ('active', 'Active'),
@@ -80,14 +109,17 @@ class Vehicle(models.Model):
     
     # Registration and Identification
     registration = models.CharField(max_length=20, unique=True, verbose_name="Registration")
-    registration_expiry = models.DateField(null=True, blank=True, verbose_name="Reg Expiry")
-    vin = models.CharField(max_length=50, unique=True, verbose_name="VIN")
+    registration_expiry = models.DateField(null=True, blank=True, db_index=True, verbose_name="Reg Expiry")
+    # Blank VINs are stored as NULL so that any number of vehicles can lack one
+    vin = models.CharField(max_length=50, unique=True, null=True, blank=True, verbose_name="VIN")
     engine_number = models.CharField(max_length=50, blank=True)
     fuel_card_number = models.CharField(max_length=50, blank=True)
+    fuel_tank_capacity = models.DecimalField(max_digits=6, decimal_places=1, null=True, blank=True,
+                                             help_text="Litres; fills above this are flagged")
     
     # Insurance
     insurance_company = models.CharField(max_length=100, blank=True, verbose_name="Insurance")
-    insurance_expiry = models.DateField(null=True, blank=True, verbose_name="Insurance Expiry")
+    insurance_expiry = models.DateField(null=True, blank=True, db_index=True, verbose_name="Insurance Expiry")
     
     # Operational Details
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active', verbose_name="Status")
@@ -109,6 +141,10 @@ class Vehicle(models.Model):
     
     def __str__(self):
         return f"{self.name} - {self.year} {self.make} {self.model} ({self.registration})"
+
+    def save(self, *args, **kwargs):
+        self.vin = (self.vin or '').strip() or None
+        super().save(*args, **kwargs)
     
     @property
     def next_service_date(self):
@@ -180,7 +216,7 @@ class Vehicle(models.Model):
 
 
 
-class VehiclePart(models.Model):
+class VehiclePart(TrackedModel):
     """Model representing parts that can be used in vehicles"""
     part_number = models.CharField(max_length=100, unique=True)
     description = models.TextField()
@@ -198,7 +234,7 @@ class VehiclePart(models.Model):
         return self.current_stock <= self.minimum_stock
 
 
-class VehiclePartCompatibility(models.Model):
+class VehiclePartCompatibility(TrackedModel):
     """Model linking parts to compatible vehicles"""
     vehicle = models.ForeignKey(Vehicle, on_delete=models.CASCADE, related_name='compatible_parts')
     part = models.ForeignKey(VehiclePart, on_delete=models.CASCADE, related_name='compatible_vehicles')
@@ -211,7 +247,7 @@ class VehiclePartCompatibility(models.Model):
         return f"{self.part} for {self.vehicle}"
 
 
-class ServiceRecord(models.Model):
+class ServiceRecord(TrackedModel):
     """Model for tracking service history"""
     vehicle = models.ForeignKey(Vehicle, on_delete=models.CASCADE, related_name='service_records')
     service_date = models.DateField()
@@ -220,16 +256,157 @@ class ServiceRecord(models.Model):
     notes = models.TextField(blank=True)
     performed_by = models.CharField(max_length=200)
     cost = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
-    
+
+    class Meta:
+        indexes = [
+            # archive_services walks services oldest first, a batch at a time
+            models.Index(fields=['service_date', 'id'], name='service_date_id_idx'),
+        ]
+
     def __str__(self):
         return f"{self.vehicle} - {self.service_date} ({self.service_type})"
 
 
-class ServicePartUsage(models.Model):
+class ServicePartUsage(TrackedModel):
     """Model for tracking parts used during service"""
     service = models.ForeignKey(ServiceRecord, on_delete=models.CASCADE, related_name='parts_used')
     part = models.ForeignKey(VehiclePart, on_delete=models.CASCADE)
     quantity = models.IntegerField(default=1)
     
     def __str__(self):
-        return f"{self.part} ({self.quantity}) for {self.service}"
\ No newline at end of file
+        return f"{self.part} ({self.quantity}) for {self.service}"
+
+class ArchivedServiceRecord(models.Model):
+    """
+    A ServiceRecord moved out of the live table by `archive_services`. It
+    keeps its id and created_at so `restore_services` can put it back.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    vehicle = models.ForeignKey(Vehicle, on_delete=models.CASCADE, related_name='archived_service_records')
+    service_date = models.DateField(db_index=True)
+    mileage_at_service = models.IntegerField()
+    service_type = models.CharField(max_length=100)
+    notes = models.TextField(blank=True)
+    performed_by = models.CharField(max_length=200)
+    cost = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.vehicle} - {self.service_date} ({self.service_type}, archived)"
+
+
+class ArchivedServicePartUsage(models.Model):
+    """A ServicePartUsage archived along with its service"""
+    id = models.BigIntegerField(primary_key=True)
+    service = models.ForeignKey(ArchivedServiceRecord, on_delete=models.CASCADE, related_name='parts_used')
+    part = models.ForeignKey(VehiclePart, on_delete=models.CASCADE)
+    quantity = models.IntegerField(default=1)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.part} ({self.quantity}) for {self.service}"
+
+
+class JobAssignment(TrackedModel):
+    """One stint of an employee on a job, optionally with a vehicle; end_date is empty while ongoing"""
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='job_assignments')
+    vehicle = models.ForeignKey(Vehicle, on_delete=models.SET_NULL, null=True, blank=True, related_name='job_assignments')
+    job = models.CharField(max_length=200)
+    # Nullable only for history imported from free text without dates
+    start_date = models.DateField(null=True, blank=True)
+    end_date = models.DateField(null=True, blank=True)
+    notes = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ['-start_date', '-id']
+        indexes = [
+            # "Who drove vehicle X between A and B" and per-employee history are
+            # range scans on start_date within one vehicle/employee
+            models.Index(fields=['vehicle', 'start_date'], name='jobassign_vehicle_start_idx'),
+            models.Index(fields=['employee', 'start_date'], name='jobassign_employee_start_idx'),
+            models.Index(fields=['start_date', 'end_date'], name='jobassign_period_idx'),
+        ]
+
+    def __str__(self):
+        period = f"{self.start_date or '?'} - {self.end_date or 'ongoing'}"
+        return f"{self.job} ({self.employee.full_name}, {period})"
+
+
+class FuelTransaction(models.Model):
+    """One line of a fuel card statement, loaded by `import_fuel_transactions`"""
+    # Null when the card matched no vehicle at import time
+    vehicle = models.ForeignKey(Vehicle, on_delete=models.SET_NULL, null=True, blank=True,
+                                related_name='fuel_transactions')
+    card_number = models.CharField(max_length=50)
+    transacted_at = models.DateTimeField()
+    litres = models.DecimalField(max_digits=8, decimal_places=2)
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    odometer = models.IntegerField(null=True, blank=True)
+    site = models.CharField(max_length=200, blank=True)
+    product = models.CharField(max_length=50, blank=True)
+    source = models.CharField(max_length=255, blank=True)  # Statement file the line came from
+    imported_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-transacted_at', '-id']
+        constraints = [
+            # Re-importing an overlapping statement skips lines already loaded
+            models.UniqueConstraint(fields=['card_number', 'transacted_at', 'litres', 'amount'],
+                                    name='fueltransaction_unique_line'),
+        ]
+        indexes = [
+            models.Index(fields=['vehicle', 'transacted_at'], name='fueltransaction_vehicle_idx'),
+            models.Index(fields=['transacted_at'], name='fueltransaction_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.card_number} {self.transacted_at:%Y-%m-%d %H:%M} {self.litres} L"
+
+
+class BackgroundJob(models.Model):
+    """A queued unit of work picked up by the `run_worker` command"""
+    KIND_CHOICES = (
+        ('import', 'Excel import'),
+        ('export', 'Export'),
+        ('rollup', 'Rollup rebuild'),
+    )
+    STATUS_CHOICES = (
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    )
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+
+    # Progress reporting, updated by the worker while the job runs
+    progress = models.PositiveSmallIntegerField(default=0)  # percent
+    message = models.CharField(max_length=255, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    # Retry bookkeeping
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    worker = models.CharField(max_length=100, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+        indexes = [
+            # The worker's poll: oldest runnable queued job
+            models.Index(fields=['status', 'run_after'], name='backgroundjob_poll_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.pk} ({self.status})"
@@ -0,0 +1,54 @@
+# vehicle_management/postgres.py
+# PostgreSQL-only fast paths for the reports. Callers check is_postgres()
+# first and keep the portable ORM query as the fallback for SQLite.
+from django.db import connections
+
+from .models import ServiceRecord
+
+
+def is_postgres(using='default'):
+    return connections[using].vendor == 'postgresql'
+
+
+def monthly_costs(start_date, end_date, using='default', model=ServiceRecord):
+    """
+    Total cost and service count for every month with services between the
+    two dates, grouped on date_trunc over a single range scan of the
+    service_date index. Callers zero-fill the empty months.
+    `model` is ServiceRecord or its archive table.
+    Returns (month_start, total_cost, service_count) tuples in month order.
+    """
+    table = model._meta.db_table
+    sql = f'''
+        SELECT date_trunc('month', service_date)::date AS month, COALESCE(SUM(cost), 0), COUNT(id)
+        FROM {table}
+        WHERE service_date BETWEEN %(start)s AND %(end)s
+        GROUP BY month
+        ORDER BY month
+    '''
+    with connections[using].cursor() as cursor:
+        cursor.execute(sql, {'start': start_date, 'end': end_date})
+        return cursor.fetchall()
+
+
+def boundary_service_mileage(start_date, end_date, using='default'):
+    """
+    Mileage at each vehicle's first and latest service in the range, using
+    DISTINCT ON instead of a correlated subquery per vehicle.
+    Returns {vehicle_id: (first_mileage, latest_mileage)}.
+    """
+    in_range = ServiceRecord.objects.using(using).filter(
+        service_date__gte=start_date,
+        service_date__lte=end_date,
+    )
+    first = dict(
+        in_range.order_by('vehicle_id', 'service_date', 'id')
+        .distinct('vehicle_id')
+        .values_list('vehicle_id', 'mileage_at_service')
+    )
+    latest = dict(
+        in_range.order_by('vehicle_id', '-service_date', '-id')
+        .distinct('vehicle_id')
+        .values_list('vehicle_id', 'mileage_at_service')
+    )
+    return {vehicle_id: (first[vehicle_id], latest[vehicle_id]) for vehicle_id in latest}
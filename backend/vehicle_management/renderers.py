@@ -0,0 +1,25 @@
+# vehicle_management/renderers.py
+# Default JSON renderer for the API. orjson serialises large lists several
+# times faster than json.dumps; without it this is DRF's stock renderer.
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Datetimes go through DRF's encoder too, so raw datetimes in reports keep
+# DRF's millisecond 'Z' format; serializer fields have formatted theirs already
+ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson else 0
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer using orjson when installed, falling back to the stdlib for indented output"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return orjson.dumps(data, default=JSONEncoder().default, option=ORJSON_OPTIONS)
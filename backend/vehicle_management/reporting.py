@@ -0,0 +1,99 @@
+# vehicle_management/reporting.py
+# Read-only snapshot of the SQLite database for the report views. A copy is
+# taken with SQLite's online backup API (`refresh_reporting_snapshot`) and
+# swapped into place atomically; while a report view runs, ReportingRouter
+# sends its reads to the 'reporting' alias, so heavy aggregates no longer
+# hold read locks on the database the importer and the API write to.
+import os
+import sqlite3
+from contextvars import ContextVar
+from datetime import datetime, timezone as dt_timezone
+from functools import wraps
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+REPORTING_DB = 'reporting'
+
+_use_snapshot = ContextVar('use_reporting_snapshot', default=False)
+
+
+class ReportingRouter:
+    """Reads go to the snapshot inside `reporting_snapshot` views; writes and migrations never do"""
+
+    def db_for_read(self, model, **hints):
+        return REPORTING_DB if _use_snapshot.get() else None
+
+    def db_for_write(self, model, **hints):
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The snapshot is a copy of the migrated default database
+        return False if db == REPORTING_DB else None
+
+
+def snapshot_taken_at():
+    """When the current snapshot was taken, None without a configured and existing snapshot"""
+    path = getattr(settings, 'REPORTING_SNAPSHOT', None)
+    if REPORTING_DB not in settings.DATABASES or not path:
+        return None
+    try:
+        # refresh_snapshot() dates the file to the start of the copy
+        return datetime.fromtimestamp(os.stat(path).st_mtime, tz=dt_timezone.utc)
+    except FileNotFoundError:
+        return None
+
+
+def refresh_snapshot(path=None):
+    """
+    Copy the default SQLite database to the snapshot file and return when
+    the copy was taken. The backup runs in one step, so it reads a single
+    consistent state; with WAL enabled writers carry on meanwhile. Readers
+    of the old snapshot keep it until they reconnect.
+    """
+    source = connections['default']
+    if source.vendor != 'sqlite':
+        raise ValueError('Reporting snapshots need the default database to be SQLite')
+    path = str(path or settings.REPORTING_SNAPSHOT)
+    partial = f'{path}.partial'
+
+    source.ensure_connection()
+    taken_at = timezone.now()
+    target = sqlite3.connect(partial)
+    try:
+        source.connection.backup(target)
+        # A WAL-mode copy could not be opened read-only without its -shm file
+        target.execute('PRAGMA journal_mode = DELETE')
+    finally:
+        target.close()
+    os.utime(partial, (taken_at.timestamp(), taken_at.timestamp()))
+    os.replace(partial, path)
+    return taken_at
+
+
+def reporting_snapshot(view):
+    """
+    Run a report view against the snapshot when it is younger than
+    REPORTING_SNAPSHOT_MAX_AGE seconds, and against the live database
+    otherwise. The response says which, and how old the snapshot is.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        taken_at = snapshot_taken_at()
+        age = None if taken_at is None else (timezone.now() - taken_at).total_seconds()
+        use_snapshot = age is not None and age <= getattr(settings, 'REPORTING_SNAPSHOT_MAX_AGE', 900)
+        token = _use_snapshot.set(use_snapshot)
+        try:
+            response = view(request, *args, **kwargs)
+        finally:
+            _use_snapshot.reset(token)
+        response['X-Data-Source'] = 'snapshot' if use_snapshot else 'live'
+        if use_snapshot:
+            response['X-Snapshot-Taken-At'] = taken_at.isoformat()
+            response['X-Snapshot-Age'] = str(max(0, int(age)))
+        return response
+    return wrapper
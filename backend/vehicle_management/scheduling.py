@@ -0,0 +1,211 @@
+# vehicle_management/scheduling.py
+# Workshop bay scheduling for upcoming services. Vehicles are booked earliest
+# due date first (a heap keyed on the due date) into the first bay and day
+# that fits: the vehicle is available, a bay is free for the whole service,
+# and the parts are in stock or could arrive. Fully booked days are skipped
+# with a union-find "next open day" table, so thousands of vehicles over a
+# six-month horizon take well under a second.
+import heapq
+from collections import namedtuple
+from datetime import date, timedelta
+
+from django.conf import settings
+
+from .models import Vehicle, VehiclePart, VehiclePartCompatibility
+
+HORIZON_DAYS = 183
+# Bays open per day, Monday to Friday and at weekends
+BAYS = getattr(settings, 'WORKSHOP_BAYS', 2)
+WEEKEND_BAYS = getattr(settings, 'WORKSHOP_WEEKEND_BAYS', 0)
+# Filters each service fits, by the type VehiclePart.description starts with, from the vehicle's compatible parts.
+# These are the only service types the plan predicts a due date for.
+SERVICE_PARTS = {
+    'Minor Service': ['Oil Filter'],
+    'Major Service': ['Oil Filter', 'Fuel Filter', 'Air Filter', 'Cabin Filter'],
+}
+PLANNED_SERVICE_TYPES = list(SERVICE_PARTS)
+# Bay-days each predicted service occupies
+SERVICE_DURATIONS = getattr(settings, 'WORKSHOP_SERVICE_DURATIONS', {'Minor Service': 1, 'Major Service': 2})
+# Book no more than this many days before a service is due
+EARLY_DAYS = 14
+# Days for out-of-stock parts to arrive once ordered
+PARTS_LEAD_DAYS = 7
+# FIFO swing shared by the roster: days on site, days off, and a day the swing starts on.
+# Vehicles assigned to FIFO employees can only go into the workshop while their driver is off site.
+FIFO_ROSTER = getattr(settings, 'FIFO_ROSTER', (14, 7, date(2024, 1, 1)))
+# Statuses that take a vehicle out of the plan
+UNSCHEDULED_STATUSES = ('off_road', 'decommissioned')
+
+SCHEDULE_COLUMNS = ['vehicle_id', 'name', 'registration', 'service_type', 'due_date', 'start_date', 'end_date',
+                    'bay', 'overdue_days', 'parts']
+
+Booking = namedtuple('Booking', SCHEDULE_COLUMNS)
+
+
+def due_date(vehicle, today):
+    """
+    When the vehicle's next service falls due: mileage already past its
+    interval, or no service on record, means today at the latest.
+    """
+    if vehicle['last_service_date'] is None:
+        return today
+    due = vehicle['last_service_date'] + timedelta(days=vehicle['service_interval_months'] * 30)
+    if vehicle['last_service_mileage'] is not None and \
+            vehicle['current_mileage'] >= vehicle['last_service_mileage'] + vehicle['service_interval_miles']:
+        due = min(due, today)
+    return due
+
+
+class _Bays:
+    """Bay occupancy per day as bitmasks, with a union-find skip over fully booked days"""
+
+    def __init__(self, start, days, bays, weekend_bays):
+        self.capacity = [weekend_bays if (start + timedelta(days=day)).weekday() >= 5 else bays
+                         for day in range(days)]
+        self.occupied = [0] * days
+        # Closed days (no bays) start out skipped
+        self.next_open = [day + 1 if day < days and not self.capacity[day] else day for day in range(days + 1)]
+
+    def open_day(self, day):
+        """First day from `day` with a free bay; len(capacity) when there is none"""
+        root = day
+        while self.next_open[root] != root:
+            root = self.next_open[root]
+        while self.next_open[day] != root:
+            self.next_open[day], day = root, self.next_open[day]
+        return root
+
+    def free_bay(self, day, length):
+        """Lowest bay free on every day of [day, day + length), or None"""
+        capacity = min(self.capacity[day:day + length])
+        taken = 0
+        for occupied in self.occupied[day:day + length]:
+            taken |= occupied
+        free = ~taken & ((1 << capacity) - 1)
+        return (free & -free).bit_length() - 1 if free else None
+
+    def book(self, day, length, bay):
+        for booked in range(day, day + length):
+            self.occupied[booked] |= 1 << bay
+            if self.occupied[booked] == (1 << self.capacity[booked]) - 1:
+                self.next_open[booked] = booked + 1
+
+
+def plan_workshop(start=None, days=HORIZON_DAYS, bays=BAYS, weekend_bays=WEEKEND_BAYS, durations=None,
+                  early_days=EARLY_DAYS, parts_lead_days=PARTS_LEAD_DAYS, roster=FIFO_ROSTER):
+    """
+    Book every vehicle whose service falls due within `days` of `start`
+    (default today) into the workshop, minimising overdue days. Durations
+    for types outside PLANNED_SERVICE_TYPES are not booked; they are listed
+    under 'unplanned_service_types'.
+    Returns {'schedule': [Booking], 'unscheduled': [...], 'parts_to_order': [...],
+    'unplanned_service_types': [...], 'summary': {...}}.
+    """
+    start = start or date.today()
+    end = start + timedelta(days=days)
+    durations = dict(SERVICE_DURATIONS, **(durations or {}))
+    unplanned = sorted(set(durations) - set(PLANNED_SERVICE_TYPES))
+    on_days, off_days, roster_start = roster
+
+    vehicles = {
+        vehicle['id']: vehicle for vehicle in Vehicle.objects.exclude(status__in=UNSCHEDULED_STATUSES).values(
+            'id', 'name', 'registration', 'status', 'last_service_date', 'service_interval_months',
+            'current_mileage', 'last_service_mileage', 'service_interval_miles', 'next_major_service_date',
+            'assigned_employee__fifo',
+        )
+    }
+    heap = []
+    for vehicle in vehicles.values():
+        due = due_date(vehicle, start)
+        if due < end:
+            heap.append((due, vehicle['id']))
+    heapq.heapify(heap)
+
+    # Compatible filters per vehicle and the stock left to hand out, in two queries
+    compatible = {}
+    for vehicle_id, part_id, description in VehiclePartCompatibility.objects.exclude(
+        vehicle__status__in=UNSCHEDULED_STATUSES
+    ).values_list('vehicle_id', 'part_id', 'part__description'):
+        # Descriptions are the filter type, optionally followed by " - <make> <model>"
+        compatible.setdefault((vehicle_id, description.split(' - ')[0]), []).append(part_id)
+    parts = {
+        part_id: [part_number, stock]
+        for part_id, part_number, stock in VehiclePart.objects.filter(
+            pk__in=VehiclePartCompatibility.objects.values('part_id')
+        ).values_list('id', 'part_number', 'current_stock')
+    }
+    shortfall = {}
+
+    bays_by_day = _Bays(start, days, bays, weekend_bays)
+    schedule, unscheduled = [], []
+    while heap:
+        due, vehicle_id = heapq.heappop(heap)
+        vehicle = vehicles[vehicle_id]
+        major = vehicle['next_major_service_date']
+        service_type = 'Major Service' if major is not None and major <= due else 'Minor Service'
+        length = durations[service_type]
+        earliest = max(0, (due - start).days - early_days)
+
+        # Reserve parts; anything out of stock is ordered and holds the booking back by the lead time
+        reserved = []
+        for description in SERVICE_PARTS[service_type]:
+            options = compatible.get((vehicle_id, description))
+            if not options:
+                continue
+            part_id = max(options, key=lambda option: parts[option][1])
+            parts[part_id][1] -= 1
+            if parts[part_id][1] < 0:
+                shortfall[part_id] = shortfall.get(part_id, 0) + 1
+                earliest = max(earliest, parts_lead_days)
+            reserved.append(part_id)
+
+        fifo = vehicle['assigned_employee__fifo'] and vehicle['status'] == 'active'
+        day = bays_by_day.open_day(earliest)
+        while day + length <= days:
+            # FIFO vehicles are free only on their driver's days off, for the whole service
+            on_site = fifo and any(
+                ((start - roster_start).days + booked) % (on_days + off_days) < on_days
+                for booked in range(day, day + length)
+            )
+            bay = None if on_site else bays_by_day.free_bay(day, length)
+            if bay is not None:
+                bays_by_day.book(day, length, bay)
+                booked = start + timedelta(days=day)
+                schedule.append(Booking(
+                    vehicle_id, vehicle['name'], vehicle['registration'], service_type, due, booked,
+                    booked + timedelta(days=length - 1), bay + 1, max(0, (booked - due).days),
+                    [parts[part_id][0] for part_id in reserved],
+                ))
+                break
+            day = bays_by_day.open_day(day + 1)
+        else:
+            for part_id in reserved:
+                parts[part_id][1] += 1
+                if parts[part_id][1] <= 0:
+                    shortfall[part_id] -= 1
+            unscheduled.append({
+                'vehicle_id': vehicle_id, 'name': vehicle['name'], 'registration': vehicle['registration'],
+                'service_type': service_type, 'due_date': due,
+                'overdue_days_at_horizon': max(0, (end - due).days),
+                'reason': 'No free bay before the end of the horizon',
+            })
+
+    schedule.sort(key=lambda booking: (booking.start_date, booking.bay))
+    return {
+        'schedule': schedule,
+        'unscheduled': unscheduled,
+        'parts_to_order': sorted(
+            ({'part_id': part_id, 'part_number': parts[part_id][0], 'quantity': quantity}
+             for part_id, quantity in shortfall.items() if quantity > 0),
+            key=lambda order: order['part_number'],
+        ),
+        'unplanned_service_types': unplanned,
+        'summary': {
+            'start': start,
+            'days': days,
+            'scheduled': len(schedule),
+            'unscheduled': len(unscheduled),
+            'overdue_days': sum(booking.overdue_days for booking in schedule),
+            'late_services': sum(1 for booking in schedule if booking.overdue_days),
+        },
+    }
@@ -0,0 +1,200 @@
+# vehicle_management/search.py
+import re
+
+from django.db import connections, transaction
+from django.db.models import Q
+
+from .models import Vehicle, Employee, VehiclePart
+
+# FTS5 virtual table created by migration 0007_search_index (SQLite only); the
+# migration keeps its own copy of the document layout below
+SEARCH_TABLE = 'vehicle_management_search'
+
+# rowid = object id * KIND_STRIDE + kind code, so one row per object can be
+# replaced or deleted by rowid without a lookup
+KIND_STRIDE = 4
+KIND_CODES = {'vehicle': 1, 'employee': 2, 'part': 3}
+
+# bm25 column weights: kind and object_id are unindexed, title outranks body
+BM25_WEIGHTS = '0.0, 0.0, 10.0, 1.0'
+
+INSERT_SQL = f'INSERT INTO {SEARCH_TABLE} (rowid, kind, object_id, title, body) VALUES (%s, %s, %s, %s, %s)'
+
+_TERM = re.compile(r'\w+')
+_PUNCTUATION = re.compile(r'[\W_]+')
+
+
+def search_backend(using='default'):
+    """'fts5' when the FTS index can be used, otherwise 'orm'"""
+    return 'fts5' if connections[using].vendor == 'sqlite' else 'orm'
+
+
+def compact(value):
+    """'MAD 2' -> 'MAD2', 'FF-42-001' -> 'FF42001', so partial IDs match either way"""
+    return _PUNCTUATION.sub('', value or '')
+
+
+def _join(*values):
+    """Space-join the non-empty values, skipping repeats such as an ID that is already compact"""
+    return ' '.join(dict.fromkeys(value for value in values if value))
+
+
+def vehicle_document(vehicle):
+    title = _join(vehicle.name, vehicle.registration, compact(vehicle.name), compact(vehicle.registration))
+    body = _join(vehicle.make, vehicle.model, vehicle.vin, vehicle.employee_name, vehicle.fuel_card_number)
+    return title, body
+
+
+def employee_document(employee):
+    title = _join(employee.first_name, employee.last_name, employee.employee_id, compact(employee.employee_id))
+    body = _join(employee.position, employee.department, employee.license_number, employee.email)
+    return title, body
+
+
+def part_document(part):
+    title = _join(part.part_number, compact(part.part_number))
+    body = _join(part.description, part.supplier)
+    return title, body
+
+
+DOCUMENTS = {
+    'vehicle': (Vehicle, vehicle_document),
+    'employee': (Employee, employee_document),
+    'part': (VehiclePart, part_document),
+}
+KIND_FOR_MODEL = {model: kind for kind, (model, _) in DOCUMENTS.items()}
+
+
+def _rowid(kind, object_id):
+    return object_id * KIND_STRIDE + KIND_CODES[kind]
+
+
+def index_object(instance, using='default'):
+    """Insert or replace the search row for a Vehicle, Employee or VehiclePart"""
+    if search_backend(using) != 'fts5':
+        return
+    kind = KIND_FOR_MODEL[type(instance)]
+    title, body = DOCUMENTS[kind][1](instance)
+    rowid = _rowid(kind, instance.pk)
+    with connections[using].cursor() as cursor:
+        # FTS5 has no UPSERT; delete-then-insert by rowid is the idiom
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [rowid])
+        cursor.execute(INSERT_SQL, [rowid, kind, instance.pk, title, body])
+
+
+def remove_object(instance, using='default'):
+    if search_backend(using) != 'fts5':
+        return
+    kind = KIND_FOR_MODEL[type(instance)]
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [_rowid(kind, instance.pk)])
+
+
+def rebuild_search_index(using='default', batch_size=5000):
+    """Repopulate the whole index, e.g. after bulk inserts that skip signals"""
+    if search_backend(using) != 'fts5':
+        return 0
+    total = 0
+    # One transaction: in autocommit every executemany row would be its own commit
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        for kind, (model, document) in DOCUMENTS.items():
+            rows = []
+            for instance in model.objects.using(using).iterator(chunk_size=batch_size):
+                title, body = document(instance)
+                rows.append((_rowid(kind, instance.pk), kind, instance.pk, title, body))
+                if len(rows) >= batch_size:
+                    cursor.executemany(INSERT_SQL, rows)
+                    total += len(rows)
+                    rows = []
+            if rows:
+                cursor.executemany(INSERT_SQL, rows)
+                total += len(rows)
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')")
+    return total
+
+
+def build_match_query(query):
+    """
+    Turn free text into an FTS5 MATCH expression: every term as a quoted
+    prefix, ANDed together, OR the whole query compacted into one prefix so
+    'MAD 2' also finds 'MAD2' and 'ff-42' finds 'FF42...'.
+    Returns None when the query has no searchable terms.
+    """
+    terms = _TERM.findall(query.lower())
+    if not terms:
+        return None
+    expression = ' AND '.join(f'"{term}"*' for term in terms)
+    if len(terms) > 1:
+        expression = f'({expression}) OR "{"".join(terms)}"*'
+    return expression
+
+
+def build_exact_query(query):
+    """
+    MATCH expression for titles holding every term as a whole token, or the
+    compacted query as one: 'MAD 2' matches "MAD 2" and "MAD2" but not "MAD 26".
+    Returns None when the query has no searchable terms.
+    """
+    terms = _TERM.findall(query.lower())
+    if not terms:
+        return None
+    expression = ' AND '.join(f'"{term}"' for term in terms)
+    if len(terms) > 1:
+        expression = f'({expression}) OR "{"".join(terms)}"'
+    return f'title : ({expression})'
+
+
+def search(query, kinds=None, limit=20, using='default'):
+    """
+    Ranked search across vehicles, employees and parts.
+    Whole-identifier matches come first, then prefix matches, each by bm25.
+    Returns a list of {'kind', 'id', 'title', 'score'} dicts, best first.
+    """
+    kinds = [kind for kind in (kinds or KIND_CODES) if kind in KIND_CODES]
+    if not kinds:
+        return []
+
+    if search_backend(using) == 'orm':
+        return _orm_search(query, kinds, limit, using)
+
+    match = build_match_query(query)
+    if match is None:
+        return []
+    exact = build_exact_query(query)
+
+    # bm25 cannot tell "MAD 2" from "MAD 26" for the prefix query, so rank in two tiers
+    placeholders = ', '.join(['%s'] * len(kinds))
+    tier = (
+        f'SELECT kind, object_id, title, %s AS tier, bm25({SEARCH_TABLE}, {BM25_WEIGHTS}) AS score '
+        f'FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s AND kind IN ({placeholders})'
+    )
+    sql = f'SELECT kind, object_id, title, score FROM ({tier} UNION ALL {tier}) ORDER BY tier, score LIMIT %s'
+    with connections[using].cursor() as cursor:
+        cursor.execute(sql, [0, exact, *kinds, 1, f'({match}) NOT ({exact})', *kinds, limit])
+        rows = cursor.fetchall()
+
+    # bm25 scores are negative, lower is better; flip them for clients
+    return [
+        {'kind': kind, 'id': object_id, 'title': title, 'score': round(-score, 4)}
+        for kind, object_id, title, score in rows
+    ]
+
+
+def _orm_search(query, kinds, limit, using):
+    """Fallback for databases without the FTS5 table: prefix/substring lookups, unranked"""
+    term = query.strip()
+    if not term:
+        return []
+    filters = {
+        'vehicle': Q(name__icontains=term) | Q(registration__icontains=term) | Q(employee_name__icontains=term),
+        'employee': (Q(first_name__icontains=term) | Q(last_name__icontains=term)
+                     | Q(employee_id__icontains=term)),
+        'part': Q(part_number__icontains=term) | Q(description__icontains=term) | Q(supplier__icontains=term),
+    }
+    results = []
+    for kind in kinds:
+        model, document = DOCUMENTS[kind]
+        for instance in model.objects.using(using).filter(filters[kind])[:limit]:
+            results.append({'kind': kind, 'id': instance.pk, 'title': document(instance)[0], 'score': None})
+    return results[:limit]
@@ -0,0 +1,394 @@
+# vehicle_management/seeding.py
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import islice
+
+from django.contrib.auth.models import User
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+
+from .alerts import invalidate_expiry_digest
+from .compat_graph import graph as compatibility_graph
+from .excel_layout import PARTS_COLUMNS, PARTS_SHEET
+from .search import rebuild_search_index
+from .sync import batched_tombstones
+from .models import (
+    ArchivedServicePartUsage, ArchivedServiceRecord, Employee, FuelTransaction, JobAssignment, Vehicle, VehiclePart,
+    VehiclePartCompatibility, ServiceRecord, ServicePartUsage,
+)
+
+FIRST_NAMES = ['Jack', 'Liam', 'Noah', 'Oliver', 'William', 'James', 'Lucas', 'Mia', 'Charlotte',
+               'Olivia', 'Amelia', 'Isla', 'Ava', 'Grace', 'Ethan', 'Mason', 'Harper', 'Ruby']
+LAST_NAMES = ['Smith', 'Jones', 'Williams', 'Brown', 'Wilson', 'Taylor', 'Nguyen', 'Johnson',
+              'Martin', 'White', 'Anderson', 'Walker', 'Thompson', 'Kelly', 'Ryan', 'Harris']
+POSITIONS = ['Driller', 'Fitter', 'Electrician', 'Geologist', 'Supervisor', 'Operator', 'Surveyor']
+DEPARTMENTS = ['Exploration', 'Maintenance', 'Operations', 'Processing', 'Safety']
+LICENCE_CLASSES = ['C', 'LR', 'MR', 'HR', 'HC']
+MODELS = [
+    ('Toyota', 'Hilux'), ('Toyota', 'Landcruiser 79'), ('Toyota', 'Landcruiser 200'),
+    ('Isuzu', 'D-Max'), ('Ford', 'Ranger'), ('Mitsubishi', 'Triton'), ('Nissan', 'Navara'),
+    ('Isuzu', 'NPS 300'), ('Mercedes-Benz', 'Unimog'), ('Volkswagen', 'Amarok'),
+]
+# Fuel tank capacity in litres by model
+TANK_CAPACITIES = {
+    'Hilux': 80, 'Landcruiser 79': 130, 'Landcruiser 200': 138, 'D-Max': 76, 'Ranger': 80, 'Triton': 75,
+    'Navara': 80, 'NPS 300': 100, 'Unimog': 160, 'Amarok': 80,
+}
+FILTER_TYPES = ['Fuel Filter', 'Oil Filter', 'Air Filter', 'Cabin Filter']
+SUPPLIERS = ['Ryco', 'Sakura', 'Donaldson', 'Baldwin', 'Wesfil', 'Toyota Genuine']
+FUEL_SITES = ['Ampol Kalgoorlie', 'BP Newman', 'Shell Karratha', 'Caltex Port Hedland', 'United Leonora']
+INSURERS = ['QBE', 'Allianz', 'CGU', 'Zurich', 'Suncorp']
+SERVICE_TYPES = ['Minor Service', 'Major Service', 'Tyre Rotation', 'Brake Service',
+                 'Pre-start Defect', 'Annual Inspection']
+TYRE_SIZES = ['265/70R16', '265/75R16', '245/70R17', '285/70R17', '7.50R16', '255/70R15']
+RIM_COLOURS = ['Black', 'Silver', 'White']
+JOBS = ['Drill pad clearing', 'Core sampling', 'Haul road grading', 'Pump install', 'Camp move',
+        'Exploration support', 'Pit dewatering', 'Survey pickup']
+STATUS_WEIGHTS = [('active', 80), ('maintenance', 10), ('off_road', 6), ('decommissioned', 4)]
+
+# Alternative part numbers available per filter type for each model
+VARIANTS_PER_FILTER = 3
+
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _next_id(model):
+    return (model.objects.aggregate(Max('id'))['id__max'] or 0) + 1
+
+
+def clear_fleet():
+    """Delete all fleet data, children first"""
+    with batched_tombstones():
+        for model in (FuelTransaction, JobAssignment, ArchivedServicePartUsage, ArchivedServiceRecord,
+                      ServicePartUsage, ServiceRecord, VehiclePartCompatibility, VehiclePart, Vehicle, Employee):
+            model.objects.all().delete()
+
+
+def seed_fleet(vehicles=1000, seed=42, services_per_vehicle=4, parts_per_service=2,
+               anchor=None, batch_size=2000, log=None):
+    """
+    Generate a synthetic fleet with `vehicles` vehicles and proportional
+    employees, parts, compatibilities, services and part usages.
+
+    The same seed always produces the same rows; dates are laid out relative
+    to `anchor` (today by default) so date-windowed reports see a realistic
+    spread. Primary keys are assigned up front so every table can be written
+    with bulk_create without reading anything back.
+    """
+    rng = random.Random(seed)
+    anchor = anchor or date.today()
+    log = log or (lambda message: None)
+    counts = {}
+
+    employee_count = max(1, vehicles // 10)
+    statuses = [s for s, _ in STATUS_WEIGHTS]
+    weights = [w for _, w in STATUS_WEIGHTS]
+
+    with transaction.atomic():
+        # Employees
+        employee_start = _next_id(Employee)
+        employees = []
+        for n in range(employee_count):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            employees.append(Employee(
+                id=employee_start + n,
+                first_name=first,
+                last_name=last,
+                employee_id=f'S{seed}-E{employee_start + n:06d}',
+                position=rng.choice(POSITIONS),
+                department=rng.choice(DEPARTMENTS),
+                email=f'{first}.{last}{employee_start + n}@example.com'.lower(),
+                license_number=f'{rng.randrange(10 ** 7, 10 ** 8)}',
+                license_expiry=anchor + timedelta(days=rng.randint(-60, 1100)),
+                license_class=rng.choice(LICENCE_CLASSES),
+                hire_date=anchor - timedelta(days=rng.randint(30, 4000)),
+                fifo=rng.random() < 0.4,
+            ))
+        Employee.objects.bulk_create(employees, batch_size=batch_size)
+        counts['employees'] = len(employees)
+        log(f'Created {len(employees)} employees')
+
+        # Login accounts for supervisors that vehicles are checked out to
+        user_start = _next_id(User)
+        users = [
+            User(id=user_start + n, username=f'fleet{seed}-{user_start + n}', password='!')
+            for n in range(max(1, vehicles // 50))
+        ]
+        User.objects.bulk_create(users, batch_size=batch_size)
+        counts['users'] = len(users)
+
+        # Parts: a few alternative part numbers per filter type per model
+        part_id = _next_id(VehiclePart)
+        model_parts = {}  # (make, model) -> {filter type: [part ids]}
+        parts = []
+        for make, model in MODELS:
+            by_type = model_parts.setdefault((make, model), {})
+            for filter_type in FILTER_TYPES:
+                for _ in range(VARIANTS_PER_FILTER):
+                    prefix = ''.join(word[0] for word in filter_type.split())
+                    parts.append(VehiclePart(
+                        id=part_id,
+                        part_number=f'{prefix}-{seed}-{part_id:06d}',
+                        description=f'{filter_type} - {make} {model}',
+                        supplier=rng.choice(SUPPLIERS),
+                        current_stock=rng.randint(0, 40),
+                        minimum_stock=rng.randint(2, 10),
+                        cost=Decimal(rng.randint(1500, 25000)) / 100,
+                    ))
+                    by_type.setdefault(filter_type, []).append(part_id)
+                    part_id += 1
+        VehiclePart.objects.bulk_create(parts, batch_size=batch_size)
+        counts['parts'] = len(parts)
+        log(f'Created {len(parts)} parts')
+
+        # Vehicles
+        vehicle_start = _next_id(Vehicle)
+        vehicle_models = {}
+        vehicle_mileage = {}
+        vehicle_employees = {}
+
+        def vehicle_rows():
+            for n in range(vehicles):
+                pk = vehicle_start + n
+                make, model = rng.choice(MODELS)
+                vehicle_models[pk] = (make, model)
+                year = rng.randint(2010, anchor.year)
+                mileage = rng.randint(5000, 350000)
+                vehicle_mileage[pk] = mileage
+                last_service = anchor - timedelta(days=rng.randint(0, 300))
+                employee = employees[rng.randrange(employee_count)] if rng.random() < 0.85 else None
+                user = users[rng.randrange(len(users))] if rng.random() < 0.5 else None
+                vehicle_employees[pk] = employee.id if employee else None
+                yield Vehicle(
+                    id=pk,
+                    name=f'MAD {pk}',
+                    employee_name=employee.full_name if employee else '',
+                    assigned_employee_id=employee.id if employee else None,
+                    assigned_to_id=user.id if user else None,
+                    make=make,
+                    model=model,
+                    year=year,
+                    drive_type=rng.choice(['2x4', '4x4', '4x4', '4x4']),
+                    registration=f'S{seed}R{pk:07d}',
+                    registration_expiry=anchor + timedelta(days=rng.randint(-30, 365)),
+                    vin=f'SYN{seed}V{pk:010d}',
+                    engine_number=f'EN{rng.randrange(10 ** 8, 10 ** 9)}',
+                    fuel_card_number=f'7034{pk:012d}',
+                    fuel_tank_capacity=TANK_CAPACITIES[model],
+                    insurance_company=rng.choice(INSURERS),
+                    insurance_expiry=anchor + timedelta(days=rng.randint(-30, 365)),
+                    status=rng.choices(statuses, weights)[0],
+                    purchase_date=date(year, rng.randint(1, 12), rng.randint(1, 28)),
+                    current_mileage=mileage,
+                    tyre_size=rng.choice(TYRE_SIZES),
+                    rim_color=rng.choice(RIM_COLOURS),
+                    last_service_date=last_service,
+                    last_service_mileage=max(0, mileage - rng.randint(0, 15000)),
+                    service_interval_months=rng.choice([3, 6, 6, 12]),
+                    service_interval_miles=rng.choice([5000, 10000, 10000, 15000]),
+                )
+
+        created = 0
+        for batch in _batched(vehicle_rows(), batch_size):
+            Vehicle.objects.bulk_create(batch)
+            created += len(batch)
+        counts['vehicles'] = created
+        log(f'Created {created} vehicles')
+
+        # Compatibility: one variant of each filter type for the vehicle's model
+        vehicle_parts = {}
+
+        def compatibility_rows():
+            for pk in range(vehicle_start, vehicle_start + vehicles):
+                by_type = model_parts[vehicle_models[pk]]
+                chosen = [rng.choice(by_type[filter_type]) for filter_type in FILTER_TYPES]
+                vehicle_parts[pk] = chosen
+                for part in chosen:
+                    yield VehiclePartCompatibility(vehicle_id=pk, part_id=part)
+
+        created = 0
+        for batch in _batched(compatibility_rows(), batch_size):
+            VehiclePartCompatibility.objects.bulk_create(batch)
+            created += len(batch)
+        counts['compatibilities'] = created
+        log(f'Created {created} compatibility links')
+
+        # Services spread over the last two years, then the parts each one used
+        service_start = _next_id(ServiceRecord)
+        service_vehicles = []
+
+        def service_rows():
+            pk = service_start
+            for vehicle in range(vehicle_start, vehicle_start + vehicles):
+                mileage = vehicle_mileage[vehicle]
+                count = rng.randint(max(0, services_per_vehicle - 2), services_per_vehicle + 2)
+                for days_ago in sorted((rng.randint(0, 730) for _ in range(count)), reverse=True):
+                    service_vehicles.append(vehicle)
+                    yield ServiceRecord(
+                        id=pk,
+                        vehicle_id=vehicle,
+                        service_date=anchor - timedelta(days=days_ago),
+                        mileage_at_service=max(0, mileage - days_ago * rng.randint(50, 250)),
+                        service_type=rng.choice(SERVICE_TYPES),
+                        performed_by=rng.choice(['Site Workshop', 'Dealer', 'Mobile Mechanic']),
+                        cost=Decimal(rng.randint(15000, 250000)) / 100,
+                    )
+                    pk += 1
+
+        created = 0
+        for batch in _batched(service_rows(), batch_size):
+            ServiceRecord.objects.bulk_create(batch)
+            created += len(batch)
+        counts['services'] = created
+        log(f'Created {created} service records')
+
+        def usage_rows():
+            for offset, vehicle in enumerate(service_vehicles):
+                compatible = vehicle_parts[vehicle]
+                for part in rng.sample(compatible, min(parts_per_service, len(compatible))):
+                    yield ServicePartUsage(
+                        service_id=service_start + offset,
+                        part_id=part,
+                        quantity=rng.randint(1, 2),
+                    )
+
+        created = 0
+        for batch in _batched(usage_rows(), batch_size):
+            ServicePartUsage.objects.bulk_create(batch)
+            created += len(batch)
+        counts['part_usages'] = created
+        log(f'Created {created} part usages')
+
+        # Job history: a few back-to-back stints per vehicle over the last year,
+        # the latest one still open for the vehicle's current employee
+        def assignment_rows():
+            for vehicle in range(vehicle_start, vehicle_start + vehicles):
+                start = anchor - timedelta(days=rng.randint(200, 365))
+                for stint in range(rng.randint(1, 3)):
+                    end = start + timedelta(days=rng.randint(14, 120))
+                    current = end >= anchor or stint == 2
+                    employee_id = vehicle_employees[vehicle] if current else None
+                    employee_id = employee_id or employees[rng.randrange(employee_count)].id
+                    yield JobAssignment(
+                        employee_id=employee_id,
+                        vehicle_id=vehicle,
+                        job=rng.choice(JOBS),
+                        start_date=start,
+                        end_date=None if current else end,
+                    )
+                    if current:
+                        break
+                    start = end + timedelta(days=rng.randint(1, 10))
+
+        created = 0
+        for batch in _batched(assignment_rows(), batch_size):
+            JobAssignment.objects.bulk_create(batch)
+            created += len(batch)
+        counts['job_assignments'] = created
+        log(f'Created {created} job assignments')
+
+        # Explicit primary keys bypass sequences on backends that have them
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [User, Employee, VehiclePart, Vehicle, ServiceRecord]):
+                cursor.execute(sql)
+
+    # Bulk inserts do not send the signals that keep the digest and search index current
+    invalidate_expiry_digest()
+    rebuild_search_index()
+    compatibility_graph.invalidate()
+
+    return counts
+
+
+def write_register_workbooks(directory, vehicles=1000, seed=42, anchor=None):
+    """
+    Write synthetic asset and spares registers in the layouts that
+    `import_excel_data` expects. Returns (vehicles_path, parts_path).
+    """
+    import os
+    import pandas as pd
+
+    rng = random.Random(seed)
+    anchor = anchor or date.today()
+
+    assets = []
+    stock = []
+    for n in range(1, vehicles + 1):
+        make, model = rng.choice(MODELS)
+        assets.append({
+            'Motor Vehicle ID': f'MAD {n}',
+            'Registration': f'X{seed}R{n:07d}',
+            'Driver': f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+            'Insurance Company': rng.choice(INSURERS),
+            'Rego Expiry': anchor + timedelta(days=rng.randint(-30, 365)),
+            'Insurance Expiry': anchor + timedelta(days=rng.randint(-30, 365)),
+        })
+        row = [f'MAD {n}', f'X{seed}R{n:07d}', model, rng.randint(2010, anchor.year)]
+        model_index = MODELS.index((make, model))
+        for filter_index, filter_type in enumerate(FILTER_TYPES):
+            variant = rng.randrange(VARIANTS_PER_FILTER)
+            prefix = ''.join(word[0] for word in filter_type.split())
+            row += [f'{prefix}-X{model_index:02d}{filter_index}{variant}', rng.randint(0, 20)]
+        row += [rng.choice(TYRE_SIZES), rng.choice(RIM_COLOURS)]
+        stock.append(row)
+
+    vehicles_path = os.path.join(directory, 'synthetic_asset_register.xlsx')
+    pd.DataFrame(assets).to_excel(vehicles_path, index=False)
+
+    # The importer skips the first data row, which holds sub-headers in the real register
+    sub_header = ['', '', '', '', 'Part #', 'Qty', 'Part #', 'Qty', 'Part #', 'Qty', 'Part #', 'Qty', '', '']
+    parts_path = os.path.join(directory, 'synthetic_spares_register.xlsx')
+    pd.DataFrame([sub_header] + stock, columns=PARTS_COLUMNS).to_excel(
+        parts_path, sheet_name=PARTS_SHEET, index=False
+    )
+
+    return vehicles_path, parts_path
+
+
+def write_fuel_statement(path, vehicle_ids, fills_per_vehicle=10, seed=42, anchor=None):
+    """
+    Write a synthetic fuel card statement CSV for vehicles seeded by
+    `seed_fleet`, fills spread over the 90 days before `anchor`. About one
+    line in a hundred is an anomaly: an unknown card, an overfill or an
+    odometer reading lower than the last. Returns the number of lines.
+    """
+    import csv
+
+    rng = random.Random(seed)
+    anchor = anchor or date.today()
+    start = anchor - timedelta(days=90)
+    lines = 0
+    with open(path, 'w', newline='') as handle:
+        writer = csv.writer(handle)
+        writer.writerow(['Card Number', 'Transaction Date', 'Time', 'Site', 'Product', 'Litres', 'Amount', 'Odometer'])
+        for pk in vehicle_ids:
+            card = f'7034 {pk:012d}'
+            odometer = rng.randint(5000, 350000)
+            for day in sorted(rng.sample(range(90), min(fills_per_vehicle, 90))):
+                odometer += rng.randint(250, 900)
+                litres = Decimal(rng.randint(3000, 7500)) / 100
+                roll = rng.random()
+                if roll < 0.004:
+                    card = f'9999 {pk:012d}'
+                elif roll < 0.007:
+                    litres *= 3
+                elif roll < 0.01:
+                    odometer -= 5000
+                price = Decimal(rng.randint(185, 235)) / 100
+                writer.writerow([
+                    card, (start + timedelta(days=day)).strftime('%d/%m/%Y'),
+                    f'{rng.randint(5, 20):02d}:{rng.randint(0, 59):02d}', rng.choice(FUEL_SITES), 'Diesel',
+                    litres, (litres * price).quantize(Decimal('0.01')), odometer,
+                ])
+                card = f'7034 {pk:012d}'
+                lines += 1
+    return lines
@@ -1,21 +1,26 @@
+import os
+
 from rest_framework import serializers
-from .models import Vehicle, VehiclePart, VehiclePartCompatibility, ServiceRecord, ServicePartUsage
+from .models import BackgroundJob, Employee, JobAssignment, Vehicle, VehiclePart, VehiclePartCompatibility, ServiceRecord, ServicePartUsage
 from django.contrib.auth.models import User
 
+from .instrumentation import TimedSerializerMixin
+from .job_queue import EXPORTS, ROLLUPS, import_path
+
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'first_name', 'last_name', 'email']
 
 
-class VehiclePartSerializer(serializers.ModelSerializer):
+class VehiclePartSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = VehiclePart
         fields = '__all__'
 
 
-class VehicleSerializer(serializers.ModelSerializer):
+class VehicleSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     assigned_to = UserSerializer(read_only=True)
     service_due = serializers.BooleanField(read_only=True)
     next_service_date = serializers.DateField(read_only=True)
@@ -26,7 +31,7 @@ class VehicleSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class VehiclePartCompatibilitySerializer(serializers.ModelSerializer):
+class VehiclePartCompatibilitySerializer(TimedSerializerMixin, serializers.ModelSerializer):
     vehicle = VehicleSerializer(read_only=True)
     part = VehiclePartSerializer(read_only=True)
     
@@ -35,7 +40,7 @@ class VehiclePartCompatibilitySerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class ServicePartUsageSerializer(serializers.ModelSerializer):
+class ServicePartUsageSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     part = VehiclePartSerializer(read_only=True)
     
     class Meta:
@@ -43,10 +48,92 @@ class ServicePartUsageSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class ServiceRecordSerializer(serializers.ModelSerializer):
+class ServiceRecordSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     parts_used = ServicePartUsageSerializer(many=True, read_only=True)
     vehicle = VehicleSerializer(read_only=True)
     
     class Meta:
         model = ServiceRecord
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+
+
+class AssignedVehicleSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """Compact vehicle summary nested under an employee"""
+    class Meta:
+        model = Vehicle
+        fields = ['id', 'name', 'registration', 'make', 'model', 'status']
+
+
+class EmployeeSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    user = UserSerializer(read_only=True)
+    full_name = serializers.CharField(read_only=True)
+    license_valid = serializers.BooleanField(read_only=True)
+    # Served from the ViewSet's prefetch, so the list stays at a fixed query count
+    assigned_vehicles = AssignedVehicleSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Employee
+        fields = '__all__'
+
+
+class BulkReassignSerializer(serializers.Serializer):
+    """Move vehicles to one employee: listed vehicle_ids, or every vehicle of from_employees"""
+    to_employee = serializers.PrimaryKeyRelatedField(queryset=Employee.objects.select_related('user'))
+    from_employees = serializers.PrimaryKeyRelatedField(queryset=Employee.objects.all(), many=True, required=False)
+    vehicle_ids = serializers.ListField(child=serializers.IntegerField(), required=False)
+
+    def validate(self, data):
+        if not data.get('from_employees') and not data.get('vehicle_ids'):
+            raise serializers.ValidationError('Provide vehicle_ids or from_employees')
+        return data
+
+
+class JobAssignmentSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    employee_name = serializers.CharField(source='employee.full_name', read_only=True)
+    vehicle_name = serializers.CharField(source='vehicle.name', read_only=True, default=None)
+
+    class Meta:
+        model = JobAssignment
+        fields = '__all__'
+
+    def validate(self, data):
+        start_date = data.get('start_date', getattr(self.instance, 'start_date', None))
+        end_date = data.get('end_date', getattr(self.instance, 'end_date', None))
+        if start_date and end_date and end_date < start_date:
+            raise serializers.ValidationError({'end_date': 'end_date cannot be before start_date'})
+        return data
+
+
+class BackgroundJobSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """Job status for polling; only kind, params and max_attempts are writable"""
+    class Meta:
+        model = BackgroundJob
+        fields = '__all__'
+        read_only_fields = [
+            'status', 'progress', 'message', 'result', 'error', 'attempts', 'run_after',
+            'worker', 'heartbeat_at', 'created_at', 'started_at', 'finished_at',
+        ]
+
+    def validate(self, data):
+        kind, params = data['kind'], data.get('params') or {}
+        if not isinstance(params, dict):
+            raise serializers.ValidationError({'params': 'params must be an object'})
+
+        if kind == 'import':
+            if not params.get('vehicles') and not params.get('parts'):
+                raise serializers.ValidationError({'params': 'import needs a vehicles and/or parts file'})
+            for key in ('vehicles', 'parts'):
+                if params.get(key):
+                    try:
+                        path = import_path(params[key])
+                    except ValueError as e:
+                        raise serializers.ValidationError({'params': str(e)})
+                    if not os.path.exists(path):
+                        raise serializers.ValidationError({'params': f'{params[key]} not found in the import directory'})
+        elif kind == 'export' and params.get('dataset') not in EXPORTS:
+            raise serializers.ValidationError({'params': f"dataset must be one of: {', '.join(EXPORTS)}"})
+        elif kind == 'rollup' and params.get('name', 'all') not in list(ROLLUPS) + ['all']:
+            raise serializers.ValidationError({'params': f"name must be 'all' or one of: {', '.join(ROLLUPS)}"})
+
+        data['params'] = params
+        return data
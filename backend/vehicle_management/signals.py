@@ -0,0 +1,76 @@
+# vehicle_management/signals.py
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .alerts import invalidate_expiry_digest
+from .compat_graph import graph
+from .models import (
+    Employee, JobAssignment, ServicePartUsage, ServiceRecord, Vehicle, VehiclePart, VehiclePartCompatibility,
+)
+from .search import index_object, remove_object
+from .sqlite_tuning import apply_sqlite_pragmas
+from .sync import record_tombstone
+
+connection_created.connect(apply_sqlite_pragmas, dispatch_uid='vehicle_management.apply_sqlite_pragmas')
+
+
+@receiver([post_save, post_delete], sender=Vehicle)
+@receiver([post_save, post_delete], sender=Employee)
+def refresh_expiry_digest(sender, **kwargs):
+    """Expiry dates may have changed, so drop today's cached digest"""
+    invalidate_expiry_digest()
+
+
+@receiver(post_save, sender=Vehicle)
+@receiver(post_save, sender=Employee)
+@receiver(post_save, sender=VehiclePart)
+def update_search_index(sender, instance, using, **kwargs):
+    """Keep the full-text search row in step with the saved object"""
+    index_object(instance, using=using)
+
+
+@receiver(post_delete, sender=Vehicle)
+@receiver(post_delete, sender=Employee)
+@receiver(post_delete, sender=VehiclePart)
+def remove_from_search_index(sender, instance, using, **kwargs):
+    remove_object(instance, using=using)
+
+
+@receiver(post_save, sender=VehiclePartCompatibility)
+def add_compatibility_link(sender, instance, created, **kwargs):
+    """Patch the in-memory compatibility graph, if this process has built one"""
+    if not graph.built:
+        return
+    if created:
+        graph.add_link(instance.vehicle_id, instance.part_id, instance.vehicle.status, instance.part.description)
+    else:
+        # The old vehicle/part pair is unknown here, so rebuild on next use
+        graph.invalidate()
+
+
+@receiver(post_delete, sender=VehiclePartCompatibility)
+def remove_compatibility_link(sender, instance, **kwargs):
+    graph.remove_link(instance.vehicle_id, instance.part_id)
+
+
+@receiver(post_save, sender=Vehicle)
+def update_graph_vehicle_status(sender, instance, **kwargs):
+    graph.set_vehicle_status(instance.pk, instance.status)
+
+
+@receiver(post_save, sender=VehiclePart)
+def update_graph_part_category(sender, instance, **kwargs):
+    graph.set_part_description(instance.pk, instance.description)
+
+
+@receiver(post_delete, sender=Employee)
+@receiver(post_delete, sender=Vehicle)
+@receiver(post_delete, sender=VehiclePart)
+@receiver(post_delete, sender=VehiclePartCompatibility)
+@receiver(post_delete, sender=ServiceRecord)
+@receiver(post_delete, sender=ServicePartUsage)
+@receiver(post_delete, sender=JobAssignment)
+def remember_deletion(sender, instance, using, **kwargs):
+    """Leave a tombstone for `?since=` delta sync"""
+    record_tombstone(sender, instance.pk, using=using)
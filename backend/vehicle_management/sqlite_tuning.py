@@ -0,0 +1,27 @@
+# vehicle_management/sqlite_tuning.py
+import re
+
+from django.conf import settings
+
+from .reporting import REPORTING_DB
+
+_PRAGMA_NAME = re.compile(r'^[a-z_]+$')
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """
+    `connection_created` handler applying settings.SQLITE_PRAGMAS to every
+    new SQLite connection. Runs on the raw sqlite3 connection so the pragmas
+    don't show up in query counts.
+    """
+    # The reporting snapshot is opened read-only and must stay in rollback-journal mode
+    if connection.vendor != 'sqlite' or connection.alias == REPORTING_DB:
+        return
+
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', None) or {}
+    for name, value in pragmas.items():
+        if not _PRAGMA_NAME.match(name):
+            raise ValueError(f'Invalid SQLite pragma name: {name!r}')
+        if isinstance(value, str) and not value.isalnum():
+            raise ValueError(f'Invalid value for SQLite pragma {name}: {value!r}')
+        connection.connection.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,142 @@
+# vehicle_management/sync.py
+# Delta sync for API clients. List endpoints answer conditional requests from
+# one aggregate query, and `?since=<cursor>` returns only the rows changed and
+# deleted after the cursor instead of the whole list.
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Q, Subquery
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+from .models import Tombstone
+
+# Tombstones older than this are pruned; cursors older than this must resync in full
+TOMBSTONE_RETENTION = timedelta(days=getattr(settings, 'TOMBSTONE_RETENTION_DAYS', 90))
+# Rows written by transactions still open when a cursor is issued may carry an
+# earlier updated_at; holding cursors back this far means the next poll sees them
+CURSOR_LAG = timedelta(seconds=5)
+
+
+def encode_cursor(moment):
+    # 'Z' rather than '+00:00', which would need escaping in a query string
+    return moment.astimezone(dt_timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+def decode_cursor(value):
+    moment = parse_datetime(value or '')
+    if moment is None:
+        raise ValueError(f'Invalid cursor: {value!r}')
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment, dt_timezone.utc)
+    return moment
+
+
+_pending_tombstones = ContextVar('pending_tombstones', default=None)
+
+
+def record_tombstone(model, object_id, using='default'):
+    pending = _pending_tombstones.get()
+    tombstone = Tombstone(model=model._meta.label_lower, object_id=object_id)
+    if pending is not None:
+        pending.append(tombstone)
+    else:
+        tombstone.save(using=using)
+
+
+@contextmanager
+def batched_tombstones(using='default'):
+    """
+    Collect the tombstones of deletes inside the block and insert them in
+    bulk before it commits; one INSERT per deleted row dominates mass deletes.
+    """
+    pending = []
+    token = _pending_tombstones.set(pending)
+    try:
+        with transaction.atomic(using=using):
+            yield
+            Tombstone.objects.using(using).bulk_create(pending, batch_size=2000)
+    finally:
+        _pending_tombstones.reset(token)
+
+
+def prune_tombstones(older_than=TOMBSTONE_RETENTION):
+    deleted, _ = Tombstone.objects.filter(deleted_at__lt=timezone.now() - older_than).delete()
+    return deleted
+
+
+class DeltaSyncMixin:
+    """
+    For ModelViewSets over TrackedModel. `sync_related` names relations whose
+    updated_at also shapes the serialised rows (nested serialisers), so a
+    change there counts as a change to the row.
+    """
+    sync_related = ()
+
+    def _latest_expressions(self):
+        return ['updated_at'] + [f'{relation}__updated_at' for relation in self.sync_related]
+
+    def sync_state(self, queryset):
+        """(latest change, row count) in one query; the count notices rows deleted or filtered out"""
+        model = queryset.model._meta.label_lower
+        last_deleted = Tombstone.objects.filter(model=model).order_by().values('model').annotate(
+            latest=Max('deleted_at')
+        ).values('latest')
+        state = queryset.order_by().aggregate(
+            rows=Count('pk', distinct=True),
+            deleted=Max(Subquery(last_deleted)),
+            **{f'latest_{index}': Max(field) for index, field in enumerate(self._latest_expressions())},
+        )
+        stamps = [value for key, value in state.items() if key != 'rows' and value is not None]
+        return (max(stamps) if stamps else None), state['rows']
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        latest, rows = self.sync_state(queryset)
+        etag = quote_etag(f"{rows}-{latest.timestamp() if latest else 0}")
+        last_modified = int(latest.timestamp()) if latest else None
+
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        cursor = encode_cursor(min(latest, timezone.now() - CURSOR_LAG) if latest else timezone.now() - CURSOR_LAG)
+        if 'since' in request.query_params:
+            response = self.delta(request, queryset, cursor)
+        else:
+            response = Response(self.get_serializer(queryset, many=True).data)
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        response['X-Sync-Cursor'] = cursor
+        return response
+
+    def delta(self, request, queryset, cursor):
+        try:
+            since = decode_cursor(request.query_params['since'])
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+        if since < timezone.now() - TOMBSTONE_RETENTION:
+            return Response({"error": "Cursor is older than the deletion history; download the full list again"},
+                            status=410)
+
+        changed = Q()
+        for field in self._latest_expressions():
+            changed |= Q(**{f'{field}__gt': since})
+        # Matching pks first keeps the joins needed for related timestamps out of the serialised query
+        changed_ids = queryset.filter(changed).order_by().values('pk').distinct()
+        rows = queryset.filter(pk__in=changed_ids)
+        deleted = Tombstone.objects.filter(
+            model=queryset.model._meta.label_lower, deleted_at__gt=since
+        ).order_by('deleted_at').values_list('object_id', flat=True)
+        return Response({
+            'cursor': cursor,
+            'changed': self.get_serializer(rows, many=True).data,
+            'deleted': list(dict.fromkeys(deleted)),
+        })
@@ -5,6 +5,9 @@ from . import views, views_reporting
 # Create a router for API views
 router = DefaultRouter()
 router.register(r'vehicles', views.VehicleViewSet)
+router.register(r'employees', views.EmployeeViewSet)
+router.register(r'job-assignments', views.JobAssignmentViewSet)
+router.register(r'jobs', views.BackgroundJobViewSet)
 router.register(r'parts', views.VehiclePartViewSet)
 router.register(r'services', views.ServiceRecordViewSet)
 router.register(r'compatibility', views.VehiclePartCompatibilityViewSet)
@@ -12,12 +15,23 @@ router.register(r'compatibility', views.VehiclePartCompatibilityViewSet)
 urlpatterns = [
     path('', views.vehicle_list, name='home'),
     path('api/', include(router.urls)),
+    path('api/search/', views.search, name='search'),
+    path('api/imports/upload/', views.RegisterUploadView.as_view(), name='register_upload'),
     path('vehicles/', views.vehicle_list, name='vehicle_list'),
     path('parts/', views.part_list, name='part_list'),
+    path('vehicles/<int:vehicle_id>/parts/', views.vehicle_service_parts, name='vehicle_service_parts'),
+    path('metrics/', views.metrics, name='metrics'),
     
     # Add reporting endpoints
     path('api/reports/service-forecast/', views_reporting.service_forecast, name='service_forecast'),
     path('api/reports/vehicle-utilization/', views_reporting.vehicle_utilization, name='vehicle_utilization'),
     path('api/reports/maintenance-costs/', views_reporting.maintenance_costs, name='maintenance_costs'),
     path('api/reports/parts-usage/', views_reporting.parts_usage_report, name='parts_usage_report'),
+    path('api/reports/expiry-alerts/', views_reporting.expiry_alerts_report, name='expiry_alerts'),
+    path('api/reports/employee-utilization/', views_reporting.employee_utilization_report, name='employee_utilization'),
+    path('api/reports/part-consolidation/', views_reporting.part_consolidation_report, name='part_consolidation'),
+    path('api/reports/fuel-efficiency/', views_reporting.fuel_efficiency_report, name='fuel_efficiency'),
+    path('api/reports/fuel-anomalies/', views_reporting.fuel_anomalies_report, name='fuel_anomalies'),
+    path('api/reports/tyre-inventory/', views_reporting.tyre_inventory_report, name='tyre_inventory'),
+    path('api/reports/workshop-schedule/', views_reporting.workshop_schedule_report, name='workshop_schedule'),
 ]
\ No newline at end of file
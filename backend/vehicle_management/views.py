@@ -1,9 +1,37 @@
+import os
+from datetime import datetime
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseForbidden
+from django.db import transaction
+from django.db.models import Prefetch, Q
 from django.shortcuts import render
-from rest_framework import viewsets
-from rest_framework.decorators import action
+from django.utils import timezone
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action, api_view
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from .models import Vehicle, VehiclePart, VehiclePartCompatibility, ServiceRecord, ServicePartUsage
+from rest_framework.reverse import reverse
+from rest_framework.views import APIView
+from .models import BackgroundJob, Employee, JobAssignment, Vehicle, VehiclePart, VehiclePartCompatibility, ServiceRecord, ServicePartUsage
+from .compat_graph import get_graph
+from .excel_layout import part_rows, sniff_workbook, vehicle_rows
+from .import_diff import diff_parts, diff_vehicles
+from .instrumentation import registry
+from .job_queue import enqueue, import_path, retry as retry_job
+from .jobs import overlapping
+from .matching import VehicleIndex
+from .search import index_object, search as search_index, KIND_CODES
+from .sync import DeltaSyncMixin
 from .serializers import (
+    BackgroundJobSerializer,
+    BulkReassignSerializer,
+    EmployeeSerializer,
+    JobAssignmentSerializer,
     VehicleSerializer, 
     VehiclePartSerializer, 
     VehiclePartCompatibilitySerializer,
@@ -12,18 +40,20 @@ from .serializers import (
 )
 
 
-class VehicleViewSet(viewsets.ModelViewSet):
+class VehicleViewSet(DeltaSyncMixin, viewsets.ModelViewSet):
     """
     API endpoint for vehicles
     """
-    queryset = Vehicle.objects.all()
+    queryset = Vehicle.objects.select_related('assigned_to')
     serializer_class = VehicleSerializer
     
     @action(detail=True, methods=['get'])
     def service_history(self, request, pk=None):
         """Get service history for a specific vehicle"""
         vehicle = self.get_object()
-        services = vehicle.service_records.all().order_by('-service_date')
+        services = vehicle.service_records.select_related(
+            'vehicle__assigned_to'
+        ).prefetch_related('parts_used__part').order_by('-service_date')
         serializer = ServiceRecordSerializer(services, many=True)
         return Response(serializer.data)
     
@@ -32,12 +62,149 @@ class VehicleViewSet(viewsets.ModelViewSet):
         """Get all vehicles due for service"""
         # In a real application, we would calculate this on the fly
         # For simplicity, we'll just return vehicles with service_due property = True
-        vehicles = [v for v in Vehicle.objects.all() if v.service_due]
+        vehicles = [v for v in self.get_queryset() if v.service_due]
         serializer = VehicleSerializer(vehicles, many=True)
         return Response(serializer.data)
 
 
-class VehiclePartViewSet(viewsets.ModelViewSet):
+class EmployeeViewSet(DeltaSyncMixin, viewsets.ModelViewSet):
+    """
+    API endpoint for employees with their assigned vehicles
+    """
+    queryset = Employee.objects.select_related('user').prefetch_related(
+        Prefetch('assigned_vehicles', queryset=Vehicle.objects.order_by('name'))
+    ).order_by('last_name', 'first_name')
+    serializer_class = EmployeeSerializer
+    sync_related = ('assigned_vehicles',)
+
+    @action(detail=False, methods=['post'])
+    def bulk_reassign(self, request):
+        """
+        Move a crew's vehicles to one employee in a single transaction.
+        assigned_employee is the source of truth; employee_name and the
+        assigned_to login are kept in step with it.
+        """
+        serializer = BulkReassignSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        to_employee = serializer.validated_data['to_employee']
+        vehicle_ids = serializer.validated_data.get('vehicle_ids') or []
+        from_employees = serializer.validated_data.get('from_employees') or []
+
+        with transaction.atomic():
+            vehicles = Vehicle.objects.select_for_update().filter(
+                Q(pk__in=vehicle_ids) | Q(assigned_employee__in=from_employees)
+            )
+            moved = list(vehicles.values_list('pk', flat=True))
+            previous = set(vehicles.exclude(assigned_employee=None).values_list('assigned_employee', flat=True))
+            missing = sorted(set(vehicle_ids) - set(moved))
+            if missing:
+                return Response({"error": f"Unknown vehicle ids: {missing}"}, status=400)
+
+            Vehicle.objects.filter(pk__in=moved).update(
+                assigned_employee=to_employee,
+                employee_name=to_employee.full_name,
+                assigned_to=to_employee.user,
+                updated_at=timezone.now(),
+            )
+            # Employees losing vehicles change too, as their assigned_vehicles shrink
+            Employee.objects.filter(pk__in=previous - {to_employee.pk}).update(updated_at=timezone.now())
+            # update() sends no signals; refresh the search rows it made stale
+            for vehicle in Vehicle.objects.filter(pk__in=moved):
+                index_object(vehicle)
+
+        employee = self.get_queryset().get(pk=to_employee.pk)
+        return Response({
+            'moved': len(moved),
+            'vehicle_ids': sorted(moved),
+            'employee': EmployeeSerializer(employee).data,
+        })
+
+
+class JobAssignmentViewSet(DeltaSyncMixin, viewsets.ModelViewSet):
+    """
+    API endpoint for job assignments. POST appends a stint; filter with
+    ?vehicle=, ?employee= and ?start=/?end= (YYYY-MM-DD) for everything
+    overlapping that period, e.g. who drove a vehicle between two dates.
+    """
+    queryset = JobAssignment.objects.select_related('employee', 'vehicle')
+    serializer_class = JobAssignmentSerializer
+    sync_related = ('employee', 'vehicle')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        params = self.request.query_params
+        if params.get('vehicle'):
+            queryset = queryset.filter(vehicle_id=params['vehicle'])
+        if params.get('employee'):
+            queryset = queryset.filter(employee_id=params['employee'])
+        if params.get('start') or params.get('end'):
+            try:
+                start = datetime.strptime(params['start'], '%Y-%m-%d').date() if params.get('start') else None
+                end = datetime.strptime(params['end'], '%Y-%m-%d').date() if params.get('end') else None
+            except ValueError:
+                raise ValidationError({'error': 'start and end must be dates in YYYY-MM-DD format'})
+            queryset = overlapping(queryset, start, end)
+        return queryset
+
+
+class BackgroundJobViewSet(mixins.CreateModelMixin,
+                           mixins.ListModelMixin,
+                           mixins.RetrieveModelMixin,
+                           viewsets.GenericViewSet):
+    """
+    API endpoint for background jobs. POST queues a job and answers 202 at
+    once; poll the detail URL for status and progress.
+    """
+    queryset = BackgroundJob.objects.all()
+    serializer_class = BackgroundJobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        for field in ('status', 'kind'):
+            if self.request.query_params.get(field):
+                queryset = queryset.filter(**{field: self.request.query_params[field]})
+        return queryset
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = enqueue(
+            serializer.validated_data['kind'],
+            serializer.validated_data['params'],
+            max_attempts=serializer.validated_data.get('max_attempts', 3),
+        )
+        location = reverse('backgroundjob-detail', kwargs={'pk': job.pk}, request=request)
+        return Response(self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED,
+                        headers={'Location': location})
+
+    @action(detail=True, methods=['post'])
+    def retry(self, request, pk=None):
+        """Requeue a failed job with a fresh set of attempts"""
+        job = self.get_object()
+        if job.status != 'failed':
+            return Response({"error": "Only failed jobs can be retried"}, status=400)
+        if job.kind == 'import' and not all(
+                os.path.exists(import_path(name)) for name in job.params.values() if name):
+            # A failed import's workbooks are deleted with its last attempt
+            return Response({"error": "The workbooks for this import are gone; upload them again"}, status=400)
+        retry_job(job)
+        job.refresh_from_db()
+        return Response(self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """The CSV written by a finished export job"""
+        job = self.get_object()
+        if job.kind != 'export' or job.status != 'succeeded':
+            return Response({"error": "Only finished export jobs have a file"}, status=400)
+        path = os.path.join(settings.EXPORT_ROOT, job.result['file'])
+        if not os.path.exists(path):
+            raise Http404("Export file no longer exists")
+        return FileResponse(open(path, 'rb'), as_attachment=True, filename=job.result['file'])
+
+
+class VehiclePartViewSet(DeltaSyncMixin, viewsets.ModelViewSet):
     """
     API endpoint for vehicle parts
     """
@@ -52,20 +219,24 @@ class VehiclePartViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class ServiceRecordViewSet(viewsets.ModelViewSet):
+class ServiceRecordViewSet(DeltaSyncMixin, viewsets.ModelViewSet):
     """
     API endpoint for service records
     """
-    queryset = ServiceRecord.objects.all().order_by('-service_date')
+    queryset = ServiceRecord.objects.select_related(
+        'vehicle__assigned_to'
+    ).prefetch_related('parts_used__part').order_by('-service_date')
     serializer_class = ServiceRecordSerializer
+    sync_related = ('vehicle', 'parts_used', 'parts_used__part')
 
 
-class VehiclePartCompatibilityViewSet(viewsets.ModelViewSet):
+class VehiclePartCompatibilityViewSet(DeltaSyncMixin, viewsets.ModelViewSet):
     """
     API endpoint for vehicle-part compatibility
     """
-    queryset = VehiclePartCompatibility.objects.all()
+    queryset = VehiclePartCompatibility.objects.select_related('vehicle__assigned_to', 'part')
     serializer_class = VehiclePartCompatibilitySerializer
+    sync_related = ('vehicle', 'part')
     
     @action(detail=False, methods=['get'])
     def compatible_parts(self, request):
@@ -74,9 +245,99 @@ class VehiclePartCompatibilityViewSet(viewsets.ModelViewSet):
         if not vehicle_id:
             return Response({"error": "vehicle_id query parameter is required"}, status=400)
         
-        compatibilities = VehiclePartCompatibility.objects.filter(vehicle_id=vehicle_id)
+        compatibilities = self.get_queryset().filter(vehicle_id=vehicle_id)
         serializer = VehiclePartCompatibilitySerializer(compatibilities, many=True)
         return Response(serializer.data)
+
+    # The actions below are answered from the in-memory compatibility graph
+    # (compat_graph.py); the database is only hit to label the results.
+
+    @staticmethod
+    def _id_list(value):
+        return [int(item) for item in value.split(',') if item.strip()]
+
+    @staticmethod
+    def _label_parts(rows):
+        parts = VehiclePart.objects.in_bulk([row['part_id'] for row in rows])
+        for row in rows:
+            part = parts.get(row['part_id'])
+            row['part_number'] = part.part_number if part else None
+            row['description'] = part.description if part else None
+        return rows
+
+    @action(detail=False, methods=['get'])
+    def top_parts(self, request):
+        """Parts that fit the most active vehicles"""
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), 500)
+        except ValueError:
+            return Response({"error": "limit must be an integer"}, status=400)
+
+        graph = get_graph()
+        return Response({
+            'active_vehicles': len(graph.active_vehicles),
+            'results': self._label_parts(graph.top_parts(limit=limit)),
+            'graph': graph.stats(),
+        })
+
+    @action(detail=False, methods=['get'])
+    def shared_parts(self, request):
+        """Vehicles compatible with every part of vehicle_id, or with every part in part_ids"""
+        try:
+            vehicle_id = request.query_params.get('vehicle_id')
+            vehicle_id = int(vehicle_id) if vehicle_id else None
+            part_ids = request.query_params.get('part_ids')
+            part_ids = self._id_list(part_ids) if part_ids else None
+        except ValueError:
+            return Response({"error": "vehicle_id and part_ids must be integers"}, status=400)
+        if vehicle_id is None and not part_ids:
+            return Response({"error": "vehicle_id or part_ids query parameter is required"}, status=400)
+
+        graph = get_graph()
+        if part_ids is None:
+            part_ids = list(graph.vehicle_parts.get(vehicle_id, ()))
+        vehicle_ids = graph.vehicles_sharing_parts(vehicle_id=vehicle_id, part_ids=part_ids)
+        vehicles = Vehicle.objects.filter(pk__in=vehicle_ids).order_by('name').values('id', 'name', 'registration', 'status')
+        return Response({
+            'vehicle_id': vehicle_id,
+            'part_ids': part_ids,
+            'count': len(vehicle_ids),
+            'results': list(vehicles),
+            'graph': graph.stats(),
+        })
+
+    @action(detail=False, methods=['get'])
+    def stock_set(self, request):
+        """
+        Smallest set of parts (greedy) that fills every part category slot of
+        the selected vehicles: vehicle_ids, or every vehicle with the given status.
+        """
+        vehicle_ids = request.query_params.get('vehicle_ids')
+        vehicle_status = request.query_params.get('status', 'active')
+        try:
+            vehicle_ids = self._id_list(vehicle_ids) if vehicle_ids else None
+        except ValueError:
+            return Response({"error": "vehicle_ids must be a comma separated list of integers"}, status=400)
+        if vehicle_ids is None and vehicle_status not in dict(Vehicle.STATUS_CHOICES):
+            return Response({"error": f"Invalid status. Valid options: {', '.join(dict(Vehicle.STATUS_CHOICES))}"},
+                            status=400)
+
+        graph = get_graph()
+        if vehicle_ids is None:
+            vehicle_ids = list(Vehicle.objects.filter(status=vehicle_status).values_list('id', flat=True))
+        picks, without_data = graph.minimal_part_set(vehicle_ids)
+        return Response({
+            'vehicles': len(vehicle_ids),
+            'vehicles_without_compatibility': without_data,
+            'part_count': len(picks),
+            'results': self._label_parts(picks),
+            'graph': graph.stats(),
+        })
+
+    @action(detail=False, methods=['get'])
+    def graph_stats(self, request):
+        """Build time, size and memory of the in-memory compatibility graph"""
+        return Response(get_graph().stats())
     
 
 
@@ -102,5 +363,119 @@ def vehicle_service_parts(request, vehicle_id):
     except Vehicle.DoesNotExist:
         from django.http import Http404
         raise Http404("Vehicle not found")
-    
-        
\ No newline at end of file
+
+
+# Prometheus scrape endpoint for the request metrics middleware
+def metrics(request):
+    remote_addr = request.META.get('REMOTE_ADDR')
+    if remote_addr not in ('127.0.0.1', '::1') and remote_addr not in getattr(settings, 'INTERNAL_IPS', []):
+        return HttpResponseForbidden('Metrics are only available locally')
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@api_view(['GET'])
+def search(request):
+    """
+    Ranked search across vehicles, employees and parts.
+    Terms match as prefixes, so partial registrations and part numbers work.
+    """
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response({"error": "q query parameter is required"}, status=400)
+
+    kinds = [k for k in request.query_params.get('kind', '').split(',') if k]
+    invalid = [k for k in kinds if k not in KIND_CODES]
+    if invalid:
+        return Response({"error": f"Invalid kind: {', '.join(invalid)}. Valid options: {', '.join(KIND_CODES)}"},
+                        status=400)
+
+    try:
+        limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+    except ValueError:
+        return Response({"error": "limit must be an integer"}, status=400)
+
+    return Response({
+        'query': query,
+        'results': search_index(query, kinds=kinds or None, limit=limit),
+    })
+
+
+class RegisterUploadView(APIView):
+    """
+    Upload an asset register ('vehicles') and/or spares register ('parts')
+    workbook, or either one as 'file' to have its layout detected. The files
+    are spooled to disk, sniffed, and handed to a background import job; the
+    202 response carries the detected columns and a diff preview of the
+    first `sample` rows (default 200).
+    """
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+    ALLOWED_EXTENSIONS = ('.xlsx', '.xlsm')
+    DEFAULT_SAMPLE_ROWS = 200
+
+    def initialize_request(self, request, *args, **kwargs):
+        # Before anything reads the body (CSRF checks read request.POST), so
+        # uploads go to a temp file chunk by chunk whatever their size
+        request.upload_handlers = [TemporaryFileUploadHandler(request)]
+        return super().initialize_request(request, *args, **kwargs)
+
+    def post(self, request):
+        try:
+            sample = min(max(int(request.query_params.get('sample', self.DEFAULT_SAMPLE_ROWS)), 1), 5000)
+        except ValueError:
+            return Response({"error": "sample must be an integer"}, status=400)
+
+        uploads = {field: request.FILES[field] for field in ('vehicles', 'parts', 'file') if field in request.FILES}
+        if not uploads:
+            return Response({"error": "Upload a workbook as 'vehicles', 'parts' or 'file'"}, status=400)
+        for upload in uploads.values():
+            if not upload.name.lower().endswith(self.ALLOWED_EXTENSIONS):
+                return Response({"error": f"{upload.name} is not an .xlsx workbook"}, status=400)
+
+        storage = FileSystemStorage(location=settings.IMPORT_ROOT)
+        saved, files = {}, {}
+
+        def reject(name, body):
+            # Nothing is queued, so no workbook from this request may stay behind
+            for stored in [name, *saved.values()]:
+                storage.delete(stored)
+            return Response(body, status=400)
+
+        for field, upload in uploads.items():
+            # Moves the temp file into place rather than copying it through memory
+            name = storage.save(f"{timezone.now():%Y%m%d%H%M%S}-{upload.name}", upload)
+            path = storage.path(name)
+            try:
+                layout = sniff_workbook(path)
+            except Exception as e:
+                return reject(name, {"error": f"{upload.name} could not be read as a workbook: {e}"})
+
+            if layout['layout'] == 'unknown':
+                return reject(name, {
+                    "error": f"{upload.name} is neither an asset nor a spares register",
+                    "detected": layout,
+                })
+            role = layout['layout'] if field == 'file' else field
+            if role != layout['layout'] or role in saved:
+                return reject(name, {
+                    "error": f"{upload.name} looks like a '{layout['layout']}' workbook, expected '{role}'"
+                             if role != layout['layout'] else f"More than one '{role}' workbook uploaded",
+                    "detected": layout,
+                })
+            saved[role] = name
+            files[role] = dict(layout, file=name, size=upload.size)
+
+        preview, planned = {}, VehicleIndex.from_database()
+        if 'vehicles' in saved:
+            preview['vehicles'] = diff_vehicles(vehicle_rows(storage.path(saved['vehicles']), limit=sample),
+                                                index=planned)
+        if 'parts' in saved:
+            preview['parts'] = diff_parts(part_rows(storage.path(saved['parts']), limit=sample), planned=planned)
+
+        job = enqueue('import', saved)
+        location = reverse('backgroundjob-detail', kwargs={'pk': job.pk}, request=request)
+        return Response({
+            'job': BackgroundJobSerializer(job).data,
+            'files': files,
+            'preview': dict(preview, sample_rows=sample),
+        }, status=status.HTTP_202_ACCEPTED, headers={'Location': location})
@@ -1,15 +1,73 @@
 # vehicle_management/views_reporting.py
-from django.db.models import Sum, Count, Avg, F, Q
+from django.db.models import Sum, Count, Avg, F, Q, OuterRef, Subquery
+from django.db.models.functions import TruncMonth
 from django.utils import timezone
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
+from collections import defaultdict
 from datetime import datetime, timedelta
 from calendar import monthrange
+from functools import reduce
+from operator import itemgetter, or_
+
+from .models import (
+    ArchivedServiceRecord, Vehicle, ServiceRecord, VehiclePart, VehiclePartCompatibility,
+)
+from .columnar import columnar, table_response, wants_columnar
+from .alerts import expiry_alerts
+from .archive import service_sources
+from .jobs import employee_utilization
+from .consolidation import part_consolidation, DEFAULT_HORIZON_MONTHS
+from .fuel import FUEL_EFFICIENCY_COLUMNS, fuel_anomalies, fuel_efficiency
+from . import postgres
+from .postgres import is_postgres
+from .reporting import reporting_snapshot
+from .scheduling import BAYS, HORIZON_DAYS, SCHEDULE_COLUMNS, WEEKEND_BAYS, plan_workshop
+
+
+def _as_date(value):
+    """TruncMonth yields datetimes on some backends and dates on others"""
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _month_starts(start_date, end_date):
+    """First day of every month from start_date's month to end_date"""
+    current_date = start_date.replace(day=1)
+    while current_date <= end_date:
+        yield current_date
+        current_date = (current_date.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _combined(querysets, key_width):
+    """
+    Rows of grouped querysets over the live and archived services, with the
+    aggregates after the first `key_width` columns summed across them.
+    Returns {key tuple: [aggregates]}.
+    """
+    totals = {}
+    for queryset in querysets:
+        for row in queryset:
+            key, values = tuple(row[:key_width]), row[key_width:]
+            if key in totals:
+                totals[key] = [(a or 0) + (b or 0) for a, b in zip(totals[key], values)]
+            else:
+                totals[key] = list(values)
+    return totals
+
+
+# Row layouts of the tabular reports, shared by the JSON and ?format=columnar responses
+UTILIZATION_COLUMNS = ['id', 'name', 'registration', 'make', 'model', 'year', 'total_services', 'total_cost',
+                       'downtime_days', 'utilization_percentage', 'latest_mileage', 'mileage_change']
+MONTHLY_COST_COLUMNS = ['period', 'total_cost', 'service_count']
+VEHICLE_COST_COLUMNS = ['vehicle_id', 'vehicle_name', 'registration', 'make_model', 'total_cost',
+                        'service_count', 'avg_cost_per_service']
+SERVICE_TYPE_COST_COLUMNS = ['service_type', 'total_cost', 'service_count', 'avg_cost_per_service']
+PARTS_USAGE_COLUMNS = ['part_id', 'part_number', 'description', 'total_quantity', 'current_stock', 'minimum_stock']
 
-from .models import Vehicle, ServiceRecord, VehiclePart, VehiclePartCompatibility, ServicePartUsage
 
 @api_view(['GET'])
+@reporting_snapshot
 def service_forecast(request):
     """
     Generate a forecast of upcoming services over the next 6 months
@@ -18,47 +76,64 @@ def service_forecast(request):
         # Get current date
         today = timezone.now().date()
         
+        # Month windows for the next 6 months
+        months = []
+        for i in range(6):
+            month_start = (today.replace(day=1) + timedelta(days=32 * i)).replace(day=1)
+            month_end = (month_start.replace(day=1) + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+            months.append((month_start, month_end))
+        window = ServiceRecord.objects.filter(
+            service_date__gte=months[0][0],
+            service_date__lte=months[-1][1]
+        ).annotate(month=TruncMonth('service_date'))
+        
+        # Get scheduled services (already in the system), counted per month in
+        # one query with conditional aggregates (FILTER clauses on PostgreSQL)
+        scheduled = window.aggregate(**{
+            f'month_{i}': Count('id', filter=Q(service_date__gte=month_start, service_date__lte=month_end))
+            for i, (month_start, month_end) in enumerate(months)
+        })
+        
+        # Vehicles with a scheduled service in each month are not predicted again
+        scheduled_vehicles = {
+            (vehicle_id, _as_date(month))
+            for vehicle_id, month in window.values_list('vehicle_id', 'month').distinct()
+        }
+        
+        # Service interval inputs for every active vehicle, fetched once
+        active_vehicles = list(Vehicle.objects.filter(
+            status='active',
+            last_service_date__isnull=False
+        ).values_list(
+            'id', 'last_service_date', 'service_interval_months',
+            'current_mileage', 'last_service_mileage', 'service_interval_miles'
+        ))
+        
         # Initialize forecast data structure
         forecast_data = []
         
         # Calculate scheduled and predicted services for the next 6 months
-        for i in range(6):
-            month_start = (today.replace(day=1) + timedelta(days=32 * i)).replace(day=1)
-            month_end = (month_start.replace(day=1) + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-            
+        for i, (month_start, month_end) in enumerate(months):
             # Format month name (e.g., "Jan 2023")
             month_name = month_start.strftime("%b %Y")
             
-            # Get scheduled services (already in the system)
-            scheduled_services = ServiceRecord.objects.filter(
-                service_date__gte=month_start,
-                service_date__lte=month_end
-            ).count()
-            
             # Calculate predicted services based on service intervals
             # This is a simplified calculation - in real implementation you might need more complex logic
-            predicted_services = Vehicle.objects.filter(
-                status='active'
-            ).filter(
-                # Vehicles with last_service_date in appropriate range
-                Q(last_service_date__isnull=False) &
-                (
-                    # Calculate next service date using service_interval_months
-                    Q(last_service_date__lt=month_end - timedelta(days=30 * F('service_interval_months'))) |
-                    
-                    # Or using mileage if available
-                    Q(current_mileage__gte=F('last_service_mileage') + F('service_interval_miles'))
-                )
-            ).exclude(
+            predicted_services = 0
+            for vehicle_id, last_date, interval_months, mileage, last_mileage, interval_miles in active_vehicles:
+                # Calculate next service date using service_interval_months,
+                # or using mileage if available
+                date_due = last_date < month_end - timedelta(days=30 * interval_months)
+                mileage_due = last_mileage is not None and mileage >= last_mileage + interval_miles
+                
                 # Exclude vehicles already accounted for in scheduled services
-                service_records__service_date__gte=month_start,
-                service_records__service_date__lte=month_end
-            ).count()
+                if (date_due or mileage_due) and (vehicle_id, month_start) not in scheduled_vehicles:
+                    predicted_services += 1
             
             # Add to forecast data
             forecast_data.append({
                 'name': month_name,
-                'scheduled': scheduled_services,
+                'scheduled': scheduled[f'month_{i}'],
                 'predicted': predicted_services,
             })
         
@@ -71,6 +146,7 @@ def service_forecast(request):
         )
 
 @api_view(['GET'])
+@reporting_snapshot
 def vehicle_utilization(request):
     """
     Calculate vehicle utilization metrics based on service records
@@ -92,60 +168,116 @@ def vehicle_utilization(request):
         else:
             end_date = today
         
-        # Get all vehicles
-        vehicles = Vehicle.objects.all()
+        # Service records for a vehicle in the date range
+        in_range = Q(service_records__service_date__gte=start_date, service_records__service_date__lte=end_date)
+        vehicle_services = ServiceRecord.objects.filter(
+            vehicle=OuterRef('pk'),
+            service_date__gte=start_date,
+            service_date__lte=end_date
+        )
         
-        # Initialize results
-        results = []
+        # Per-vehicle metrics in a single grouped query
+        vehicles = Vehicle.objects.annotate(
+            total_services=Count('service_records', filter=in_range),
+            total_cost=Sum('service_records__cost', filter=in_range),
+        ).order_by('id')
+        fields = ['id', 'name', 'registration', 'make', 'model', 'year', 'current_mileage',
+                  'total_services', 'total_cost']
         
-        for vehicle in vehicles:
-            # Get service records for this vehicle in the date range
-            services = ServiceRecord.objects.filter(
-                vehicle=vehicle,
+        if is_postgres():
+            # First and latest service mileage per vehicle via DISTINCT ON
+            boundaries = postgres.boundary_service_mileage(start_date, end_date)
+            vehicles = vehicles.values(*fields)
+        else:
+            boundaries = None
+            vehicles = vehicles.annotate(
+                latest_service_mileage=Subquery(
+                    vehicle_services.order_by('-service_date', '-id').values('mileage_at_service')[:1]
+                ),
+                first_service_mileage=Subquery(
+                    vehicle_services.order_by('service_date', 'id').values('mileage_at_service')[:1]
+                ),
+            ).values(*fields, 'latest_service_mileage', 'first_service_mileage')
+        
+        # Archived services per vehicle, only when the range reaches back into the archive
+        archived = {}
+        if len(service_sources(start_date)) > 1:
+            archived_range = Q(archived_service_records__service_date__gte=start_date,
+                               archived_service_records__service_date__lte=end_date)
+            archived_services = ArchivedServiceRecord.objects.filter(
+                vehicle=OuterRef('pk'),
                 service_date__gte=start_date,
                 service_date__lte=end_date
             )
-            
-            # Calculate metrics
-            total_services = services.count()
-            total_cost = services.aggregate(Sum('cost'))['cost__sum'] or 0
-            downtime_days = 0
+            archived = {
+                vehicle_id: rest for vehicle_id, *rest in Vehicle.objects.annotate(
+                    services=Count('archived_service_records', filter=archived_range),
+                    cost=Sum('archived_service_records__cost', filter=archived_range),
+                    first_mileage=Subquery(
+                        archived_services.order_by('service_date', 'id').values('mileage_at_service')[:1]
+                    ),
+                    latest_mileage=Subquery(
+                        archived_services.order_by('-service_date', '-id').values('mileage_at_service')[:1]
+                    ),
+                ).filter(services__gt=0).values_list('id', 'services', 'cost', 'first_mileage', 'latest_mileage')
+            }
+        
+        # Initialize results
+        results = []
+        total_days = (end_date - start_date).days + 1
+        
+        for vehicle in vehicles:
+            if boundaries is not None:
+                first, latest = boundaries.get(vehicle['id'], (None, None))
+                vehicle['first_service_mileage'], vehicle['latest_service_mileage'] = first, latest
+            
+            if vehicle['id'] in archived:
+                # Archived services are older than the live ones, so they hold the first service
+                services, cost, first_mileage, latest_mileage = archived[vehicle['id']]
+                if not vehicle['total_services']:
+                    vehicle['latest_service_mileage'] = latest_mileage
+                vehicle['first_service_mileage'] = first_mileage
+                vehicle['total_services'] += services
+                vehicle['total_cost'] = (vehicle['total_cost'] or 0) + (cost or 0)
+            
+            total_services = vehicle['total_services']
+            total_cost = vehicle['total_cost'] or 0
             
             # Simple estimate of downtime (assuming 1 day per service)
             # In a real app, you would track actual downtime
             downtime_days = total_services
             
             # Calculate utilization percentage (days not in maintenance / total days)
-            total_days = (end_date - start_date).days + 1
             utilization_percentage = ((total_days - downtime_days) / total_days) * 100 if total_days > 0 else 0
             
             # Get latest mileage
-            latest_service = services.order_by('-service_date').first()
-            latest_mileage = latest_service.mileage_at_service if latest_service else vehicle.current_mileage
+            if total_services:
+                latest_mileage = vehicle['latest_service_mileage']
+            else:
+                latest_mileage = vehicle['current_mileage']
             
             # Calculate mileage change if we have data points
-            first_service = services.order_by('service_date').first()
             mileage_change = 0
-            if first_service and latest_service and first_service != latest_service:
-                mileage_change = latest_service.mileage_at_service - first_service.mileage_at_service
+            if total_services > 1:
+                mileage_change = vehicle['latest_service_mileage'] - vehicle['first_service_mileage']
             
             # Add to results
-            results.append({
-                'id': vehicle.id,
-                'name': vehicle.name,
-                'registration': vehicle.registration,
-                'make': vehicle.make,
-                'model': vehicle.model,
-                'year': vehicle.year,
-                'total_services': total_services,
-                'total_cost': float(total_cost),
-                'downtime_days': downtime_days,
-                'utilization_percentage': round(utilization_percentage, 2),
-                'latest_mileage': latest_mileage,
-                'mileage_change': mileage_change,
-            })
+            results.append((
+                vehicle['id'],
+                vehicle['name'],
+                vehicle['registration'],
+                vehicle['make'],
+                vehicle['model'],
+                vehicle['year'],
+                total_services,
+                float(total_cost),
+                downtime_days,
+                round(utilization_percentage, 2),
+                latest_mileage,
+                mileage_change,
+            ))
         
-        return Response(results)
+        return table_response(request, UTILIZATION_COLUMNS, results)
     
     except Exception as e:
         return Response(
@@ -154,6 +286,7 @@ def vehicle_utilization(request):
         )
 
 @api_view(['GET'])
+@reporting_snapshot
 def maintenance_costs(request):
     """
     Generate maintenance cost reports
@@ -176,99 +309,108 @@ def maintenance_costs(request):
         else:
             end_date = today
         
-        # Base query for all service records in the date range
-        services = ServiceRecord.objects.filter(
-            service_date__gte=start_date,
-            service_date__lte=end_date
-        )
+        # Service records in the date range, live and, when the range reaches it, archived
+        sources = [model for model, _ in service_sources(start_date)]
+        services = [
+            model.objects.filter(service_date__gte=start_date, service_date__lte=end_date)
+            for model in sources
+        ]
         
         # Different aggregations based on grouping
         if group_by == 'month':
             # Group by month
             monthly_costs = []
-            current_date = start_date.replace(day=1)
             
-            while current_date <= end_date:
-                next_month = current_date.replace(day=28) + timedelta(days=4)
-                next_month = next_month.replace(day=1)
-                
-                # Get services for this month
-                month_services = services.filter(
-                    service_date__gte=current_date,
-                    service_date__lt=next_month
+            # Totals for every month that had services, in one query
+            if is_postgres():
+                month_totals = _combined(
+                    [postgres.monthly_costs(start_date, end_date, model=model) for model in sources], 1
                 )
-                
-                # Calculate total cost
-                month_total = month_services.aggregate(Sum('cost'))['cost__sum'] or 0
+            else:
+                month_totals = _combined([
+                    ((_as_date(month), total_cost, service_count) for month, total_cost, service_count in
+                     queryset.annotate(month=TruncMonth('service_date')).values_list('month').annotate(
+                         total_cost=Sum('cost'),
+                         service_count=Count('id'),
+                     ))
+                    for queryset in services
+                ], 1)
+            
+            for current_date in _month_starts(start_date, end_date):
+                # Months without services are reported as zero
+                total_cost, service_count = month_totals.get((current_date,), (0, 0))
                 
                 # Add to results
-                monthly_costs.append({
-                    'period': current_date.strftime('%b %Y'),
-                    'total_cost': float(month_total),
-                    'service_count': month_services.count(),
-                })
-                
-                current_date = next_month
+                monthly_costs.append((
+                    current_date.strftime('%b %Y'),
+                    float(total_cost or 0),
+                    service_count,
+                ))
             
-            return Response(monthly_costs)
+            return table_response(request, MONTHLY_COST_COLUMNS, monthly_costs)
             
         elif group_by == 'vehicle':
             # Group by vehicle
             vehicle_costs = []
             
-            # Get all vehicles that had services
-            vehicle_ids = services.values_list('vehicle', flat=True).distinct()
-            vehicles = Vehicle.objects.filter(id__in=vehicle_ids)
-            
-            for vehicle in vehicles:
-                # Get services for this vehicle
-                vehicle_services = services.filter(vehicle=vehicle)
-                
-                # Calculate total cost
-                vehicle_total = vehicle_services.aggregate(Sum('cost'))['cost__sum'] or 0
+            # Totals for every vehicle that had services, in one query
+            vehicle_totals = _combined([
+                queryset.values_list(
+                    'vehicle_id', 'vehicle__name', 'vehicle__registration', 'vehicle__make', 'vehicle__model'
+                ).annotate(
+                    total_cost=Sum('cost'),
+                    service_count=Count('id'),
+                ).order_by()
+                for queryset in services
+            ], 5)
+            
+            for (vehicle_id, name, registration, make, model), (total_cost, service_count) in vehicle_totals.items():
+                vehicle_total = float(total_cost or 0)
                 
                 # Add to results
-                vehicle_costs.append({
-                    'vehicle_id': vehicle.id,
-                    'vehicle_name': vehicle.name,
-                    'registration': vehicle.registration,
-                    'make_model': f"{vehicle.make} {vehicle.model}",
-                    'total_cost': float(vehicle_total),
-                    'service_count': vehicle_services.count(),
-                    'avg_cost_per_service': float(vehicle_total) / vehicle_services.count() if vehicle_services.count() > 0 else 0,
-                })
+                vehicle_costs.append((
+                    vehicle_id,
+                    name,
+                    registration,
+                    f"{make} {model}",
+                    vehicle_total,
+                    service_count,
+                    vehicle_total / service_count if service_count > 0 else 0,
+                ))
             
             # Sort by total cost (highest first)
-            vehicle_costs.sort(key=lambda x: x['total_cost'], reverse=True)
+            vehicle_costs.sort(key=itemgetter(4), reverse=True)
             
-            return Response(vehicle_costs)
+            return table_response(request, VEHICLE_COST_COLUMNS, vehicle_costs)
             
         elif group_by == 'service_type':
             # Group by service type
             service_type_costs = []
             
-            # Get all service types
-            service_types = services.values_list('service_type', flat=True).distinct()
-            
-            for service_type in service_types:
-                # Get services of this type
-                type_services = services.filter(service_type=service_type)
-                
-                # Calculate total cost
-                type_total = type_services.aggregate(Sum('cost'))['cost__sum'] or 0
+            # Totals for every service type, in one query
+            type_totals = _combined([
+                queryset.values_list('service_type').annotate(
+                    total_cost=Sum('cost'),
+                    service_count=Count('id'),
+                ).order_by()
+                for queryset in services
+            ], 1)
+            
+            for (service_type,), (total_cost, service_count) in type_totals.items():
+                type_total = float(total_cost or 0)
                 
                 # Add to results
-                service_type_costs.append({
-                    'service_type': service_type,
-                    'total_cost': float(type_total),
-                    'service_count': type_services.count(),
-                    'avg_cost_per_service': float(type_total) / type_services.count() if type_services.count() > 0 else 0,
-                })
+                service_type_costs.append((
+                    service_type,
+                    type_total,
+                    service_count,
+                    type_total / service_count if service_count > 0 else 0,
+                ))
             
             # Sort by total cost (highest first)
-            service_type_costs.sort(key=lambda x: x['total_cost'], reverse=True)
+            service_type_costs.sort(key=itemgetter(1), reverse=True)
             
-            return Response(service_type_costs)
+            return table_response(request, SERVICE_TYPE_COST_COLUMNS, service_type_costs)
             
         else:
             return Response(
@@ -283,6 +425,7 @@ def maintenance_costs(request):
         )
 
 @api_view(['GET'])
+@reporting_snapshot
 def parts_usage_report(request):
     """
     Generate a report of parts usage over time
@@ -304,60 +447,61 @@ def parts_usage_report(request):
         else:
             end_date = today
         
-        # Find all service records in the date range
-        services = ServiceRecord.objects.filter(
-            service_date__gte=start_date,
-            service_date__lte=end_date
+        # Quantity per part and month, summed in the database, over the archive too when the range needs it
+        usages = [
+            model.objects.filter(service__service_date__gte=start_date, service__service_date__lte=end_date)
+            for _, model in service_sources(start_date)
+        ]
+        monthly = sorted(
+            (part_id, month, quantity)
+            for (part_id, month), (quantity,) in _combined([
+                ((part_id, _as_date(month), quantity) for part_id, month, quantity in queryset.annotate(
+                    month=TruncMonth('service__service_date')
+                ).values_list('part_id', 'month').annotate(total=Sum('quantity')).order_by())
+                for queryset in usages
+            ], 2).items()
         )
         
-        # Get all part usages for these services
-        part_usages = ServicePartUsage.objects.filter(
-            service__in=services
-        ).select_related('part', 'service')
-        
-        # Aggregate by part
-        part_usage_data = {}
+        totals = defaultdict(int)
+        for part_id, _, quantity in monthly:
+            totals[part_id] += quantity
         
-        for usage in part_usages:
-            part_id = usage.part.id
-            
-            if part_id not in part_usage_data:
-                part_usage_data[part_id] = {
-                    'part_id': part_id,
-                    'part_number': usage.part.part_number,
-                    'description': usage.part.description,
-                    'total_quantity': 0,
-                    'current_stock': usage.part.current_stock,
-                    'minimum_stock': usage.part.minimum_stock,
-                    'usage_by_month': {},
-                }
-            
-            # Update total quantity
-            part_usage_data[part_id]['total_quantity'] += usage.quantity
-            
-            # Update monthly usage
-            month_key = usage.service.service_date.strftime('%Y-%m')
-            month_name = usage.service.service_date.strftime('%b %Y')
-            
-            if month_key not in part_usage_data[part_id]['usage_by_month']:
-                part_usage_data[part_id]['usage_by_month'][month_key] = {
-                    'month': month_name,
-                    'quantity': 0,
-                }
-            
-            part_usage_data[part_id]['usage_by_month'][month_key]['quantity'] += usage.quantity
+        # Sort by total quantity used (highest first)
+        parts = [
+            (part_id, part_number, description, totals[part_id], current_stock, minimum_stock)
+            for part_id, part_number, description, current_stock, minimum_stock in VehiclePart.objects.filter(
+                reduce(or_, (Q(pk__in=queryset.values('part_id')) for queryset in usages))
+            ).order_by('id').values_list('id', 'part_number', 'description', 'current_stock', 'minimum_stock')
+        ]
+        parts.sort(key=itemgetter(3), reverse=True)
         
-        # Convert to list and sort usage_by_month
-        result = []
-        for part_id, data in part_usage_data.items():
-            monthly_usage = list(data['usage_by_month'].values())
-            monthly_usage.sort(key=lambda x: datetime.strptime(x['month'], '%b %Y'))
-            
-            data['usage_by_month'] = monthly_usage
-            result.append(data)
+        if wants_columnar(request):
+            payload = columnar(PARTS_USAGE_COLUMNS, parts)
+            if request.query_params.get('matrix') in ('1', 'true'):
+                # Dense part x month quantities, rows in the order of `data`, zero-filled
+                months = list(_month_starts(start_date, end_date))
+                column = {month: index for index, month in enumerate(months)}
+                row = {part[0]: index for index, part in enumerate(parts)}
+                matrix = [[0] * len(months) for _ in parts]
+                for part_id, month, quantity in monthly:
+                    matrix[row[part_id]][column[month]] = quantity
+                payload['months'] = [month.strftime('%b %Y') for month in months]
+                payload['matrix'] = matrix
+            else:
+                # Sparse long form: one entry per part and month with usage
+                payload['usage'] = columnar(
+                    ['part_id', 'month', 'quantity'],
+                    [(part_id, month.strftime('%b %Y'), quantity) for part_id, month, quantity in monthly]
+                )
+            return Response(payload)
         
-        # Sort by total quantity used (highest first)
-        result.sort(key=lambda x: x['total_quantity'], reverse=True)
+        usage_by_month = defaultdict(list)
+        for part_id, month, quantity in monthly:
+            usage_by_month[part_id].append({'month': month.strftime('%b %Y'), 'quantity': quantity})
+        result = [
+            dict(zip(PARTS_USAGE_COLUMNS, part), usage_by_month=usage_by_month[part[0]])
+            for part in parts
+        ]
         
         return Response(result)
     
@@ -365,4 +509,274 @@ def parts_usage_report(request):
         return Response(
             {'error': str(e)},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
\ No newline at end of file
+        )
+
+@api_view(['GET'])
+@reporting_snapshot
+def expiry_alerts_report(request):
+    """
+    Registration, insurance and licence expiries within the next N days
+    """
+    try:
+        try:
+            days = int(request.query_params.get('days', 30))
+            page = int(request.query_params.get('page', 1))
+            page_size = int(request.query_params.get('page_size', 50))
+        except ValueError:
+            return Response(
+                {'error': 'days, page and page_size must be integers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if days < 0 or page < 1 or not 1 <= page_size <= 500:
+            return Response(
+                {'error': 'days must be >= 0, page >= 1 and page_size between 1 and 500'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        include_expired = request.query_params.get('include_expired', '').lower() in ('1', 'true', 'yes')
+
+        return Response(expiry_alerts(
+            days=days,
+            include_expired=include_expired,
+            page=page,
+            page_size=page_size,
+        ))
+
+    except Exception as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@api_view(['GET'])
+@reporting_snapshot
+def part_consolidation_report(request):
+    """
+    Clusters of vehicles sharing an identical compatible part set, with the
+    forecast stock each cluster needs over the next N months
+    """
+    try:
+        try:
+            horizon_months = int(request.query_params.get('horizon_months', DEFAULT_HORIZON_MONTHS))
+            min_vehicles = int(request.query_params.get('min_vehicles', 1))
+            limit = int(request.query_params['limit']) if 'limit' in request.query_params else None
+        except ValueError:
+            return Response(
+                {'error': 'horizon_months, min_vehicles and limit must be integers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if not 1 <= horizon_months <= 60 or min_vehicles < 1 or (limit is not None and limit < 1):
+            return Response(
+                {'error': 'horizon_months must be between 1 and 60, min_vehicles and limit >= 1'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response(part_consolidation(
+            horizon_months=horizon_months,
+            min_vehicles=min_vehicles,
+            limit=limit,
+        ))
+
+    except Exception as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@api_view(['GET'])
+@reporting_snapshot
+def employee_utilization_report(request):
+    """
+    Days each employee spent assigned to jobs in a date range (default: last 90 days)
+    """
+    try:
+        today = timezone.now().date()
+        try:
+            start_date_str = request.query_params.get('start_date')
+            end_date_str = request.query_params.get('end_date')
+            end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date() if end_date_str else today
+            start_date = (datetime.strptime(start_date_str, '%Y-%m-%d').date() if start_date_str
+                          else end_date - timedelta(days=89))
+        except ValueError:
+            return Response(
+                {'error': 'start_date and end_date must be dates in YYYY-MM-DD format'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if end_date < start_date:
+            return Response(
+                {'error': 'end_date cannot be before start_date'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response({
+            'start_date': start_date,
+            'end_date': end_date,
+            'results': employee_utilization(start_date, end_date),
+        })
+
+    except Exception as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+def _date_range(request, default_days):
+    """start_date/end_date query parameters, defaulting to the `default_days` up to today"""
+    today = timezone.now().date()
+    start_date_str = request.query_params.get('start_date')
+    end_date_str = request.query_params.get('end_date')
+    end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date() if end_date_str else today
+    start_date = (datetime.strptime(start_date_str, '%Y-%m-%d').date() if start_date_str
+                  else end_date - timedelta(days=default_days - 1))
+    if end_date < start_date:
+        raise ValueError('end_date cannot be before start_date')
+    return start_date, end_date
+
+
+@api_view(['GET'])
+@reporting_snapshot
+def fuel_efficiency_report(request):
+    """
+    L/100km and fuel cost per km for each vehicle from its fuel card fills (default: last 90 days)
+    """
+    try:
+        try:
+            start_date, end_date = _date_range(request, 90)
+        except ValueError as e:
+            return Response(
+                {'error': f'start_date and end_date must be dates in YYYY-MM-DD format: {e}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return table_response(request, FUEL_EFFICIENCY_COLUMNS, fuel_efficiency(start_date, end_date))
+
+    except Exception as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@api_view(['GET'])
+@reporting_snapshot
+def fuel_anomalies_report(request):
+    """
+    Fuel card transactions to check: unknown cards, overfills, vehicles off the road, odometer rollbacks
+    """
+    try:
+        try:
+            start_date, end_date = _date_range(request, 90)
+            page = int(request.query_params.get('page', 1))
+            page_size = int(request.query_params.get('page_size', 50))
+        except ValueError as e:
+            return Response(
+                {'error': f'Invalid parameters: {e}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if page < 1 or not 1 <= page_size <= 500:
+            return Response(
+                {'error': 'page must be >= 1 and page_size between 1 and 500'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response(dict(
+            fuel_anomalies(start_date, end_date, page=page, page_size=page_size),
+            start_date=start_date,
+            end_date=end_date,
+        ))
+
+    except Exception as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+# Extra grouping for the tyre inventory: where the vehicles work, or what they are
+TYRE_INVENTORY_GROUPS = {
+    'department': ('assigned_employee__department', 'department'),
+    'model': ('model', 'model'),
+}
+
+
+@api_view(['GET'])
+@reporting_snapshot
+def tyre_inventory_report(request):
+    """
+    Active vehicles per tyre size and rim colour, optionally split by
+    department (?by=department) or model (?by=model), for stocking tyres
+    """
+    try:
+        by = request.query_params.get('by')
+        if by is not None and by not in TYRE_INVENTORY_GROUPS:
+            return Response(
+                {'error': f"Invalid by parameter: {by}. Valid options: {', '.join(TYRE_INVENTORY_GROUPS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        fields = ['tyre_size', 'rim_color']
+        columns = ['tyre_size', 'rim_color']
+        if by:
+            field, column = TYRE_INVENTORY_GROUPS[by]
+            fields.append(field)
+            columns.append(column)
+
+        rows = Vehicle.objects.filter(status='active').values_list(*fields).annotate(
+            vehicles=Count('id'),
+        ).order_by('-vehicles', *fields)
+        return table_response(request, columns + ['vehicles'], [
+            # Vehicles with no assigned employee group under an empty department
+            tuple('' if value is None else value for value in row) for row in rows
+        ])
+
+    except Exception as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+@api_view(['GET'])
+@reporting_snapshot
+def workshop_schedule_report(request):
+    """
+    Proposed workshop bookings for services falling due over the next
+    `days` (default 183), given `bays` per weekday and `weekend_bays`
+    """
+    try:
+        try:
+            start = request.query_params.get('start')
+            start = datetime.strptime(start, '%Y-%m-%d').date() if start else timezone.now().date()
+            days = int(request.query_params.get('days', HORIZON_DAYS))
+            bays = int(request.query_params.get('bays', BAYS))
+            weekend_bays = int(request.query_params.get('weekend_bays', WEEKEND_BAYS))
+        except ValueError as e:
+            return Response(
+                {'error': f'Invalid parameters: {e}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if not 1 <= days <= 366 or not 0 <= bays <= 50 or not 0 <= weekend_bays <= 50:
+            return Response(
+                {'error': 'days must be between 1 and 366, bays and weekend_bays between 0 and 50'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        plan = plan_workshop(start=start, days=days, bays=bays, weekend_bays=weekend_bays)
+        if wants_columnar(request):
+            plan['schedule'] = columnar(SCHEDULE_COLUMNS, plan['schedule'])
+        else:
+            plan['schedule'] = [booking._asdict() for booking in plan['schedule']]
+        return Response(plan)
+
+    except Exception as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )